@@ -0,0 +1,97 @@
+"""
+Trades per second with and without group commit.
+
+Each round every simulated wallet submits one trade concurrently, like a
+tick where all agents post a decision at once. Two write paths are timed:
+  * unbatched - each trade opens a connection, UPDATEs its row and commits,
+                as /decision did before the ledger
+  * batched   - each trade goes through GroupCommitQueue and is released
+                after the shared transaction commits
+
+Usage (from Agent_Backend/):
+    python -m benchmarks.bench_group_commit --wallets 10 100 1000 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from trading.group_commit import GroupCommitQueue
+
+UPDATE_SQL = """
+    UPDATE trading_positions
+    SET current_investment = ?, current_tokens = ?, buy_sell_calls = buy_sell_calls + 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE wallet_address = ?
+"""
+
+
+async def create_db(path: str, wallets: int):
+    async with aiosqlite.connect(path) as db:
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("""
+            CREATE TABLE trading_positions (
+                wallet_address TEXT PRIMARY KEY,
+                starting_investment REAL NOT NULL DEFAULT 0,
+                current_investment REAL NOT NULL DEFAULT 0,
+                current_tokens REAL NOT NULL DEFAULT 0,
+                buy_sell_calls INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.executemany(
+            "INSERT INTO trading_positions (wallet_address, starting_investment, current_investment) VALUES (?, 1000, 1000)",
+            [(f"0xWALLET{i:06d}",) for i in range(wallets)]
+        )
+        await db.commit()
+
+
+async def unbatched_trade(path: str, wallet: str, round_no: int):
+    async with aiosqlite.connect(path, timeout=60) as db:
+        await db.execute(UPDATE_SQL, (1000.0 - round_no, float(round_no), wallet))
+        await db.commit()
+
+
+async def run(path: str, wallets: int, rounds: int, batched: bool) -> float:
+    queue = None
+    if batched:
+        queue = GroupCommitQueue(path, max_batch=512, max_delay=0.005)
+        await queue.start()
+
+    addresses = [f"0xWALLET{i:06d}" for i in range(wallets)]
+    start = time.perf_counter()
+    for round_no in range(rounds):
+        if batched:
+            await asyncio.gather(*[
+                queue.submit(UPDATE_SQL, (1000.0 - round_no, float(round_no), wallet)) for wallet in addresses
+            ])
+        else:
+            await asyncio.gather(*[unbatched_trade(path, wallet, round_no) for wallet in addresses])
+    elapsed = time.perf_counter() - start
+
+    if queue is not None:
+        await queue.stop()
+    return wallets * rounds / elapsed
+
+
+async def main(wallet_counts: list, rounds: int):
+    print(f"{'wallets':>8} {'unbatched tps':>15} {'batched tps':>15} {'speedup':>9}")
+    for wallets in wallet_counts:
+        results = {}
+        for batched in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "trading.db")
+                await create_db(path, wallets)
+                results[batched] = await run(path, wallets, rounds, batched)
+        print(f"{wallets:>8} {results[False]:>15.0f} {results[True]:>15.0f} {results[True] / results[False]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.wallets, args.rounds))
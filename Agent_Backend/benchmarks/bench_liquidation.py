@@ -0,0 +1,161 @@
+"""
+End-of-session liquidation time, per-row vs vectorized.
+
+Both paths value every position at one price and write liquidation_results
+and current_leaderboard:
+  * per-row     - a Python loop building one dict per wallet, then one
+                  INSERT per wallet into each table, as process_stop_decision
+                  and update_leaderboard did before
+  * vectorized  - trading.liquidation.liquidate() over NumPy columns, then
+                  one executemany per table
+
+Console output is excluded from both timings (see LIQUIDATION_LOG_USERS).
+
+Usage (from Agent_Backend/):
+    python -m benchmarks.bench_liquidation --wallets 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import aiosqlite
+
+from trading.ledger import Position
+from trading.liquidation import liquidate
+
+PRICE = 2.5
+
+RESULTS_SQL = """
+    INSERT INTO liquidation_results
+    (session_id, wallet_address, starting_investment, final_investment, tokens_liquidated,
+     liquidation_value, profit_loss, profit_loss_percentage, liquidation_price,
+     liquidation_tick_seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+LEADERBOARD_SQL = """
+    INSERT INTO current_leaderboard
+    (wallet_address, name, starting_investment, final_investment,
+     tokens_liquidated, liquidation_value, profit_loss,
+     profit_loss_percentage, liquidation_price, rank_position, session_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def make_positions(wallets: int) -> list:
+    positions = []
+    for i in range(wallets):
+        position = Position(f"0xWALLET{i:06d}", 1000.0)
+        position.current_investment = random.uniform(0, 1000)
+        position.current_tokens = random.choice((0.0, random.uniform(0, 400)))
+        positions.append(position)
+    return positions
+
+
+async def create_dbs(directory: str) -> tuple:
+    trading_path = os.path.join(directory, "trading.db")
+    leaderboard_path = os.path.join(directory, "leaderboard.db")
+    async with aiosqlite.connect(trading_path) as db:
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("""
+            CREATE TABLE liquidation_results (
+                session_id TEXT, wallet_address TEXT, starting_investment REAL, final_investment REAL,
+                tokens_liquidated REAL, liquidation_value REAL, profit_loss REAL,
+                profit_loss_percentage REAL, liquidation_price REAL, liquidation_tick_seq INTEGER
+            )
+        """)
+        await db.commit()
+    async with aiosqlite.connect(leaderboard_path) as db:
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("""
+            CREATE TABLE current_leaderboard (
+                wallet_address TEXT, name TEXT, starting_investment REAL, final_investment REAL,
+                tokens_liquidated REAL, liquidation_value REAL, profit_loss REAL,
+                profit_loss_percentage REAL, liquidation_price REAL, rank_position INTEGER, session_id TEXT
+            )
+        """)
+        await db.commit()
+    return trading_path, leaderboard_path
+
+
+async def per_row(positions: list, names: dict, trading_path: str, leaderboard_path: str):
+    summary = []
+    for position in positions:
+        tokens = position.current_tokens if position.current_tokens > 0 else 0
+        liquidation_value = tokens * PRICE
+        final_investment = position.current_investment + liquidation_value
+        profit_loss = final_investment - position.starting_investment
+        summary.append({
+            "wallet_address": position.wallet_address,
+            "starting_investment": position.starting_investment,
+            "tokens_liquidated": tokens,
+            "liquidation_value": liquidation_value,
+            "final_investment": final_investment,
+            "profit_loss": profit_loss,
+            "profit_loss_percentage": profit_loss / position.starting_investment * 100
+        })
+
+    async with aiosqlite.connect(trading_path) as db:
+        await db.execute("DELETE FROM liquidation_results")
+        for item in summary:
+            await db.execute(RESULTS_SQL, (
+                "bench", item["wallet_address"], item["starting_investment"], item["final_investment"],
+                item["tokens_liquidated"], item["liquidation_value"], item["profit_loss"],
+                item["profit_loss_percentage"], PRICE, None
+            ))
+        await db.commit()
+
+    async with aiosqlite.connect(leaderboard_path) as db:
+        await db.execute("DELETE FROM current_leaderboard")
+        ranked = sorted(summary, key=lambda x: x["profit_loss_percentage"], reverse=True)
+        for rank, item in enumerate(ranked, 1):
+            wallet = item["wallet_address"]
+            await db.execute(LEADERBOARD_SQL, (
+                wallet, names.get(wallet, f"User_{wallet[:8]}"), item["starting_investment"],
+                item["final_investment"], item["tokens_liquidated"], item["liquidation_value"],
+                item["profit_loss"], item["profit_loss_percentage"], PRICE, rank, "bench"
+            ))
+        await db.commit()
+
+
+async def vectorized(positions: list, names: dict, trading_path: str, leaderboard_path: str):
+    liquidation = liquidate(positions, PRICE)
+
+    async with aiosqlite.connect(trading_path) as db:
+        await db.execute("DELETE FROM liquidation_results")
+        await db.executemany(RESULTS_SQL, liquidation.result_rows("bench"))
+        await db.commit()
+
+    async with aiosqlite.connect(leaderboard_path) as db:
+        await db.execute("DELETE FROM current_leaderboard")
+        await db.executemany(LEADERBOARD_SQL, liquidation.leaderboard_rows(names, "bench"))
+        await db.commit()
+
+
+async def main(wallet_counts: list):
+    print(f"{'wallets':>8} {'per-row (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for wallets in wallet_counts:
+        positions = make_positions(wallets)
+        names = {p.wallet_address: f"user{i}" for i, p in enumerate(positions)}
+        with tempfile.TemporaryDirectory() as directory:
+            paths = await create_dbs(directory)
+
+            start = time.perf_counter()
+            await per_row(positions, names, *paths)
+            slow = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await vectorized(positions, names, *paths)
+            fast = time.perf_counter() - start
+
+        print(f"{wallets:>8} {slow:>12.3f} {fast:>15.3f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    asyncio.run(main(args.wallets))
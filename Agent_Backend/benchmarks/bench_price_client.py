@@ -0,0 +1,99 @@
+"""
+Blocking vs async DexScreener fetches under concurrent load.
+
+Starts a local stand-in for DexScreener that answers after a fixed delay,
+then fires N concurrent price lookups through:
+  * the old path  - requests.get() called inside a coroutine
+  * the new path  - the shared pooled DexScreenerClient
+While each batch runs, a probe coroutine measures how late the event loop
+wakes it up, which is what every other agent's /decision would feel.
+
+Usage (from Agent_Backend/):
+    python -m benchmarks.bench_price_client --concurrency 50 --delay 0.2
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from data_fetch.dexscreener_client import DexScreenerClient
+
+
+def start_fake_dexscreener(delay: float) -> ThreadingHTTPServer:
+    body = json.dumps([{"priceUsd": "1.2345"}]).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def loop_lag_probe(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def blocking_fetch(base_url: str):
+    response = requests.get(f"{base_url}/token-pairs/v1/chain/token", headers={"Accept": "*/*"}, timeout=10)
+    return float(response.json()[0]["priceUsd"])
+
+
+async def run_batch(label: str, fetch, concurrency: int):
+    stop = asyncio.Event()
+    lag = []
+    probe = asyncio.create_task(loop_lag_probe(stop, lag))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[fetch() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    worst_lag = max(lag) if lag else elapsed
+    median_lag = statistics.median(lag) if lag else elapsed
+    print(f"{label:<10} {concurrency:>6} {elapsed * 1000:>12.1f} {median_lag * 1000:>14.1f} {worst_lag * 1000:>14.1f}")
+
+
+async def main(concurrency: int, delay: float):
+    server = start_fake_dexscreener(delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    client = DexScreenerClient(base_url)
+    await client.start()
+
+    print(f"Upstream delay: {delay * 1000:.0f} ms")
+    print(f"{'path':<10} {'calls':>6} {'wall (ms)':>12} {'median lag':>14} {'worst lag':>14}")
+    await run_batch("blocking", lambda: blocking_fetch(base_url), concurrency)
+    await run_batch("async", lambda: client.get_token_pairs("chain", "token"), concurrency)
+
+    await client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2, help="simulated upstream latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.delay))
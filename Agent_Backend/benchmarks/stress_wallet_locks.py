@@ -0,0 +1,103 @@
+"""
+Lost-update stress test for per-wallet locking.
+
+Runs the /decision read-modify-write sequence (read position, await the
+price fetch, apply the trade) for many overlapping requests per wallet,
+with and without WalletLockManager. Every successful trade increments
+buy_sell_calls, so a wallet whose final count is below its number of
+successful trades lost an update to an overlapping request.
+
+Usage (from Agent_Backend/):
+    python -m benchmarks.stress_wallet_locks --wallets 200 --trades 50
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+from trading.execution import execute_trade
+from trading.ledger import PositionLedger
+from trading.locks import WalletLockManager
+
+PRICE = 2.5
+
+
+@asynccontextmanager
+async def no_lock(wallet_address: str):
+    yield
+
+
+async def fetch_price() -> float:
+    # Stand-in for the upstream price fetch awaited mid-trade
+    await asyncio.sleep(random.uniform(0, 0.002))
+    return PRICE
+
+
+async def decision(ledger: PositionLedger, hold, wallet_address: str, action: str, successes: dict):
+    async with hold(wallet_address):
+        position, _ = ledger.get_or_create(wallet_address)
+        snapshot_investment = position.current_investment
+        snapshot_tokens = position.current_tokens
+        snapshot_calls = position.buy_sell_calls
+
+        price = await fetch_price()
+
+        # Apply to a copy of what was read before the await, then write back,
+        # exactly like a handler that read the row and later issues an UPDATE
+        position.current_investment = snapshot_investment
+        position.current_tokens = snapshot_tokens
+        position.buy_sell_calls = snapshot_calls
+        trade = execute_trade(position, action, price)
+        if trade.status == "success":
+            successes[wallet_address] += 1
+
+
+async def run(locked: bool, wallets: int, trades: int) -> tuple:
+    ledger = PositionLedger(pool=None)
+    hold = WalletLockManager().hold if locked else no_lock
+    addresses = [f"0xSTRESS{i:05d}" for i in range(wallets)]
+    successes = {wallet: 0 for wallet in addresses}
+
+    jobs = [
+        decision(ledger, hold, wallet, random.choice(("buy", "sell")), successes)
+        for wallet in addresses
+        for _ in range(trades)
+    ]
+    random.shuffle(jobs)
+
+    start = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+
+    lost_updates = 0
+    wallets_affected = 0
+    for wallet in addresses:
+        lost = successes[wallet] - ledger.get(wallet).buy_sell_calls
+        lost_updates += lost
+        wallets_affected += 1 if lost else 0
+    return elapsed, lost_updates, wallets_affected
+
+
+async def main(wallets: int, trades: int):
+    print(f"{wallets} wallets x {trades} overlapping trades each")
+    print(f"{'mode':<10} {'time (s)':>10} {'trades/s':>10} {'lost updates':>14} {'wallets hit':>12}")
+    failed = False
+    for locked in (False, True):
+        elapsed, lost_updates, wallets_affected = await run(locked, wallets, trades)
+        label = "locked" if locked else "unlocked"
+        print(f"{label:<10} {elapsed:>10.2f} {wallets * trades / elapsed:>10.0f} {lost_updates:>14} {wallets_affected:>12}")
+        if locked and lost_updates:
+            failed = True
+
+    if failed:
+        raise SystemExit("FAIL: lost updates with per-wallet locking")
+    print("OK: no lost updates with per-wallet locking")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=200)
+    parser.add_argument("--trades", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.wallets, args.trades))
@@ -0,0 +1,51 @@
+import os
+import httpx
+from typing import Optional
+
+DEXSCREENER_BASE_URL = "https://api.dexscreener.com"
+
+# Connection settings (override through environment)
+CONNECT_TIMEOUT = float(os.getenv("DEXSCREENER_CONNECT_TIMEOUT", "3.0"))
+READ_TIMEOUT = float(os.getenv("DEXSCREENER_READ_TIMEOUT", "5.0"))
+MAX_CONNECTIONS = int(os.getenv("DEXSCREENER_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("DEXSCREENER_MAX_KEEPALIVE", "10"))
+
+
+class DexScreenerClient:
+    """
+    Shared async DexScreener client.
+
+    Wraps one pooled keep-alive httpx.AsyncClient so requests never block
+    the event loop. The app creates it once at startup and closes it on
+    shutdown; the connection cap bounds how many requests hit upstream at once.
+    """
+
+    def __init__(self, base_url: str = DEXSCREENER_BASE_URL):
+        self.base_url = base_url
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Accept": "*/*"},
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE
+                )
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_token_pairs(self, chain_id: str, token_address: str):
+        """Return the raw token-pairs JSON for a token"""
+        if self._client is None:
+            await self.start()
+
+        response = await self._client.get(f"/token-pairs/v1/{chain_id}/{token_address}")
+        response.raise_for_status()
+        return response.json()
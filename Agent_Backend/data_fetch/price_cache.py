@@ -0,0 +1,63 @@
+import time
+from typing import Awaitable, Callable, Optional
+
+from storage.single_flight import SingleFlight
+
+
+class PriceCache:
+    """
+    TTL cache for token prices keyed by (chain_id, token_address).
+
+    Concurrent callers asking for the same key while a fetch is running
+    share that single in-flight fetch instead of hitting DexScreener again.
+    """
+
+    def __init__(self, fetcher: Callable[[str, str], Awaitable[Optional[float]]], ttl: float = 1.0):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self._entries = {}   # {(chain_id, token_address): (price, fetched_at)}
+        self._inflight = SingleFlight()  # fetches running per (chain_id, token_address)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, chain_id: str, token_address: str) -> Optional[float]:
+        """Return a cached price, or fetch it once for all waiting callers"""
+        key = (chain_id, token_address)
+
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+
+        if self._inflight.running(key):
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        return await self._inflight.run(key, lambda: self._fetch(key))
+
+    async def _fetch(self, key: tuple) -> Optional[float]:
+        price = await self.fetcher(*key)
+        # Failed fetches are not cached so the next caller retries upstream
+        if price is not None:
+            self._entries[key] = (price, time.monotonic())
+        return price
+
+    def invalidate(self, chain_id: Optional[str] = None, token_address: Optional[str] = None):
+        """Drop one cached price, or all of them when no key is given"""
+        if chain_id is None and token_address is None:
+            self._entries.clear()
+        else:
+            self._entries.pop((chain_id, token_address), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+
+class PriceTick:
+    """Latest snapshot received from the dex_live_data channel"""
+
+    __slots__ = ("seq", "price", "received_at", "chain_id", "token_address")
+
+    def __init__(self, seq: int, price: float, received_at: float,
+                 chain_id: Optional[str] = None, token_address: Optional[str] = None):
+        self.seq = seq
+        self.price = price
+        self.received_at = received_at
+        self.chain_id = chain_id
+        self.token_address = token_address
+
+    def age(self) -> float:
+        return time.monotonic() - self.received_at
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "price": self.price,
+            "age_seconds": round(self.age(), 3),
+            "chain_id": self.chain_id,
+            "token_address": self.token_address
+        }
+
+
+class RedisPriceFeed:
+    """
+    Background subscriber for the Execution_Engine price publisher.
+
+    Keeps only the most recent tick in memory so trades can be filled
+    without any network call. Ticks carry the publisher's sequence number;
+    older publishers without one get a locally assigned sequence instead.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, channel: str = "dex_live_data"):
+        self.host = host
+        self.port = port
+        self.channel = channel
+        self.latest: Optional[PriceTick] = None
+        self.ticks_received = 0
+        self.on_tick = None  # optional callback(PriceTick) run for every accepted tick
+        self._local_seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_tick(self, chain_id: Optional[str], token_address: Optional[str], max_age: float) -> Optional[PriceTick]:
+        """Return the latest tick if it is fresh and belongs to the requested token"""
+        tick = self.latest
+        if tick is None or tick.age() > max_age:
+            return None
+        if tick.token_address and token_address and tick.token_address.lower() != token_address.lower():
+            return None
+        if tick.chain_id and chain_id and tick.chain_id != chain_id:
+            return None
+        return tick
+
+    def handle_message(self, raw):
+        """Parse one published snapshot and make it the latest tick"""
+        data = json.loads(raw)
+        price = float(data.get("priceUsd", 0))
+        if price <= 0:
+            return
+
+        self._local_seq += 1
+        seq = data.get("seq")
+        self.latest = PriceTick(
+            seq=int(seq) if seq is not None else self._local_seq,
+            price=price,
+            received_at=time.monotonic(),
+            chain_id=data.get("chainId"),
+            token_address=data.get("tokenAddress")
+        )
+        self.ticks_received += 1
+        if self.on_tick is not None:
+            self.on_tick(self.latest)
+
+    async def _run(self):
+        while True:
+            client = aioredis.Redis(host=self.host, port=self.port)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                print(f"📡 Subscribed to price feed channel {self.channel}")
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        self.handle_message(message["data"])
+                    except (ValueError, TypeError) as e:
+                        print(f"⚠️ Skipping malformed price tick: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Price feed error: {str(e)}, reconnecting in 1s")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+                await client.close()
@@ -1,24 +1,85 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Header
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 import os
 import aiosqlite
 import json
 import time
 import random
 import asyncio
-import datetime
+import heapq
 from data_fetch.get_boosted_tokens import get_tokens
+from data_fetch.price_cache import PriceCache
+from data_fetch.dexscreener_client import DexScreenerClient
+from data_fetch.price_feed import RedisPriceFeed
+from trading.ledger import DEFAULT_SESSION_ID, format_timestamp
+from trading.group_commit import GroupCommitQueue
+from trading.execution import execute_trade, MIN_BUY_AMOUNT, MIN_SELL_TOKENS
+from trading.liquidation import liquidate
+from trading.history import (
+    TRADE_COLUMNS, RUN_COLUMNS, RESULT_COLUMNS, SUMMARY_COLUMNS,
+    start_run, end_runs, end_orphaned_runs, archive_run, compact_runs, fetch_trades, fetch_runs, fetch_results, fetch_wallet_summary
+)
+from trading.sessions import SessionRegistry
+from trading.scheduler import DeadlineScheduler
+from trading.pool_state import OPEN, LIQUIDATING, CLOSED
+from trading.events import EventHub, encode_event
+from storage.pool import ConnectionPool
+from storage.paging import encode_cursor, decode_cursor, page_size, ndjson_response
+from storage.snapshots import SnapshotCache
 from betting_pool.query_classifier import classify_token_query
 from fastapi.middleware.cors import CORSMiddleware
-import requests
+from fastapi.responses import StreamingResponse
+import httpx
 from typing import Optional
 
-app = FastAPI()
-
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources once for the lifetime of the process"""
+    for pool in db_pools:
+        await pool.open()
+    
+    # Schema setup runs here (and on reset), never per request
+    await initialize_trading_db()
+    await initialize_users_db()
+    await initialize_leaderboard_db()
+    print("🗄️ Database pools opened and schema initialized")
+    
+    if group_committer is not None:
+        await group_committer.start()
+    await sessions.load()
+    async with users_pool.acquire() as db:
+        cursor = await db.execute("SELECT session_id, wallet_address, name FROM users")
+        for session_id, wallet, name in await cursor.fetchall():
+            session = sessions.get(session_id)
+            if session is not None:
+                session.leaderboard.names[wallet] = name
+    print(f"📒 Restored {len(sessions)} sessions with {sessions.stats()['positions']} positions")
+    await start_missing_runs()
+    await dexscreener.start()
+    print("🌐 DexScreener client ready")
+    if PRICE_SOURCE == "redis":
+        price_feed.start()
+        print("📡 Filling trades from the Redis tick stream")
+    
+    # Armed last so overdue pools liquidate with price sources ready
+    pending = await scheduler.load()
+    scheduler.start()
+    print(f"⏰ Deadline scheduler armed with {pending} pool deadlines")
+    
+    yield
+    
+    # Scheduler first: a liquidation it cancels must not reopen a closed price client
+    await scheduler.stop()
+    await price_feed.stop()
+    await dexscreener.close()
+    await sessions.stop()
+    if group_committer is not None:
+        await group_committer.stop()
+    for pool in db_pools:
+        await pool.close()
 
-timer_active = False
-current_chain_id = None
-current_token_address = None
+app = FastAPI(lifespan=lifespan)
 
 # CORS Middleware
 app.add_middleware(
@@ -38,25 +99,196 @@ class BulkUserRequest(BaseModel):
     wallet_addresses: list[str]
     chainId: str  # New field
     tokenAddress: str  # New field
+    session_id: str = DEFAULT_SESSION_ID
+    bulk: bool = False  # one executemany, summary + rejected rows only (large sessions)
 
 class DecisionRequest(BaseModel):
     wallet_address: str
     action: str  # "buy", "sell", or "stop"
+    session_id: str = DEFAULT_SESSION_ID
+
+class BatchDecisionRequest(BaseModel):
+    decisions: list[DecisionRequest]  # actions limited to "buy" or "sell"
+    session_id: str = DEFAULT_SESSION_ID  # applies to every decision in the batch
 
 # Global Variables
-timer_task = None
+dexscreener = DexScreenerClient()
+
+# Seconds a fetched price is reused before DexScreener is queried again
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "1.0"))
+
+# Price source for trade fills: "http" polls DexScreener, "redis" uses the
+# Execution_Engine tick stream on dex_live_data and needs no network call per trade
+PRICE_SOURCE = os.getenv("PRICE_SOURCE", "http").lower()
+PRICE_FEED_MAX_AGE = float(os.getenv("PRICE_FEED_MAX_AGE", "5.0"))
+price_feed = RedisPriceFeed(
+    host=os.getenv("REDIS_HOST", "localhost"),
+    port=int(os.getenv("REDIS_PORT", "6379")),
+    channel=os.getenv("PRICE_FEED_CHANNEL", "dex_live_data")
+)
+
+# STORAGE_MODE=split keeps trading.db, users.db, leaderboard.db and the legacy pool.db,
+# with users.db ATTACHed to the trading and leaderboard connections so names resolve in SQL joins.
+# STORAGE_MODE=consolidated keeps every table in the single CONSOLIDATED_DB_PATH file
+STORAGE_MODE = os.getenv("STORAGE_MODE", "split").lower()
+CONSOLIDATED_DB_PATH = os.getenv("CONSOLIDATED_DB_PATH", os.path.join("database", "autopool.db"))
+if STORAGE_MODE == "consolidated":
+    TRADING_DB_PATH = USERS_DB_PATH = LEADERBOARD_DB_PATH = POOL_DB_PATH = CONSOLIDATED_DB_PATH
+else:
+    TRADING_DB_PATH = os.path.join("database", "trading.db")
+    USERS_DB_PATH = os.path.join("database", "users.db")
+    LEADERBOARD_DB_PATH = os.path.join("database", "leaderboard.db")
+    POOL_DB_PATH = os.path.join("database", "pool.db")
+
+# Pools of prepared connections, opened by the app lifespan: one per database file,
+# or a single shared pool when consolidated
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+if STORAGE_MODE == "consolidated":
+    trading_pool = users_pool = leaderboard_pool = ConnectionPool(CONSOLIDATED_DB_PATH, size=DB_POOL_SIZE)
+    db_pools = (trading_pool,)
+else:
+    trading_pool = ConnectionPool(TRADING_DB_PATH, size=DB_POOL_SIZE,
+                                  attach={"users_db": USERS_DB_PATH})
+    users_pool = ConnectionPool(USERS_DB_PATH, size=DB_POOL_SIZE)
+    leaderboard_pool = ConnectionPool(LEADERBOARD_DB_PATH, size=DB_POOL_SIZE,
+                                      attach={"users_db": USERS_DB_PATH})
+    db_pools = (trading_pool, users_pool, leaderboard_pool)
+
+# In-memory trading_positions; dirty rows are written behind every LEDGER_FLUSH_INTERVAL seconds.
+# LEDGER_WRITE_MODE=sync makes each trade durable before responding, with concurrent
+# trades group-committed every GROUP_COMMIT_MAX_DELAY_MS or GROUP_COMMIT_MAX_BATCH writes
+LEDGER_FLUSH_INTERVAL = float(os.getenv("LEDGER_FLUSH_INTERVAL", "1.0"))
+LEDGER_WRITE_MODE = os.getenv("LEDGER_WRITE_MODE", "behind").lower()
+group_committer = GroupCommitQueue(
+    TRADING_DB_PATH,
+    max_batch=int(os.getenv("GROUP_COMMIT_MAX_BATCH", "256")),
+    max_delay=float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5")) / 1000
+) if LEDGER_WRITE_MODE == "sync" else None
+
+# Every pool hosted by this process, keyed by session_id. Each session has its own
+# token, ledger, live leaderboard and per-wallet locks (same-wallet trades
+# run in order while different wallets trade in parallel)
+sessions = SessionRegistry(
+    trading_pool,
+    flush_interval=LEDGER_FLUSH_INTERVAL,
+    committer=group_committer,
+    lock_shards=int(os.getenv("WALLET_LOCK_SHARDS", "64"))
+)
+
+# Push channel (GET /stream): trades, price ticks, live leaderboard and pool state as
+# Server-Sent Events. A client may fall STREAM_MAX_QUEUE trade events behind before it
+# is dropped; price, leaderboard and state events only keep the latest unsent value.
+# The live top STREAM_LEADERBOARD_TOP is pushed at most every LEADERBOARD_PUSH_INTERVAL seconds
+STREAM_MAX_QUEUE = int(os.getenv("STREAM_MAX_QUEUE", "256"))
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "15"))
+STREAM_LEADERBOARD_TOP = int(os.getenv("STREAM_LEADERBOARD_TOP", "10"))
+LEADERBOARD_PUSH_INTERVAL = float(os.getenv("LEADERBOARD_PUSH_INTERVAL", "0.5"))
+event_hub = EventHub(max_queue=STREAM_MAX_QUEUE)
+leaderboard_push_pending = set()
+
+def state_event(state) -> dict:
+    return {
+        "session_id": state.session_id,
+        "pool_state": state.current,
+        "pool_status": "active" if state.is_open else "closed"
+    }
+
+def leaderboard_event(session) -> dict:
+    return {
+        "session_id": session.session_id,
+        "mark_price": session.leaderboard.price,
+        "total_participants": len(session.leaderboard),
+        "leaderboard": session.leaderboard.top(STREAM_LEADERBOARD_TOP)
+    }
+
+def publish_state(state):
+    event_hub.publish(state.session_id, "pool_state", state_event(state), conflate_key="pool_state")
+
+sessions.on_state_change = publish_state
+
+def push_leaderboard(session):
+    """Publish the session's live top-K once the current push interval ends"""
+    session_id = session.session_id
+    if session_id in leaderboard_push_pending or not event_hub.has_subscribers(session_id):
+        return
+    leaderboard_push_pending.add(session_id)
+    
+    def push():
+        leaderboard_push_pending.discard(session_id)
+        event_hub.publish(session_id, "leaderboard", leaderboard_event(session), conflate_key="leaderboard")
+    asyncio.get_running_loop().call_later(LEADERBOARD_PUSH_INTERVAL, push)
+
+def publish_price(session, price: float, tick_seq: Optional[int]):
+    if not event_hub.has_subscribers(session.session_id):
+        return
+    event_hub.publish(session.session_id, "price", {
+        "session_id": session.session_id,
+        "price": price,
+        "tick_seq": tick_seq
+    }, conflate_key="price")
+    push_leaderboard(session)
+
+def publish_trades(session, fills: list, price: float, tick_seq: Optional[int]):
+    """One event for every fill of a request (a single decision or a whole batch)"""
+    if not fills or not event_hub.has_subscribers(session.session_id):
+        return
+    event_hub.publish(session.session_id, "trades", {
+        "session_id": session.session_id,
+        "price": price,
+        "tick_seq": tick_seq,
+        "trades": fills
+    })
+    push_leaderboard(session)
+
+def fill_event(position, action: str, trade) -> dict:
+    return {
+        "wallet_address": position.wallet_address,
+        "action": action,
+        "cash_amount": trade.cash_amount,
+        "token_amount": trade.token_amount,
+        "current_investment": position.current_investment,
+        "current_tokens": position.current_tokens,
+        "buy_sell_calls": position.buy_sell_calls
+    }
+
+def reprice_sessions(tick):
+    """Mark every session trading the tick's token at the new price"""
+    for session in sessions.trading(tick.chain_id, tick.token_address):
+        session.leaderboard.reprice(tick.price)
+        publish_price(session, tick.price, tick.seq)
+
+price_feed.on_tick = reprice_sessions
+
+# Pools auto-liquidate POOL_DURATION_SECONDS after /all_users opens them. Deadlines
+# are persisted, so a restart resumes (or immediately fires) every pending expiry
+POOL_DURATION_SECONDS = float(os.getenv("POOL_DURATION_SECONDS", "80"))
+# A liquidation that fails leaves the deadline armed and retries after this delay
+POOL_EXPIRY_RETRY_SECONDS = float(os.getenv("POOL_EXPIRY_RETRY_SECONDS", "5"))
+
+# Per-user liquidation lines are slow with thousands of wallets, so they are opt-in
+LIQUIDATION_LOG_USERS = os.getenv("LIQUIDATION_LOG_USERS", "false").lower() in ("1", "true", "yes")
+
+# /all_positions and /db pages: PAGE_SIZE rows unless ?limit= asks for more (up to
+# PAGE_SIZE_MAX). NDJSON streams read STREAM_BATCH_SIZE rows per query
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "500"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "5000"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+# Every fill goes to the append-only trade_journal, and every run (reset to liquidation)
+# to session_archive. Runs that ended more than JOURNAL_RETENTION_HOURS ago are compacted
+# into per-wallet journal_summary rows after each liquidation (0 disables; see /history/compact)
+JOURNAL_RETENTION_HOURS = float(os.getenv("JOURNAL_RETENTION_HOURS", "0"))
+
+# Serialized bodies of the polled read endpoints (/all_positions, /leaderboard,
+# /leaderboard/summary, /pool_status), rebuilt at most once per price tick or change.
+# SNAPSHOT_CACHE_MAX_ENTRIES bounds the keys (session, endpoint, ?limit=) kept
+snapshots = SnapshotCache(max_entries=int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", "1024")))
 
 # Utility Functions
-async def get_token_price(chain_id: str, token_address: str) -> float:
-    """Fetch real token price from DexScreener API"""
+async def fetch_dexscreener_price(chain_id: str, token_address: str) -> Optional[float]:
+    """Fetch real token price from DexScreener API, None if unavailable"""
     try:
-        url = f"https://api.dexscreener.com/token-pairs/v1/{chain_id}/{token_address}"
-        headers = {"Accept": "*/*"}
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()  # Raises an exception for bad status codes
-        
-        data = response.json()
+        data = await dexscreener.get_token_pairs(chain_id, token_address)
         
         if data and isinstance(data, list) and len(data) > 0:
             pair = data[0]  # Get first pair
@@ -66,20 +298,80 @@ async def get_token_price(chain_id: str, token_address: str) -> float:
                 return float(price_usd)
             else:
                 print(f"⚠️ No valid priceUsd found for {token_address}, using fallback")
-                return get_fallback_price()
+                return None
         else:
             print(f"⚠️ No pairs found for {token_address}, using fallback")
-            return get_fallback_price()
+            return None
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ API request failed: {str(e)}, using fallback")
-        return get_fallback_price()
+        return None
     except (ValueError, KeyError) as e:
         print(f"❌ Price parsing failed: {str(e)}, using fallback")
-        return get_fallback_price()
+        return None
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}, using fallback")
+        return None
+
+
+# Shared price cache: every agent in a tick reuses one DexScreener fetch
+price_cache = PriceCache(fetch_dexscreener_price, ttl=PRICE_CACHE_TTL)
+
+async def get_token_price(chain_id: str, token_address: str) -> float:
+    """Get token price through the shared TTL cache, falling back to a random price"""
+    price = await price_cache.get(chain_id, token_address)
+    if price is None:
         return get_fallback_price()
+    return price
+
+
+# Sessions whose tick stream went stale, so the fallback is logged once per stale period
+stale_price_feeds = set()
+
+async def get_execution_price(session) -> tuple[float, Optional[int]]:
+    """
+    Price used to fill trades for a session's token, with the tick
+    sequence number it came from (None when not filled from the tick stream)
+    """
+    tick = None
+    if PRICE_SOURCE == "redis":
+        tick = price_feed.get_tick(session.chain_id, session.token_address, PRICE_FEED_MAX_AGE)
+        if tick is None and session.session_id not in stale_price_feeds:
+            stale_price_feeds.add(session.session_id)
+            print(f"⚠️ No fresh price tick for pool {session.session_id}, falling back to DexScreener")
+        elif tick is not None and session.session_id in stale_price_feeds:
+            stale_price_feeds.discard(session.session_id)
+            print(f"📡 Price ticks for pool {session.session_id} are fresh again")
+
+    if tick is not None:
+        price, tick_seq = tick.price, tick.seq
+    elif session.chain_id and session.token_address:
+        price, tick_seq = await price_cache.get(session.chain_id, session.token_address), None
+    else:
+        price, tick_seq = None, None
+    
+    if price is None:
+        # Random fallback: fills the trade, but the leaderboard stays at the last real price
+        return get_fallback_price(), None
+    
+    # Keep the live leaderboard marked at the latest price
+    if price != session.leaderboard.price:
+        session.leaderboard.reprice(price)
+        publish_price(session, price, tick_seq)
+    return price, tick_seq
+
+
+def price_version(session):
+    """
+    Which price a snapshot of the session was valued at: the tick sequence
+    on the Redis stream, otherwise the current PRICE_CACHE_TTL window
+    (DexScreener is not asked again within it either)
+    """
+    if PRICE_SOURCE == "redis":
+        tick = price_feed.get_tick(session.chain_id, session.token_address, PRICE_FEED_MAX_AGE)
+        if tick is not None:
+            return ("tick", tick.seq)
+    return ("ttl", int(time.monotonic() / max(PRICE_CACHE_TTL, 0.001)))
 
 
 def get_fallback_price() -> float:
@@ -89,40 +381,87 @@ def get_fallback_price() -> float:
     return price
 
 
+def get_session(session_id: str):
+    """Look up a hosted pool, 404 if this process has no such session"""
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return session
+
+
 # Database Functions
+async def ensure_session_table(db, table: str, create_sql: str):
+    """
+    Create a table keyed by session_id. A table from before multi-session
+    support (no session_id in its primary key) is rebuilt, and its rows are
+    kept under the default session.
+    """
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    old_columns = await cursor.fetchall()
+    if not old_columns or "session_id" in [row[1] for row in old_columns if row[5] > 0]:
+        await db.execute(create_sql)
+        return
+    
+    await db.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    await db.execute(create_sql)
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    new_columns = [row[1] for row in await cursor.fetchall()]
+    copied = ", ".join(row[1] for row in old_columns if row[1] in new_columns and row[1] != "session_id")
+    await db.execute(
+        f"INSERT INTO {table} (session_id, {copied}) SELECT ?, {copied} FROM {table}_legacy",
+        (DEFAULT_SESSION_ID,)
+    )
+    await db.execute(f"DROP TABLE {table}_legacy")
+    print(f"🔧 Migrated {table} to per-session rows")
+
 async def initialize_trading_db():
     """Initialize trading database tables (only if they don't exist)"""
-    os.makedirs("database", exist_ok=True)
-    trading_db_path = os.path.join("database", "trading.db")
-    
-    async with aiosqlite.connect(trading_db_path) as db:
+    async with trading_pool.acquire() as db:
         # Trading positions table
-        await db.execute("""
+        await ensure_session_table(db, "trading_positions", """
             CREATE TABLE IF NOT EXISTS trading_positions (
-                wallet_address TEXT PRIMARY KEY CHECK(length(wallet_address) <= 255),
+                session_id TEXT NOT NULL,
+                wallet_address TEXT NOT NULL CHECK(length(wallet_address) <= 255),
                 starting_investment REAL NOT NULL DEFAULT 0,
                 current_investment REAL NOT NULL DEFAULT 0,
                 current_tokens REAL NOT NULL DEFAULT 0,
                 buy_sell_calls INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_tick_seq INTEGER,
+                PRIMARY KEY (session_id, wallet_address)
             )
         """)
         
-        # Pool settings table
-        await db.execute("""
+        # Pool settings table (one row per session, also the session registry)
+        await ensure_session_table(db, "pool_settings", """
             CREATE TABLE IF NOT EXISTS pool_settings (
-                id INTEGER PRIMARY KEY CHECK(id = 1),
+                session_id TEXT PRIMARY KEY,
                 is_over BOOLEAN NOT NULL DEFAULT FALSE,
+                chain_id TEXT,
+                token_address TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                state TEXT NOT NULL DEFAULT 'open',
+                run_id INTEGER
             )
         """)
         
+        # Databases created before the pool state machine only have is_over
+        cursor = await db.execute("PRAGMA table_info(pool_settings)")
+        columns = [row[1] for row in await cursor.fetchall()]
+        if "state" not in columns:
+            await db.execute("ALTER TABLE pool_settings ADD COLUMN state TEXT NOT NULL DEFAULT 'open'")
+            await db.execute("UPDATE pool_settings SET state = 'closed' WHERE is_over")
+        # ... and before the session archive, no current run_id
+        if "run_id" not in columns:
+            await db.execute("ALTER TABLE pool_settings ADD COLUMN run_id INTEGER")
+        
         # Liquidation results table
-        await db.execute("""
+        await ensure_session_table(db, "liquidation_results", """
             CREATE TABLE IF NOT EXISTS liquidation_results (
-                wallet_address TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                wallet_address TEXT NOT NULL,
                 starting_investment REAL NOT NULL,
                 final_investment REAL NOT NULL,
                 tokens_liquidated REAL NOT NULL,
@@ -130,27 +469,162 @@ async def initialize_trading_db():
                 profit_loss REAL NOT NULL,
                 profit_loss_percentage REAL NOT NULL,
                 liquidation_price REAL NOT NULL,
-                liquidated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                liquidation_tick_seq INTEGER,
+                liquidated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (session_id, wallet_address)
+            )
+        """)
+        
+        # Keyset pages of /db walk these newest first without sorting the session
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trading_positions_session_created
+            ON trading_positions (session_id, created_at, wallet_address)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_liquidation_results_session_liquidated
+            ON liquidation_results (session_id, liquidated_at, wallet_address)
+        """)
+
+        # Pool expiry deadlines (epoch seconds), owned by the deadline scheduler
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS pool_deadlines (
+                session_id TEXT PRIMARY KEY,
+                deadline REAL NOT NULL
             )
         """)
         
+        # Append-only journal of every fill (trades and final liquidation sales)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS trade_journal (
+                trade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                run_id INTEGER,
+                wallet_address TEXT NOT NULL,
+                action TEXT NOT NULL,
+                price REAL NOT NULL,
+                tick_seq INTEGER,
+                cash_amount REAL NOT NULL,
+                token_amount REAL NOT NULL,
+                investment_after REAL NOT NULL,
+                tokens_after REAL NOT NULL,
+                executed_at TIMESTAMP NOT NULL
+            )
+        """)
+        # History pages walk a wallet's or a session's trades newest first; compaction goes by run
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trade_journal_session_wallet_executed
+            ON trade_journal (session_id, wallet_address, executed_at, trade_id)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_trade_journal_session_executed
+            ON trade_journal (session_id, executed_at, trade_id)
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_trade_journal_run ON trade_journal (run_id)")
+
+        # One row per run of a session (reset to liquidation), with its final totals
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS session_archive (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                chain_id TEXT,
+                token_address TEXT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ended_at TIMESTAMP,
+                liquidation_price REAL,
+                liquidation_tick_seq INTEGER,
+                participants INTEGER,
+                total_liquidation REAL,
+                average_profit_loss_percentage REAL,
+                winners INTEGER,
+                losers INTEGER,
+                compacted BOOLEAN NOT NULL DEFAULT FALSE
+            )
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_archive_session
+            ON session_archive (session_id, run_id)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_archive_ended
+            ON session_archive (ended_at) WHERE NOT compacted
+        """)
+
+        # Final ranked results of every finished run, kept after the session is reset
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS archived_results (
+                run_id INTEGER NOT NULL,
+                session_id TEXT NOT NULL,
+                wallet_address TEXT NOT NULL,
+                name TEXT NOT NULL,
+                starting_investment REAL NOT NULL,
+                final_investment REAL NOT NULL,
+                profit_loss REAL NOT NULL,
+                profit_loss_percentage REAL NOT NULL,
+                rank_position INTEGER NOT NULL,
+                archived_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (run_id, wallet_address)
+            )
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_archived_results_run_rank
+            ON archived_results (run_id, rank_position)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_archived_results_wallet
+            ON archived_results (wallet_address, run_id)
+        """)
+
+        # Per-wallet totals of compacted runs, replacing their trade_journal rows
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS journal_summary (
+                run_id INTEGER NOT NULL,
+                session_id TEXT NOT NULL,
+                wallet_address TEXT NOT NULL,
+                trades INTEGER NOT NULL,
+                buys INTEGER NOT NULL,
+                sells INTEGER NOT NULL,
+                cash_spent REAL NOT NULL,
+                cash_received REAL NOT NULL,
+                tokens_bought REAL NOT NULL,
+                tokens_sold REAL NOT NULL,
+                first_trade_at TIMESTAMP,
+                last_trade_at TIMESTAMP,
+                PRIMARY KEY (run_id, wallet_address)
+            )
+        """)
+
         # Insert default pool settings
         await db.execute("""
-            INSERT OR IGNORE INTO pool_settings (id, is_over) VALUES (1, FALSE)
+            INSERT OR IGNORE INTO pool_settings (session_id, is_over) VALUES (?, FALSE)
+        """, (DEFAULT_SESSION_ID,))
+        
+        await db.commit()
+
+async def initialize_users_db():
+    """Initialize users table (only if it doesn't exist)"""
+    async with users_pool.acquire() as db:
+        await ensure_session_table(db, "users", """
+            CREATE TABLE IF NOT EXISTS users (
+                session_id TEXT NOT NULL,
+                wallet_address TEXT NOT NULL CHECK(length(wallet_address) <= 255),
+                name TEXT NOT NULL CHECK(length(name) <= 100),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (session_id, wallet_address)
+            )
         """)
         
+        # The primary key serves per-session lookups; this one finds a wallet across sessions
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_wallet ON users (wallet_address)")
         await db.commit()
 
 async def initialize_leaderboard_db():
     """Initialize leaderboard database for current session results"""
-    os.makedirs("database", exist_ok=True)
-    leaderboard_db_path = os.path.join("database", "leaderboard.db")
-    
-    async with aiosqlite.connect(leaderboard_db_path) as db:
+    async with leaderboard_pool.acquire() as db:
         # Create current leaderboard table
-        await db.execute("""
+        await ensure_session_table(db, "current_leaderboard", """
             CREATE TABLE IF NOT EXISTS current_leaderboard (
-                wallet_address TEXT PRIMARY KEY,
+                wallet_address TEXT NOT NULL,
                 name TEXT NOT NULL,
                 starting_investment REAL NOT NULL,
                 final_investment REAL NOT NULL,
@@ -161,165 +635,306 @@ async def initialize_leaderboard_db():
                 liquidation_price REAL NOT NULL,
                 rank_position INTEGER,
                 liquidated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                session_id TEXT NOT NULL
+                session_id TEXT NOT NULL,
+                PRIMARY KEY (session_id, wallet_address)
             )
         """)
+        
+        # Ranked reads (ORDER BY rank_position LIMIT k) and per-wallet lookups
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_current_leaderboard_session_rank
+            ON current_leaderboard (session_id, rank_position)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_current_leaderboard_wallet
+            ON current_leaderboard (wallet_address)
+        """)
         await db.commit()
 
-async def reset_trading_db():
-    """Complete reset of trading database"""
-    os.makedirs("database", exist_ok=True)
-    trading_db_path = os.path.join("database", "trading.db")
-    
-    async with aiosqlite.connect(trading_db_path) as db:
-        await db.execute("DROP TABLE IF EXISTS trading_positions")
-        await db.execute("DROP TABLE IF EXISTS pool_settings")
-        await db.execute("DROP TABLE IF EXISTS liquidation_results")
+async def reset_session(session):
+    """Clear one session's positions and results and record its token"""
+    await session.ledger.reset()
+    session.leaderboard.clear()
+    # Trades journaled before the reset still belong to the previous run
+    await session.ledger.flush()
+    async with trading_pool.acquire() as db:
+        await db.execute("DELETE FROM trading_positions WHERE session_id = ?", (session.session_id,))
+        await db.execute("DELETE FROM liquidation_results WHERE session_id = ?", (session.session_id,))
+        # A run reset before it was liquidated ends here, so its journal can still be compacted
+        await end_runs(db, [session.ledger.run_id])
+        run_id = await start_run(db, session.session_id, session.chain_id, session.token_address)
+        await db.execute("""
+            INSERT INTO pool_settings (session_id, is_over, state, chain_id, token_address, run_id)
+            VALUES (?, FALSE, 'open', ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                is_over = FALSE,
+                state = 'open',
+                chain_id = excluded.chain_id,
+                token_address = excluded.token_address,
+                run_id = excluded.run_id,
+                updated_at = CURRENT_TIMESTAMP
+        """, (session.session_id, session.chain_id, session.token_address, run_id))
+        await db.commit()
+    session.ledger.run_id = run_id
+    session.state.restore(OPEN)
+
+async def restore_positions(session, snapshot: dict):
+    """Undo a liquidation that never committed: positions (rewritten on the next flush) and live ranking"""
+    await session.ledger.restore(snapshot)
+    for position in session.ledger.all():
+        session.leaderboard.update(position)
+
+async def start_missing_runs() -> int:
+    """Open a run for every session without one (the default pool on first boot), so no trade journals without a run_id"""
+    started = {}
+    async with trading_pool.acquire() as db:
+        ended = await end_orphaned_runs(db)
+        for session in sessions.all():
+            if session.ledger.run_id is None:
+                started[session.session_id] = await start_run(db, session.session_id, session.chain_id,
+                                                              session.token_address)
+        await db.executemany("UPDATE pool_settings SET run_id = ? WHERE session_id = ?",
+                             [(run_id, session_id) for session_id, run_id in started.items()])
         await db.commit()
+    for session_id, run_id in started.items():
+        sessions.get(session_id).ledger.run_id = run_id
+    if ended:
+        print(f"🗂️ Ended {ended} abandoned runs")
+    return len(started)
+
+async def insert_users_bulk(db, session_id: str, names: list, wallet_addresses: list) -> tuple[dict, list]:
+    """
+    Validate and insert a session's users with a single executemany.
+    Validation is one generator pass feeding the insert, so no separate
+    list of rows is built; the request's lists, the {wallet_address: name}
+    map of created users (the response and leaderboard need it) and the
+    rejected rows still grow with the batch.
+    """
+    created = {}
+    rejected = []
     
-    await initialize_trading_db()
+    def rows():
+        for i, (name, wallet_address) in enumerate(zip(names, wallet_addresses)):
+            clean_name = name.strip() if name else ""
+            clean_wallet = wallet_address.strip() if wallet_address else ""
+            if not clean_name:
+                reason = "empty_name"
+            elif not clean_wallet:
+                reason = "empty_wallet_address"
+            elif len(clean_name) > 100:
+                reason = "name_too_long"
+            elif len(clean_wallet) > 255:
+                reason = "wallet_address_too_long"
+            elif clean_wallet in created:
+                reason = "duplicate_wallet_address"
+            else:
+                created[clean_wallet] = clean_name
+                yield (session_id, clean_wallet, clean_name)
+                continue
+            rejected.append({"index": i, "name": name, "wallet_address": wallet_address, "reason": reason})
+    
+    await db.executemany("INSERT INTO users (session_id, wallet_address, name) VALUES (?, ?, ?)", rows())
+    return created, rejected
 
-async def get_pool_status():
-    """Get global pool status"""
-    try:
-        trading_db_path = os.path.join("database", "trading.db")
-        async with aiosqlite.connect(trading_db_path) as db:
-            cursor = await db.execute("SELECT is_over FROM pool_settings WHERE id = 1")
-            result = await cursor.fetchone()
-            return result[0] if result else False
-    except:
-        return False
-
-async def set_pool_status(is_over: bool):
-    """Set global pool status"""
-    try:
-        trading_db_path = os.path.join("database", "trading.db")
-        async with aiosqlite.connect(trading_db_path) as db:
-            await db.execute("""
-                UPDATE pool_settings 
-                SET is_over = ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE id = 1
-            """, (is_over,))
-            await db.commit()
-    except:
-        pass
+def pool_status_text(session) -> str:
+    """Legacy two-valued status: anything but open rejects trades"""
+    return "active" if session.state.is_open else "closed"
+
+def position_sort_key(position) -> tuple:
+    """/all_positions order, newest first (wallet breaks created_at ties)"""
+    return (position.created_at, position.wallet_address)
+
+def value_position(position, current_price: float, tick_seq: Optional[int]) -> dict:
+    """One /all_positions entry: the position marked to current_price"""
+    token_value = position.current_tokens * current_price
+    total_current_value = position.current_investment + token_value
+
+    starting_investment = position.starting_investment
+    profit_loss = total_current_value - starting_investment
+    profit_loss_percentage = (profit_loss / starting_investment * 100) if starting_investment > 0 else 0
+
+    return {
+        **position.to_dict(),
+        "current_token_value": token_value,
+        "total_current_value": total_current_value,
+        "profit_loss": profit_loss,
+        "profit_loss_percentage": round(profit_loss_percentage, 2),
+        "current_token_price": current_price,
+        "tick_seq": tick_seq
+    }
+
+def short_wallet(wallet_address: str) -> str:
+    return wallet_address[:10] + "..." if len(wallet_address) > 13 else wallet_address
+
+def format_position_row(row) -> list:
+    """Display strings for one trading_positions row of /db"""
+    return [
+        short_wallet(row[0]),
+        f"${row[1]:.2f}" if row[1] is not None else "N/A",
+        f"${row[2]:.2f}" if row[2] is not None else "N/A",
+        f"{row[3]:.4f}" if row[3] is not None else "0.0000",
+        str(row[4]) if row[4] is not None else "0",
+        row[5][:19] if row[5] else "N/A",
+        row[6][:19] if row[6] else "N/A"
+    ]
+
+def format_liquidation_row(row) -> list:
+    """Display strings for one liquidation_results row of /db"""
+    return [
+        short_wallet(row[0]),
+        f"${row[1]:.2f}" if row[1] is not None else "N/A",
+        f"${row[2]:.2f}" if row[2] is not None else "N/A",
+        f"{row[3]:.4f}" if row[3] is not None else "0.0000",
+        f"${row[4]:.2f}" if row[4] is not None else "N/A",
+        f"${row[5]:.2f}" if row[5] is not None else "N/A",
+        f"{row[6]:.2f}%" if row[6] is not None else "N/A",
+        f"${row[7]:.4f}" if row[7] is not None else "N/A",
+        row[8][:19] if row[8] else "N/A"
+    ]
+
+# Session tables /db can page through or stream, newest first by (order_by, wallet_address)
+DB_TABLES = {
+    "trading_positions": {
+        "title": "Current Trading Session (Active)",
+        "columns": ["wallet_address", "starting_investment", "current_investment",
+                    "current_tokens", "buy_sell_calls", "created_at", "updated_at"],
+        "headers": ["Wallet Address", "Starting Investment", "Current Investment",
+                    "Current Tokens", "Buy/Sell Calls", "Created At", "Updated At"],
+        "order_by": "created_at",
+        "format_row": format_position_row
+    },
+    "liquidation_results": {
+        "title": "Previous Session Results (Final)",
+        "columns": ["wallet_address", "starting_investment", "final_investment",
+                    "tokens_liquidated", "liquidation_value", "profit_loss",
+                    "profit_loss_percentage", "liquidation_price", "liquidated_at"],
+        "headers": ["Wallet Address", "Starting Inv.", "Final Inv.", "Tokens Liquidated",
+                    "Liquidation Value", "Profit/Loss", "P&L %", "Liquidation Price", "Liquidated At"],
+        "order_by": "liquidated_at",
+        "format_row": format_liquidation_row
+    }
+}
+
+async def fetch_table_page(table: str, session_id: str, after: Optional[tuple], limit: int) -> tuple[list, Optional[tuple]]:
+    """
+    One keyset page of a DB_TABLES table: (rows, sort key to continue after,
+    or None on the last page). Each page is its own indexed query, so no
+    connection is held between pages.
+    """
+    spec = DB_TABLES[table]
+    order_by = spec["order_by"]
+    keyset = f"AND ({order_by}, wallet_address) < (?, ?)" if after else ""
+    async with trading_pool.acquire() as db:
+        cursor = await db.execute(f"""
+            SELECT {", ".join(spec["columns"])}
+            FROM {table}
+            WHERE session_id = ? {keyset}
+            ORDER BY {order_by} DESC, wallet_address DESC
+            LIMIT ?
+        """, (session_id, *(after or ()), limit + 1))
+        rows = await cursor.fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (last[spec["columns"].index(order_by)], last[0])
 
-async def update_leaderboard(liquidation_summary, session_id, current_price):
+async def stream_table(table: str, session_id: str, after: Optional[tuple], formatted: bool):
+    """Every row of a DB_TABLES table after the cursor, STREAM_BATCH_SIZE rows per query"""
+    spec = DB_TABLES[table]
+    while True:
+        rows, after = await fetch_table_page(table, session_id, after, STREAM_BATCH_SIZE)
+        for row in rows:
+            yield dict(zip(spec["columns"], spec["format_row"](row) if formatted else row))
+        if after is None:
+            return
+
+async def update_leaderboard(liquidation, session_id):
     """Update leaderboard with latest session results"""
     try:
-        await initialize_leaderboard_db()
-        leaderboard_db_path = os.path.join("database", "leaderboard.db")
-        users_db_path = os.path.join("database", "users.db")
-        
-        async with aiosqlite.connect(leaderboard_db_path) as lb_db:
-            # Clear previous leaderboard data
-            await lb_db.execute("DELETE FROM current_leaderboard")
-            
-            # Get user names from users database
-            user_names = {}
-            if os.path.exists(users_db_path):
-                async with aiosqlite.connect(users_db_path) as user_db:
-                    cursor = await user_db.execute("SELECT wallet_address, name FROM users")
-                    users_data = await cursor.fetchall()
-                    user_names = {wallet: name for wallet, name in users_data}
-            
-            # Sort liquidation summary by profit_loss_percentage (descending)
-            sorted_results = sorted(liquidation_summary, 
-                                  key=lambda x: x["profit_loss_percentage"], 
-                                  reverse=True)
-            
-            # Insert new leaderboard data with rankings
-            for rank, result in enumerate(sorted_results, 1):
-                wallet_address = result["wallet_address"]
-                user_name = user_names.get(wallet_address, f"User_{wallet_address[:8]}")
-                
-                await lb_db.execute("""
-                    INSERT INTO current_leaderboard 
-                    (wallet_address, name, starting_investment, final_investment, 
-                     tokens_liquidated, liquidation_value, profit_loss, 
-                     profit_loss_percentage, liquidation_price, rank_position, session_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    wallet_address,
-                    user_name,
-                    1000.0,  # starting_investment (always 1000)
-                    result["final_investment"],
-                    result["tokens_liquidated"],
-                    result["liquidation_value"],
-                    result["profit_loss"],
-                    result["profit_loss_percentage"],
-                    current_price,
-                    rank,
-                    session_id
-                ))
-            
+        async with leaderboard_pool.acquire() as lb_db:
+            # Replace this session's previous leaderboard data in one transaction.
+            # Names are joined from users (same file, or the ATTACHed users.db);
+            # wallets without a user row keep the User_<wallet> fallback
+            await lb_db.execute("DELETE FROM current_leaderboard WHERE session_id = ?", (session_id,))
+            await lb_db.executemany("""
+                INSERT INTO current_leaderboard 
+                (wallet_address, name, starting_investment, final_investment, 
+                 tokens_liquidated, liquidation_value, profit_loss, 
+                 profit_loss_percentage, liquidation_price, rank_position, session_id)
+                SELECT ?1, COALESCE(users.name, ?2), ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11
+                FROM (SELECT 1)
+                LEFT JOIN users ON users.session_id = ?11 AND users.wallet_address = ?1
+            """, liquidation.leaderboard_rows({}, session_id))
             await lb_db.commit()
-            print(f"📊 Leaderboard updated with {len(sorted_results)} participants")
+            # The pool closed before this write, so snapshots must not stop at its state version
+            session = sessions.get(session_id)
+            if session is not None:
+                session.results_version += 1
+            print(f"📊 Leaderboard updated with {len(liquidation)} participants")
             
     except Exception as e:
         print(f"❌ Error updating leaderboard: {str(e)}")
 
-# Timer Functions
-async def auto_stop_pool():
-    """Auto-stop pool after 10 minutes"""
-    global timer_active, current_chain_id, current_token_address
-    timer_active = True 
-    print("🕐 Timer started: Pool will auto-stop in 10 minutes...")
-    await asyncio.sleep(80)  # 80 seconds for testing (change to 600 for 10 minutes)
-    
+async def compact_expired_runs():
+    """Compact runs that ended more than JOURNAL_RETENTION_HOURS ago (0 keeps every trade)"""
+    if JOURNAL_RETENTION_HOURS <= 0:
+        return
     try:
-        trading_db_path = os.path.join("database", "trading.db")
-        
-        if os.path.exists(trading_db_path):
-            async with aiosqlite.connect(trading_db_path) as db:
-                cursor = await db.execute("SELECT wallet_address FROM trading_positions LIMIT 1")
-                result = await cursor.fetchone()
-                
-                if result:
-                    wallet_address = result[0]
-                    print(f"⏰ Timer elapsed! Auto-stopping pool using wallet: {wallet_address}")
-                    await process_stop_decision(wallet_address)
-                else:
-                    print("⚠️ No trading positions found to trigger auto-stop")
-        else:
-            print("⚠️ Trading database not found for auto-stop")
-            
+        cutoff = format_timestamp(time.time() - JOURNAL_RETENTION_HOURS * 3600)
+        compacted = await compact_runs(trading_pool, cutoff)
+        if compacted:
+            trades = sum(run["trades_compacted"] for run in compacted)
+            print(f"🗜️ Compacted {len(compacted)} archived runs ({trades} journaled trades)")
     except Exception as e:
-        print(f"❌ Error in auto-stop: {str(e)}")
+        print(f"❌ Error compacting trade journal: {str(e)}")
 
-    finally:
-        timer_active = False
+# Timer Functions
+async def expire_pool(session_id: str) -> bool:
+    """Deadline reached: liquidate the session's pool; False if it is still not closed"""
+    session = sessions.get(session_id)
+    if session is None:
+        print(f"⚠️ Deadline fired for unknown session {session_id}")
+        return True
+    print(f"⏰ Deadline reached! Auto-stopping pool {session_id}")
+    await process_stop_decision(session)
+    return session.state.current == CLOSED
+
+scheduler = DeadlineScheduler(trading_pool, on_expire=expire_pool, retry_delay=POOL_EXPIRY_RETRY_SECONDS)
 
-async def process_stop_decision(wallet_address: str):
-    """Process auto-stop decision - liquidates ALL users"""
-    global timer_active, current_chain_id, current_token_address
+async def process_stop_decision(session):
+    """Process auto-stop decision - liquidates ALL users of the session"""
+    ledger = session.ledger
+    if session.state.current == CLOSED:
+        print(f"⚠️ Pool {session.session_id} is already closed")
+        return
+    
+    snapshot = None
     try:
-        await initialize_trading_db()
-        trading_db_path = os.path.join("database", "trading.db")
+        # Stop new trades immediately, then wait out the in-flight ones. False means a
+        # /decision stop is liquidating already: leave the pool to it (an expiring
+        # deadline is retried until the pool is closed)
+        if not await session.state.transition(LIQUIDATING):
+            print(f"⚠️ Pool {session.session_id} is already being liquidated")
+            return
         
-        async with aiosqlite.connect(trading_db_path) as db:
-            await db.execute("PRAGMA journal_mode=WAL")
-            
-            # Get ALL user positions
-            cursor = await db.execute("SELECT * FROM trading_positions")
-            all_positions = await cursor.fetchall()
+        # Hold every wallet so no trade lands between valuation and clearing the ledger
+        async with session.locks.hold_many(list(ledger.positions)):
+            # Get ALL user positions (the ledger is authoritative)
+            all_positions = ledger.all()
             
             if not all_positions:
-                print("⚠️ No trading positions found for auto-stop")
+                print("⚠️ No trading positions found for auto-stop, closing pool")
+                async with trading_pool.acquire() as db:
+                    await end_runs(db, [ledger.run_id])
+                    await db.commit()
+                await session.state.transition(CLOSED)
                 return
             
-            # Clear previous liquidation results
-            await db.execute("DELETE FROM liquidation_results")
-            
-            # Get current token price from DexScreener
-            if current_chain_id and current_token_address:
-                current_price = await get_token_price(current_chain_id, current_token_address)
-                print(f"💰 Real liquidation price from DexScreener: ${current_price:.6f}")
-            else:
-                current_price = get_fallback_price()
-                print(f"💰 Fallback liquidation price: ${current_price:.6f}")
-            
-            liquidation_summary = []
+            # Get current token price (tick stream or DexScreener)
+            current_price, tick_seq = await get_execution_price(session)
+            print(f"💰 Liquidation price: ${current_price:.6f} (tick {tick_seq})")
             
             print(f"⏰ TIMER EXPIRED!")
             print(f"🛑 AUTO-LIQUIDATING ALL USERS")
@@ -327,90 +942,80 @@ async def process_stop_decision(wallet_address: str):
             print(f"👥 Processing {len(all_positions)} users...")
             print("=" * 60)
             
-            # Liquidate ALL users
-            for position in all_positions:
-                (wallet_addr, starting_investment, current_investment_from_db, current_tokens_from_db, 
-                 buy_sell_calls_from_db, created_at, updated_at) = position
-                
-                current_investment = float(current_investment_from_db) if current_investment_from_db is not None else 0.0
-                current_tokens = float(current_tokens_from_db) if current_tokens_from_db is not None else 0.0
-                
-                # Liquidate tokens
-                if current_tokens > 0:
-                    liquidation_amount = current_tokens * current_price
-                    final_investment = current_investment + liquidation_amount
-                    tokens_liquidated = current_tokens
-                else:
-                    liquidation_amount = 0
-                    final_investment = current_investment
-                    tokens_liquidated = 0
-                
-                # Calculate profit/loss
-                profit_loss = final_investment - starting_investment
-                profit_loss_percentage = (profit_loss / starting_investment) * 100 if starting_investment > 0 else 0
+            # Liquidate ALL users (vectorized over the whole ledger)
+            liquidation = liquidate(all_positions, current_price)
+            if LIQUIDATION_LOG_USERS:
+                liquidation.print_users()
+            
+            # Drop in-memory positions first so a pending flush cannot re-insert them,
+            # then write the run's pending journal rows ahead of its liquidation sales.
+            # The snapshot brings them back if the results never get committed
+            snapshot = ledger.snapshot()
+            await ledger.reset()
+            session.leaderboard.clear()
+            await ledger.flush()
+            
+            async with trading_pool.acquire() as db:
+                # Clear previous liquidation results
+                await db.execute("DELETE FROM liquidation_results WHERE session_id = ?", (session.session_id,))
                 
                 # Store in liquidation_results table
-                await db.execute("""
+                await db.executemany("""
                     INSERT INTO liquidation_results 
-                    (wallet_address, starting_investment, final_investment, tokens_liquidated, 
-                     liquidation_value, profit_loss, profit_loss_percentage, liquidation_price)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (wallet_addr, starting_investment, final_investment, tokens_liquidated,
-                      liquidation_amount, profit_loss, profit_loss_percentage, current_price))
+                    (session_id, wallet_address, starting_investment, final_investment, tokens_liquidated, 
+                     liquidation_value, profit_loss, profit_loss_percentage, liquidation_price,
+                     liquidation_tick_seq)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, liquidation.result_rows(session.session_id, tick_seq))
                 
-                liquidation_summary.append({
-                    "wallet_address": wallet_addr,
-                    "tokens_liquidated": tokens_liquidated,
-                    "liquidation_value": liquidation_amount,
-                    "final_investment": final_investment,
-                    "profit_loss": profit_loss,
-                    "profit_loss_percentage": profit_loss_percentage
-                })
+                # Clear trading positions
+                await db.execute("DELETE FROM trading_positions WHERE session_id = ?", (session.session_id,))
                 
-                # Print individual summary
-                status_icon = "📈" if profit_loss >= 0 else "📉"
-                print(f"{status_icon} {wallet_addr[:10]}...")
-                print(f"   Tokens liquidated: {tokens_liquidated:.4f} → ${liquidation_amount:.2f}")
-                print(f"   Final amount: ${final_investment:.2f}")
-                print(f"   P&L: ${profit_loss:.2f} ({profit_loss_percentage:.2f}%)")
-                print("-" * 40)
-            
-            # Clear trading positions
-            await db.execute("DELETE FROM trading_positions")
-            
-            # Set pool to closed
-            await db.execute("""
-                UPDATE pool_settings 
-                SET is_over = TRUE, updated_at = CURRENT_TIMESTAMP 
-                WHERE id = 1
-            """)
-            await db.commit()
+                # Set pool to closed in the same transaction
+                await db.execute("""
+                    UPDATE pool_settings 
+                    SET is_over = TRUE, state = ?, updated_at = CURRENT_TIMESTAMP 
+                    WHERE session_id = ?
+                """, (CLOSED, session.session_id))
+                
+                # Archive the run's results and journal every final sale
+                await archive_run(db, ledger.run_id, session.session_id, liquidation, tick_seq)
+                await db.commit()
+            snapshot = None
+            session.state.restore(CLOSED)
             
-            # Generate session ID and update leaderboard
-            session_id = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            await update_leaderboard(liquidation_summary, session_id, current_price)
+            # Update this session's leaderboard
+            session_id = session.session_id
+            await update_leaderboard(liquidation, session_id)
+            await compact_expired_runs()
             
             # Print final summary
-            total_liquidation = sum(item["liquidation_value"] for item in liquidation_summary)
-            avg_profit_loss = sum(item["profit_loss_percentage"] for item in liquidation_summary) / len(liquidation_summary)
-            winners = len([item for item in liquidation_summary if item["profit_loss"] >= 0])
-            losers = len(liquidation_summary) - winners
+            totals = liquidation.totals()
+            event_hub.publish(session_id, "liquidation", {
+                "session_id": session_id,
+                "price": current_price,
+                "tick_seq": tick_seq,
+                **totals
+            })
             
             print("=" * 60)
             print(f"🏁 SESSION ENDED - FINAL RESULTS:")
-            print(f"   👥 Total users liquidated: {len(liquidation_summary)}")
-            print(f"   💰 Total liquidation value: ${total_liquidation:.2f}")
-            print(f"   📊 Average P&L: {avg_profit_loss:.2f}%")
-            print(f"   🏆 Winners: {winners} | 💸 Losers: {losers}")
+            print(f"   👥 Total users liquidated: {totals['users']}")
+            print(f"   💰 Total liquidation value: ${totals['total_liquidation']:.2f}")
+            print(f"   📊 Average P&L: {totals['average_profit_loss_percentage']:.2f}%")
+            print(f"   🏆 Winners: {totals['winners']} | 💸 Losers: {totals['losers']}")
             print(f"   💾 Results stored in liquidation_results table")
             print(f"   📊 Leaderboard updated with session: {session_id}")
             print(f"   🔒 POOL LOCKED - Waiting for new users to restart")
             print("=" * 60)
-                
-        timer_active = False
     except Exception as e:
-        timer_active = False
         print(f"❌ Error in process_stop_decision: {str(e)}")
+        # Liquidation did not commit: put the positions back before trading resumes,
+        # otherwise the next flush would overwrite the persisted ones with defaults
+        if snapshot is not None:
+            await restore_positions(session, snapshot)
+        if session.state.current == LIQUIDATING:
+            await session.state.transition(OPEN)
 
 # API Endpoints
 @app.post("/find_boosted_tokens")
@@ -471,9 +1076,8 @@ async def find_boosted_tokens(request: QueryRequest):
 async def initialize_pool_database():
     """Initialize legacy pool database"""
     os.makedirs("database", exist_ok=True)
-    db_path = os.path.join("database", "pool.db")
 
-    async with aiosqlite.connect(db_path) as db:
+    async with aiosqlite.connect(POOL_DB_PATH) as db:
         await db.execute("DROP TABLE IF EXISTS betting_pool")
         await db.execute("""
             CREATE TABLE betting_pool (
@@ -500,10 +1104,9 @@ async def initialize_pool_database():
 async def add_users(request: BulkUserRequest):
     """
     WORKFLOW: Reset pool → Add users → Start timer → Open trading
-    Now requires chainId and tokenAddress for real price fetching
+    Now requires chainId and tokenAddress for real price fetching.
+    Only the pool named by session_id is reset; other sessions keep running.
     """
-    global timer_task, timer_active, current_chain_id, current_token_address
-    
     # Validate input
     if len(request.names) != len(request.wallet_addresses):
         raise HTTPException(
@@ -521,171 +1124,174 @@ async def add_users(request: BulkUserRequest):
     if not request.tokenAddress or not request.tokenAddress.strip():
         raise HTTPException(status_code=400, detail="tokenAddress is required and cannot be empty.")
     
-    print("🔄 STARTING NEW TRADING SESSION...")
+    session_id = request.session_id.strip()
+    if not session_id:
+        raise HTTPException(status_code=400, detail="session_id cannot be empty.")
+    
+    print(f"🔄 STARTING NEW TRADING SESSION {session_id}...")
     
     # Store token info for this session
-    current_chain_id = request.chainId.strip()
-    current_token_address = request.tokenAddress.strip()
+    session = sessions.create(session_id, request.chainId.strip(), request.tokenAddress.strip())
     
-    print(f"🪙 Token Info: Chain {current_chain_id}, Address {current_token_address}")
+    print(f"🪙 Token Info: Chain {session.chain_id}, Address {session.token_address}")
     
     # Test price fetching
     try:
-        test_price = await get_token_price(current_chain_id, current_token_address)
+        test_price = await get_token_price(session.chain_id, session.token_address)
         print(f"💰 Current token price: ${test_price:.6f}")
     except Exception as e:
         print(f"⚠️ Price fetch test failed: {str(e)}")
 
     # STEP 1: Reset pool
     print("1️⃣ Resetting trading pool...")
-    if timer_task is not None:
-        timer_task.cancel()
-        timer_task = None
+    if await scheduler.cancel(session_id):
         print("   ⏹️ Previous timer cancelled")
     
-    await reset_trading_db()
-    print("   🗑️ All trading data cleared")
+    await reset_session(session)
+    print("   🗑️ Session trading data cleared")
     
     # STEP 2: Add users
     print("2️⃣ Adding users...")
-    os.makedirs("database", exist_ok=True)
-    users_db_path = os.path.join("database", "users.db")
     
     try:
-        async with aiosqlite.connect(users_db_path) as db:
-            # Reset users table
-            await db.execute("DROP TABLE IF EXISTS users")
-            await db.execute("""
-                CREATE TABLE users (
-                    wallet_address TEXT PRIMARY KEY CHECK(length(wallet_address) <= 255),
-                    name TEXT NOT NULL CHECK(length(name) <= 100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        async with users_pool.acquire() as db:
+            # Reset this session's users (schema is created at startup)
+            await db.execute("DELETE FROM users WHERE session_id = ?", (session_id,))
             
             results = []
             created_count = 0
             error_count = 0
             
-            # Process each user
-            for i, (name, wallet_address) in enumerate(zip(request.names, request.wallet_addresses)):
-                try:
-                    if not name or not name.strip():
+            if request.bulk:
+                # Bulk ingest: validated in one pass, inserted in one statement
+                created_users, rejected = await insert_users_bulk(
+                    db, session_id, request.names, request.wallet_addresses
+                )
+                created_count = len(created_users)
+                error_count = len(rejected)
+            else:
+                # Process each user
+                for i, (name, wallet_address) in enumerate(zip(request.names, request.wallet_addresses)):
+                    try:
+                        if not name or not name.strip():
+                            results.append({
+                                "index": i,
+                                "name": name,
+                                "wallet_address": wallet_address,
+                                "status": "error",
+                                "message": "Name cannot be empty"
+                            })
+                            error_count += 1
+                            continue
+                    
+                        if not wallet_address or not wallet_address.strip():
+                            results.append({
+                                "index": i,
+                                "name": name,
+                                "wallet_address": wallet_address,
+                                "status": "error",
+                                "message": "Wallet address cannot be empty"
+                            })
+                            error_count += 1
+                            continue
+                    
+                        # Insert user
+                        await db.execute("""
+                            INSERT INTO users (session_id, wallet_address, name) 
+                            VALUES (?, ?, ?)
+                        """, (session_id, wallet_address.strip(), name.strip()))
+                    
+                        created_count += 1
                         results.append({
                             "index": i,
-                            "name": name,
-                            "wallet_address": wallet_address,
-                            "status": "error",
-                            "message": "Name cannot be empty"
+                            "name": name.strip(),
+                            "wallet_address": wallet_address.strip(),
+                            "status": "success",
+                            "action": "created"
                         })
-                        error_count += 1
-                        continue
                     
-                    if not wallet_address or not wallet_address.strip():
+                    except Exception as e:
                         results.append({
                             "index": i,
                             "name": name,
                             "wallet_address": wallet_address,
                             "status": "error",
-                            "message": "Wallet address cannot be empty"
+                            "message": str(e)
                         })
                         error_count += 1
-                        continue
-                    
-                    # Insert user
-                    await db.execute("""
-                        INSERT INTO users (wallet_address, name) 
-                        VALUES (?, ?)
-                    """, (wallet_address.strip(), name.strip()))
-                    
-                    created_count += 1
-                    results.append({
-                        "index": i,
-                        "name": name.strip(),
-                        "wallet_address": wallet_address.strip(),
-                        "status": "success",
-                        "action": "created"
-                    })
-                    
-                except Exception as e:
-                    results.append({
-                        "index": i,
-                        "name": name,
-                        "wallet_address": wallet_address,
-                        "status": "error",
-                        "message": str(e)
-                    })
-                    error_count += 1
             
             await db.commit()
             print(f"   👥 {created_count} users added successfully")
+            if request.bulk:
+                session.leaderboard.names = created_users
+            else:
+                session.leaderboard.names = {
+                    item["wallet_address"]: item["name"] for item in results if item["status"] == "success"
+                }
             
-            # STEP 3: Start timer
-            if created_count > 0:
-                print("3️⃣ Starting 10-minute trading session...")
-                timer_task = asyncio.create_task(auto_stop_pool())
-                timer_active = True
-                print("   ⏰ Timer started - Auto-liquidation in 10 minutes")
-                
-                # STEP 4: Open pool
-                print("4️⃣ Opening pool for trading...")
-                await set_pool_status(False)
-                print("   🟢 Pool is now ACTIVE - Users can start trading!")
-                
-                print("=" * 50)
-                print("🚀 NEW TRADING SESSION STARTED!")
-                print(f"   👥 Participants: {created_count}")
-                print(f"   ⏱️ Duration: 10 minutes")
-                print(f"   💰 Starting balance: $1000 each")
-                print("=" * 50)
+        # STEP 3: Start timer (after releasing the users connection; these writes borrow their own)
+        if created_count > 0:
+            print("3️⃣ Starting 10-minute trading session...")
+            deadline = time.time() + POOL_DURATION_SECONDS
+            await scheduler.schedule(session_id, deadline)
+            print(f"   ⏰ Deadline set - Auto-liquidation at {format_timestamp(deadline)} UTC")
             
-            return {
-                "message": f"NEW TRADING SESSION STARTED! {created_count} users added, 10-minute timer started, pool opened for trading",
-                "session_info": {
-                    "users_added": created_count,
-                    "session_duration_minutes": 10,
-                    "starting_balance_per_user": 1000.00,
-                    "pool_status": "ACTIVE",
-                    "timer_started": True
-                },
-                "summary": {
-                    "total_processed": len(request.names),
-                    "created": created_count,
-                    "updated": 0,
-                    "errors": error_count
-                },
-                "workflow_completed": {
-                    "step_1_pool_reset": True,
-                    "step_2_users_added": created_count > 0,
-                    "step_3_timer_started": created_count > 0,
-                    "step_4_pool_opened": created_count > 0
-                },
-                "results": results
-            }
+            # STEP 4: Open pool
+            print("4️⃣ Opening pool for trading...")
+            await session.state.transition(OPEN)
+            print("   🟢 Pool is now ACTIVE - Users can start trading!")
             
+            print("=" * 50)
+            print("🚀 NEW TRADING SESSION STARTED!")
+            print(f"   👥 Participants: {created_count}")
+            print(f"   ⏱️ Duration: 10 minutes")
+            print(f"   💰 Starting balance: $1000 each")
+            print("=" * 50)
+        
+        response = {
+            "message": f"NEW TRADING SESSION STARTED! {created_count} users added, 10-minute timer started, pool opened for trading",
+            "session_info": {
+                "session_id": session_id,
+                "users_added": created_count,
+                "session_duration_minutes": 10,
+                "starting_balance_per_user": 1000.00,
+                "pool_status": "ACTIVE",
+                "timer_started": created_count > 0,
+                "ends_at": format_timestamp(scheduler.deadline_of(session_id)) if created_count > 0 else None
+            },
+            "summary": {
+                "total_processed": len(request.names),
+                "created": created_count,
+                "updated": 0,
+                "errors": error_count
+            },
+            "workflow_completed": {
+                "step_1_pool_reset": True,
+                "step_2_users_added": created_count > 0,
+                "step_3_timer_started": created_count > 0,
+                "step_4_pool_opened": created_count > 0
+            }
+        }
+        if request.bulk:
+            response["rejected"] = rejected
+        else:
+            response["results"] = results
+        return response
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.get("/all_users")
-async def get_all_users():
-    """Get all users from database"""
-    users_db_path = os.path.join("database", "users.db")
-    
-    if not os.path.exists(users_db_path):
-        return {
-            "users": [],
-            "total_count": 0,
-            "message": "No users database found. Add some users first."
-        }
-    
+async def get_all_users(session_id: str = DEFAULT_SESSION_ID):
+    """Get all users of a session from database"""
     try:
-        async with aiosqlite.connect(users_db_path) as db:
+        async with users_pool.acquire() as db:
             cursor = await db.execute("""
                 SELECT wallet_address, name, created_at, updated_at 
                 FROM users 
+                WHERE session_id = ?
                 ORDER BY created_at DESC
-            """)
+            """, (session_id,))
             rows = await cursor.fetchall()
             
             users = []
@@ -709,60 +1315,41 @@ async def get_all_users():
 @app.post("/decision")
 async def make_trading_decision(request: DecisionRequest):
     """Execute trading decisions: buy, sell, or stop - now with real token prices"""
-    global current_chain_id, current_token_address
-    
     # Validate action
     if request.action.lower() not in ["buy", "sell", "stop"]:
         raise HTTPException(status_code=400, detail="Action must be 'buy', 'sell', or 'stop'")
     
-    await initialize_trading_db()
-    trading_db_path = os.path.join("database", "trading.db")
     action = request.action.lower()
+    session = get_session(request.session_id)
+    ledger = session.ledger
     
+    stopping = False
+    snapshot = None
     try:
-        async with aiosqlite.connect(trading_db_path) as db:
-            await db.execute("PRAGMA journal_mode=WAL")
+        # Same-wallet trades run strictly in order; stop liquidates everyone so it holds every wallet
+        if action == "stop":
+            # Leave OPEN before collecting the wallets, as process_stop_decision does: a trade
+            # that already passed the open check has its wallet in the ledger and is waited
+            # out below, later trades are rejected
+            if session.state.is_open and not scheduler.expired(session.session_id):
+                stopping = await session.state.transition(LIQUIDATING)
+            lock_scope = session.locks.hold_many([*ledger.positions, request.wallet_address])
+        else:
+            lock_scope = session.locks.hold(request.wallet_address)
+        
+        async with lock_scope:
+            # Past the deadline the pool is closing (or closed); no DB lookup needed
+            if not stopping and scheduler.expired(session.session_id):
+                return {
+                    "message": "Trading session has ended. Pool is being liquidated.",
+                    "wallet_address": request.wallet_address,
+                    "action": action,
+                    "status": "rejected",
+                    "pool_status": "closed"
+                }
             
-            # Get or create user position
-            cursor = await db.execute(
-                "SELECT * FROM trading_positions WHERE wallet_address = ?",
-                (request.wallet_address,)
-            )
-            existing_position = await cursor.fetchone()
-            
-            if not existing_position:
-                # Create new position
-                starting_amount = 1000.0
-                await db.execute("""
-                    INSERT INTO trading_positions 
-                    (wallet_address, starting_investment, current_investment, current_tokens, buy_sell_calls)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (request.wallet_address, starting_amount, starting_amount, 0.0, 0))
-                await db.commit()
-                
-                cursor = await db.execute(
-                    "SELECT * FROM trading_positions WHERE wallet_address = ?",
-                    (request.wallet_address,)
-                )
-                existing_position = await cursor.fetchone()
-                is_first_trade = True
-            else:
-                is_first_trade = False
-            
-            # Unpack position data
-            (wallet_address, starting_investment, current_investment_from_db, current_tokens_from_db, 
-             buy_sell_calls_from_db, created_at, updated_at) = existing_position
-            
-            current_investment = float(current_investment_from_db) if current_investment_from_db is not None else 0.0
-            current_tokens = float(current_tokens_from_db) if current_tokens_from_db is not None else 0.0
-            buy_sell_calls = int(buy_sell_calls_from_db) if buy_sell_calls_from_db is not None else 0
-            
-            # Check pool status
-            pool_cursor = await db.execute("SELECT is_over FROM pool_settings WHERE id = 1")
-            pool_result = await pool_cursor.fetchone()
-            pool_is_over = pool_result[0] if pool_result else False
-            
-            if pool_is_over:
+            # Check pool status (in memory)
+            if not stopping and not session.state.is_open:
                 return {
                     "message": "Trading pool is closed. No further actions allowed for any users.",
                     "wallet_address": request.wallet_address,
@@ -771,175 +1358,110 @@ async def make_trading_decision(request: DecisionRequest):
                     "pool_status": "closed"
                 }
             
+            # Get or create user position (in memory, persisted by the ledger flusher)
+            position, is_first_trade = ledger.get_or_create(request.wallet_address)
+            if is_first_trade:
+                session.leaderboard.update(position)
+            
             # Store original values
-            original_investment = current_investment
-            original_tokens = current_tokens
-            original_trade_count = buy_sell_calls
-            if current_chain_id and current_token_address:
-                current_price = await get_token_price(current_chain_id, current_token_address)
-                print(f"💰 Real-time price from DexScreener: ${current_price:.6f}")
-            else:
-                current_price = get_fallback_price()
-                print(f"💰 Using fallback price: ${current_price:.6f}")
+            original_investment = position.current_investment
+            original_tokens = position.current_tokens
+            original_trade_count = position.buy_sell_calls
             
-            if action == "buy":
-                if current_investment <= 0:
-                    return {
-                        "message": f"Insufficient funds: No investment available for buying tokens. Current balance: ${current_investment:.2f}",
-                        "wallet_address": request.wallet_address,
-                        "action": action,
-                        "status": "failed",
-                        "current_investment": current_investment,
-                        "required_minimum": 0.01,
-                        "is_first_trade": is_first_trade
-                    }
-                
-                buy_percentage = random.uniform(0.1, 0.5)
-                buy_amount = current_investment * buy_percentage
-                
-                if buy_amount < 0.01:
-                    return {
-                        "message": f"Insufficient funds: Available ${current_investment:.2f}, but minimum buy amount is $0.01",
-                        "wallet_address": request.wallet_address,
-                        "action": action,
-                        "status": "failed",
-                        "current_investment": current_investment,
-                        "attempted_buy_amount": buy_amount,
-                        "required_minimum": 0.01,
-                        "is_first_trade": is_first_trade
-                    }
-                
-                tokens_purchased = buy_amount / current_price
-                new_current_investment = current_investment - buy_amount
-                new_current_tokens = current_tokens + tokens_purchased
-                new_buy_sell_calls = buy_sell_calls + 1
-                
-                await db.execute("""
-                    UPDATE trading_positions 
-                    SET current_investment = ?, current_tokens = ?, buy_sell_calls = ?, 
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE wallet_address = ?
-                """, (new_current_investment, new_current_tokens, new_buy_sell_calls, request.wallet_address))
-                await db.commit()
-                
-                result_message = f"Buy order executed: ${buy_amount:.2f} spent from available ${current_investment:.2f}, {tokens_purchased:.4f} tokens purchased at ${current_price:.4f}"
-                
-            elif action == "sell":
-                if current_tokens <= 0:
-                    return {
-                        "message": "No tokens available: Cannot sell when token balance is zero",
-                        "wallet_address": request.wallet_address,
-                        "action": action,
-                        "status": "failed",
-                        "current_tokens": current_tokens,
-                        "current_investment": current_investment,
-                        "is_first_trade": is_first_trade
-                    }
-                
-                sell_percentage = random.uniform(0.1, 0.5)
-                tokens_to_sell = current_tokens * sell_percentage
-                
-                if tokens_to_sell < 0.0001:
-                    return {
-                        "message": f"Insufficient tokens: Have {current_tokens:.6f} tokens, but minimum sell amount is 0.0001",
-                        "wallet_address": request.wallet_address,
-                        "action": action,
-                        "status": "failed",
-                        "current_tokens": current_tokens,
-                        "attempted_sell_tokens": tokens_to_sell,
-                        "required_minimum": 0.0001,
-                        "is_first_trade": is_first_trade
-                    }
-                
-                sell_amount = tokens_to_sell * current_price
+            current_price, tick_seq = await get_execution_price(session)
+            print(f"💰 Execution price: ${current_price:.6f} (tick {tick_seq})")
+            
+            current_investment = position.current_investment
+            current_tokens = position.current_tokens
+            
+            if action in ("buy", "sell"):
+                trade = execute_trade(position, action, current_price, tick_seq)
                 
-                if sell_amount < 0.01:
-                    return {
-                        "message": f"Sell amount too small: {tokens_to_sell:.6f} tokens worth only ${sell_amount:.6f} at current price ${current_price:.4f}",
+                if trade.status == "failed":
+                    failure = {
                         "wallet_address": request.wallet_address,
                         "action": action,
                         "status": "failed",
-                        "tokens_to_sell": tokens_to_sell,
-                        "sell_amount": sell_amount,
-                        "token_price": current_price,
                         "is_first_trade": is_first_trade
                     }
+                    if trade.reason == "no_funds":
+                        failure["message"] = f"Insufficient funds: No investment available for buying tokens. Current balance: ${current_investment:.2f}"
+                        failure["current_investment"] = current_investment
+                        failure["required_minimum"] = MIN_BUY_AMOUNT
+                    elif trade.reason == "below_min_buy":
+                        failure["message"] = f"Insufficient funds: Available ${current_investment:.2f}, but minimum buy amount is ${MIN_BUY_AMOUNT}"
+                        failure["current_investment"] = current_investment
+                        failure["attempted_buy_amount"] = trade.cash_amount
+                        failure["required_minimum"] = MIN_BUY_AMOUNT
+                    elif trade.reason == "no_tokens":
+                        failure["message"] = "No tokens available: Cannot sell when token balance is zero"
+                        failure["current_tokens"] = current_tokens
+                        failure["current_investment"] = current_investment
+                    elif trade.reason == "below_min_tokens":
+                        failure["message"] = f"Insufficient tokens: Have {current_tokens:.6f} tokens, but minimum sell amount is {MIN_SELL_TOKENS}"
+                        failure["current_tokens"] = current_tokens
+                        failure["attempted_sell_tokens"] = trade.token_amount
+                        failure["required_minimum"] = MIN_SELL_TOKENS
+                    else:
+                        failure["message"] = f"Sell amount too small: {trade.token_amount:.6f} tokens worth only ${trade.cash_amount:.6f} at current price ${current_price:.4f}"
+                        failure["tokens_to_sell"] = trade.token_amount
+                        failure["sell_amount"] = trade.cash_amount
+                        failure["token_price"] = current_price
+                    return failure
                 
-                new_current_tokens = current_tokens - tokens_to_sell
-                new_current_investment = current_investment + sell_amount
-                new_buy_sell_calls = buy_sell_calls + 1
-                
-                await db.execute("""
-                    UPDATE trading_positions 
-                    SET current_investment = ?, current_tokens = ?, buy_sell_calls = ?, 
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE wallet_address = ?
-                """, (new_current_investment, new_current_tokens, new_buy_sell_calls, request.wallet_address))
-                await db.commit()
+                ledger.mark_dirty(position)
+                ledger.record_trade(position, action, trade.cash_amount, trade.token_amount, current_price, tick_seq)
+                session.leaderboard.update(position)
+                await ledger.persist(position)
+                publish_trades(session, [fill_event(position, action, trade)], current_price, tick_seq)
                 
-                result_message = f"Sell order executed: {tokens_to_sell:.4f} tokens sold for ${sell_amount:.2f} at ${current_price:.4f}. New cash balance: ${new_current_investment:.2f}"
+                if action == "buy":
+                    result_message = f"Buy order executed: ${trade.cash_amount:.2f} spent from available ${current_investment:.2f}, {trade.token_amount:.4f} tokens purchased at ${current_price:.4f}"
+                else:
+                    result_message = f"Sell order executed: {trade.token_amount:.4f} tokens sold for ${trade.cash_amount:.2f} at ${current_price:.4f}. New cash balance: ${position.current_investment:.2f}"
                 
             elif action == "stop":
-                # Get ALL positions for liquidation
-                cursor = await db.execute("SELECT * FROM trading_positions")
-                all_positions = await cursor.fetchall()
+                # Liquidate ALL users in memory; the snapshot undoes it if the archive never commits
+                snapshot = ledger.snapshot()
+                liquidation = liquidate(ledger.all(), current_price)
+                if LIQUIDATION_LOG_USERS:
+                    liquidation.print_users()
+                totals = liquidation.totals()
                 
-                liquidation_summary = []
-                total_liquidation_value = 0
+                for wallet, final_investment in zip(liquidation.wallets, liquidation.final_investment.tolist()):
+                    pos = ledger.get(wallet)
+                    pos.current_investment = final_investment
+                    pos.current_tokens = 0.0
+                    pos.last_tick_seq = tick_seq
+                    ledger.mark_dirty(pos)
+                    session.leaderboard.update(pos)
+                # Every position changed, so recount the totals exactly instead of by difference
+                ledger.aggregates.rebuild(ledger.all())
+                await ledger.flush()
                 
-                # Liquidate ALL users
-                for position in all_positions:
-                    (pos_wallet, pos_starting, pos_current_inv, pos_current_tokens, 
-                     pos_calls, pos_created, pos_updated) = position
-                    
-                    pos_investment = float(pos_current_inv) if pos_current_inv is not None else 0.0
-                    pos_tokens = float(pos_current_tokens) if pos_current_tokens is not None else 0.0
-                    
-                    if pos_tokens > 0:
-                        pos_liquidation = pos_tokens * current_price
-                        pos_final = pos_investment + pos_liquidation
-                        total_liquidation_value += pos_liquidation
-                    else:
-                        pos_liquidation = 0
-                        pos_final = pos_investment
-                    
-                    await db.execute("""
-                        UPDATE trading_positions 
-                        SET current_investment = ?, current_tokens = 0, updated_at = CURRENT_TIMESTAMP
-                        WHERE wallet_address = ?
-                    """, (pos_final, pos_wallet))
-                    
-                    pos_profit_loss = pos_final - pos_starting
-                    pos_profit_percentage = (pos_profit_loss / pos_starting) * 100 if pos_starting > 0 else 0
-                    
-                    liquidation_summary.append({
-                        "wallet_address": pos_wallet,
-                        "tokens_liquidated": pos_tokens,
-                        "liquidation_value": pos_liquidation,
-                        "final_investment": pos_final,
-                        "profit_loss": pos_profit_loss,
-                        "profit_loss_percentage": pos_profit_percentage
-                    })
+                # Archive the run's results and journal every final sale
+                async with trading_pool.acquire() as db:
+                    await archive_run(db, ledger.run_id, session.session_id, liquidation, tick_seq)
+                    await db.commit()
                 
                 # Set pool to closed
-                await db.execute("""
-                    UPDATE pool_settings 
-                    SET is_over = TRUE, updated_at = CURRENT_TIMESTAMP 
-                    WHERE id = 1
-                """)
+                await session.state.transition(CLOSED)
                 
                 # Cancel timer
-                global timer_task
-                if timer_task is not None:
-                    timer_task.cancel()
-                    timer_task = None
+                await scheduler.cancel(session.session_id)
                 
-                # Generate session ID and update leaderboard
-                session_id = f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                await update_leaderboard(liquidation_summary, session_id, current_price)
+                # Update this session's leaderboard
+                await update_leaderboard(liquidation, session.session_id)
+                await compact_expired_runs()
+                event_hub.publish(session.session_id, "liquidation", {
+                    "session_id": session.session_id,
+                    "price": current_price,
+                    "tick_seq": tick_seq,
+                    **totals
+                })
                 
                 # Get triggering user's final details
-                triggering_user = next((item for item in liquidation_summary if item["wallet_address"] == request.wallet_address), None)
+                triggering_user = liquidation.result_for(request.wallet_address)
                 
                 if triggering_user:
                     user_final = triggering_user["final_investment"]
@@ -950,151 +1472,217 @@ async def make_trading_decision(request: DecisionRequest):
                     user_profit_loss = 0
                     user_profit_percentage = 0
                 
-                winners = len([item for item in liquidation_summary if item["profit_loss"] >= 0])
-                losers = len(liquidation_summary) - winners
-                
                 result_message = (
-                    f"POOL CLOSED! All {len(liquidation_summary)} users liquidated. "
-                    f"Total liquidation: ${total_liquidation_value:.2f}. "
-                    f"Winners: {winners}, Losers: {losers}. "
+                    f"POOL CLOSED! All {totals['users']} users liquidated. "
+                    f"Total liquidation: ${totals['total_liquidation']:.2f}. "
+                    f"Winners: {totals['winners']}, Losers: {totals['losers']}. "
                     f"Your final: ${user_final:.2f} (P&L: ${user_profit_loss:.2f}, {user_profit_percentage:.2f}%)"
                 )
             
-            # Get updated position for response
-            cursor = await db.execute(
-                "SELECT * FROM trading_positions WHERE wallet_address = ?",
-                (request.wallet_address,)
-            )
-            updated_position = await cursor.fetchone()
-            
-            # Get current pool status
-            pool_cursor = await db.execute("SELECT is_over FROM pool_settings WHERE id = 1")
-            pool_result = await pool_cursor.fetchone()
-            pool_status = pool_result[0] if pool_result else False
-            
             return {
                 "message": result_message,
+                "session_id": session.session_id,
                 "wallet_address": request.wallet_address,
                 "action": action,
                 "status": "success",
                 "token_price": current_price,
-                "pool_status": "closed" if pool_status else "active",
+                "tick_seq": tick_seq,
+                "pool_status": pool_status_text(session),
                 "is_first_trade": is_first_trade,
                 "position": {
-                    "starting_investment": updated_position[1],
-                    "current_investment": updated_position[2],
-                    "current_tokens": updated_position[3],
-                    "buy_sell_calls": updated_position[4]
+                    "starting_investment": position.starting_investment,
+                    "current_investment": position.current_investment,
+                    "current_tokens": position.current_tokens,
+                    "buy_sell_calls": position.buy_sell_calls
                 },
                 "debug_info": {
-                    "database_path": trading_db_path,
-                    "database_exists": os.path.exists(trading_db_path),
+                    "database_path": TRADING_DB_PATH,
+                    "ledger": ledger.stats(),
                     "previous_investment": original_investment,
                     "previous_tokens": original_tokens,
                     "trade_number": original_trade_count + 1,
                     "wallet_address": request.wallet_address
                 }
             }
-            
+        
     except Exception as e:
+        # A failed stop leaves the pool tradable, as it was before the request
+        if stopping and session.state.current == LIQUIDATING:
+            if snapshot is not None:
+                await restore_positions(session, snapshot)
+            await session.state.transition(OPEN)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/all_positions")
-async def get_all_positions():
-    """Get all user trading positions with profit/loss calculations - using real token prices"""
-    global current_chain_id, current_token_address
+@app.post("/decision/batch")
+async def make_batch_trading_decisions(request: BatchDecisionRequest):
+    """
+    Execute many wallets' buy/sell decisions in one request.
+    All trades fill at a single price snapshot and are persisted in one
+    transaction; results are compact (no per-trade message strings).
+    """
+    if len(request.decisions) == 0:
+        raise HTTPException(status_code=400, detail="Empty decision list provided.")
+    
+    session = get_session(request.session_id)
+    ledger = session.ledger
     
     try:
-        os.makedirs("database", exist_ok=True)
-        trading_db_path = os.path.join("database", "trading.db")
-        
-        if not os.path.exists(trading_db_path):
-            return {
-                "positions": [],
-                "total_users": 0,
-                "pool_status": "not_initialized",
-                "message": "No trading database found"
-            }
-        
-        async with aiosqlite.connect(trading_db_path) as db:
-            # Check if table exists
-            cursor = await db.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='trading_positions'
-            """)
-            table_exists = await cursor.fetchone()
-            
-            if not table_exists:
+        # Lock every wallet in the batch so single decisions cannot interleave with it
+        async with session.locks.hold_many(decision.wallet_address for decision in request.decisions):
+            if scheduler.expired(session.session_id) or not session.state.is_open:
                 return {
-                    "positions": [],
-                    "total_users": 0,
-                    "pool_status": "not_initialized",
-                    "message": "Trading positions table does not exist"
+                    "message": "Trading pool is closed. No further actions allowed for any users.",
+                    "status": "rejected",
+                    "pool_status": "closed",
+                    "results": []
                 }
             
-            # Get all positions
-            cursor = await db.execute("""
-                SELECT wallet_address, starting_investment, current_investment, 
-                       current_tokens, buy_sell_calls, created_at, updated_at
-                FROM trading_positions 
-                ORDER BY created_at DESC
-            """)
-            rows = await cursor.fetchall()
+            current_price, tick_seq = await get_execution_price(session)
             
-            positions = []
-            for row in rows:
-                current_cash = row[2]
-                current_token_count = row[3]
-                starting_investment = row[1]
-                
-                # Calculate token value
-            if current_chain_id and current_token_address:
-                current_price = await get_token_price(current_chain_id, current_token_address)
-            else:
-                current_price = get_fallback_price()
+            results = []
+            fills = []
+            executed_count = 0
+            failed_count = 0
             
-            positions = []
-            for row in rows:
-                current_cash = row[2]
-                current_token_count = row[3]
-                starting_investment = row[1]
+            for decision in request.decisions:
+                action = decision.action.lower()
+                if action not in ("buy", "sell"):
+                    results.append({
+                        "wallet_address": decision.wallet_address,
+                        "action": action,
+                        "status": "rejected",
+                        "reason": "unsupported_action"
+                    })
+                    failed_count += 1
+                    continue
                 
-                # Calculate token value using real price
-                token_value = current_token_count * current_price
-                total_current_value = current_cash + token_value
+                position, is_new = ledger.get_or_create(decision.wallet_address)
+                if is_new:
+                    session.leaderboard.update(position)
+                trade = execute_trade(position, action, current_price, tick_seq)
                 
-                profit_loss = total_current_value - starting_investment
-                profit_loss_percentage = (profit_loss / starting_investment * 100) if starting_investment > 0 else 0
+                if trade.status == "success":
+                    ledger.mark_dirty(position)
+                    ledger.record_trade(position, action, trade.cash_amount, trade.token_amount, current_price, tick_seq)
+                    session.leaderboard.update(position)
+                    fills.append(fill_event(position, action, trade))
+                    executed_count += 1
+                else:
+                    failed_count += 1
                 
-                positions.append({
-                    "wallet_address": row[0],
-                    "starting_investment": row[1],
-                    "current_investment": row[2],
-                    "current_tokens": row[3],
-                    "buy_sell_calls": row[4],
-                    "created_at": row[5],
-                    "updated_at": row[6],
-                    "current_token_value": token_value,
-                    "total_current_value": total_current_value,
-                    "profit_loss": profit_loss,
-                    "profit_loss_percentage": round(profit_loss_percentage, 2),
-                    "current_token_price": current_price  # Add current price to response
+                results.append({
+                    "wallet_address": decision.wallet_address,
+                    "action": action,
+                    "status": trade.status,
+                    "reason": trade.reason,
+                    "cash_amount": trade.cash_amount,
+                    "token_amount": trade.token_amount,
+                    "current_investment": position.current_investment,
+                    "current_tokens": position.current_tokens,
+                    "buy_sell_calls": position.buy_sell_calls
                 })
             
-            # Get pool status
-            try:
-                pool_status = await get_pool_status()
-                pool_status_text = "closed" if pool_status else "active"
-            except:
-                pool_status_text = "unknown"
+            # Persist the whole batch in a single transaction
+            await ledger.flush()
+            publish_trades(session, fills, current_price, tick_seq)
             
             return {
-                "positions": positions,
-                "total_users": len(positions),
-                "pool_status": pool_status_text,
-                "message": f"Found {len(positions)} trading positions"
+                "status": "success",
+                "session_id": session.session_id,
+                "pool_status": "active",
+                "token_price": current_price,
+                "tick_seq": tick_seq,
+                "summary": {
+                    "total": len(request.decisions),
+                    "executed": executed_count,
+                    "failed": failed_count
+                },
+                "results": results
             }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+async def build_positions(session, after: Optional[tuple], limit: Optional[int]) -> dict:
+    """/all_positions JSON body: every position, or one page when limit/after is given"""
+    # Positions come from the session's in-memory ledger, newest first
+    candidates = session.ledger.all()
+    if after is not None:
+        candidates = [position for position in candidates if position_sort_key(position) < after]
+    
+    current_price, tick_seq = await get_execution_price(session)
+    
+    next_cursor = None
+    if limit is None and after is None:
+        rows = sorted(candidates, key=position_sort_key, reverse=True)
+    else:
+        size = page_size(limit, PAGE_SIZE, PAGE_SIZE_MAX)
+        # Top of the remaining positions only: O(n log k) rather than a full sort
+        rows = heapq.nlargest(size + 1, candidates, key=position_sort_key)
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor(position_sort_key(rows[-1]))
+    
+    positions = [value_position(position, current_price, tick_seq) for position in rows]
+    
+    return {
+        "session_id": session.session_id,
+        "positions": positions,
+        "total_users": len(session.ledger),
+        "count": len(positions),
+        "next_cursor": next_cursor,
+        "totals": session.ledger.aggregates.summary(current_price),
+        "pool_status": pool_status_text(session),
+        "message": f"Found {len(positions)} trading positions"
+    }
+
+@app.get("/all_positions")
+async def get_all_positions(session_id: str = DEFAULT_SESSION_ID, limit: Optional[int] = None,
+                            cursor: Optional[str] = None,
+                            response_format: str = Query("json", alias="format"),
+                            if_none_match: Optional[str] = Header(None)):
+    """
+    Get user trading positions with profit/loss calculations - using real token prices.
+
+    Without limit/cursor every position is returned, as before, from a
+    snapshot rebuilt once per price tick or trade (ETag / If-None-Match).
+    ?limit= pages newest first and next_cursor continues the listing;
+    format=ndjson streams one position per line instead of building the
+    whole list.
+    """
+    session = get_session(session_id)
+    if response_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    after = decode_cursor(cursor, length=2)
+    if after is not None:
+        try:
+            after = (float(after[0]), str(after[1]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    try:
+        if response_format == "ndjson":
+            candidates = session.ledger.all()
+            if after is not None:
+                candidates = [position for position in candidates if position_sort_key(position) < after]
+            ordered = sorted(candidates, key=position_sort_key, reverse=True)
+            current_price, tick_seq = await get_execution_price(session)
             
+            async def records():
+                for position in ordered:
+                    yield value_position(position, current_price, tick_seq)
+            return ndjson_response(records())
+        
+        if limit is None and after is None:
+            version = (session.ledger.version, session.state.version, price_version(session))
+            snapshot = await snapshots.get(("all_positions", session_id), version,
+                                           lambda: build_positions(session, None, None))
+            return snapshot.response(if_none_match)
+        
+        return await build_positions(session, after, limit)
+            
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "positions": [],
@@ -1104,10 +1692,52 @@ async def get_all_positions():
         }
 
 @app.get("/db")
-async def get_database_info():
-    """Get database information in table format"""
+async def get_database_info(session_id: str = DEFAULT_SESSION_ID, table: Optional[str] = None,
+                            limit: Optional[int] = None, cursor: Optional[str] = None,
+                            response_format: str = Query("json", alias="format"),
+                            formatted: Optional[bool] = None):
+    """
+    Get database information for one session in table format.
+
+    With ?table= a single session table is paged (limit/cursor) or streamed
+    as NDJSON (format=ndjson) straight from SQLite. Those modes return raw
+    column values unless formatted=true; the full dump without table stays
+    formatted unless formatted=false.
+    """
+    session = get_session(session_id)
+    if response_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    if table is None and (limit is not None or cursor or response_format == "ndjson"):
+        raise HTTPException(status_code=400, detail=f"table is required to page or stream: {', '.join(DB_TABLES)}")
+    if table is not None and table not in DB_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of: {', '.join(DB_TABLES)}")
+    
+    if table is not None:
+        after = decode_cursor(cursor, length=2)
+        spec = DB_TABLES[table]
+        
+        # Write pending ledger changes so the raw table is current
+        if table == "trading_positions":
+            await session.ledger.flush()
+        
+        if response_format == "ndjson":
+            return ndjson_response(stream_table(table, session_id, after, bool(formatted)))
+        
+        rows, next_key = await fetch_table_page(table, session_id, after, page_size(limit, PAGE_SIZE, PAGE_SIZE_MAX))
+        return {
+            "session_id": session_id,
+            "table": table,
+            "title": spec["title"],
+            "headers": spec["headers"] if formatted else spec["columns"],
+            "rows": [spec["format_row"](row) if formatted else list(row) for row in rows],
+            "count": len(rows),
+            "next_cursor": encode_cursor(next_key) if next_key is not None else None
+        }
+    
+    formatted = formatted is not False
+    
     try:
-        trading_db_path = os.path.join("database", "trading.db")
+        trading_db_path = TRADING_DB_PATH
         
         if not os.path.exists(trading_db_path):
             return {
@@ -1117,127 +1747,70 @@ async def get_database_info():
                 "tables": {}
             }
         
-        async with aiosqlite.connect(trading_db_path) as db:
+        # Write pending ledger changes so the raw tables are current
+        await session.ledger.flush()
+        
+        async with trading_pool.acquire() as db:
             result = {
                 "database_exists": True,
                 "database_path": trading_db_path,
+                "session_id": session_id,
                 "tables": {}
             }
             
-            # Get trading_positions table (current session)
-            try:
-                cursor = await db.execute("""
-                    SELECT wallet_address, starting_investment, current_investment, 
-                           current_tokens, buy_sell_calls, created_at, updated_at
-                    FROM trading_positions 
-                    ORDER BY created_at DESC
-                """)
-                trading_rows = await cursor.fetchall()
-                
-                result["tables"]["trading_positions"] = {
-                    "title": "Current Trading Session (Active)",
-                    "headers": [
-                        "Wallet Address", 
-                        "Starting Investment", 
-                        "Current Investment", 
-                        "Current Tokens", 
-                        "Buy/Sell Calls", 
-                        "Created At", 
-                        "Updated At"
-                    ],
-                    "rows": [
-                        [
-                            row[0][:10] + "..." if len(row[0]) > 13 else row[0],
-                            f"${row[1]:.2f}" if row[1] is not None else "N/A",
-                            f"${row[2]:.2f}" if row[2] is not None else "N/A", 
-                            f"{row[3]:.4f}" if row[3] is not None else "0.0000",
-                            str(row[4]) if row[4] is not None else "0",
-                            row[5][:19] if row[5] else "N/A",
-                            row[6][:19] if row[6] else "N/A"
-                        ] for row in trading_rows
-                    ],
-                    "total_rows": len(trading_rows)
-                }
-            except Exception as e:
-                result["tables"]["trading_positions"] = {
-                    "title": "Current Trading Session",
-                    "error": f"Could not read trading_positions: {str(e)}",
-                    "headers": [],
-                    "rows": [],
-                    "total_rows": 0
-                }
-            
-            # Get liquidation_results table (previous session)
-            try:
-                cursor = await db.execute("""
-                    SELECT wallet_address, starting_investment, final_investment, 
-                           tokens_liquidated, liquidation_value, profit_loss, 
-                           profit_loss_percentage, liquidation_price, liquidated_at
-                    FROM liquidation_results 
-                    ORDER BY liquidated_at DESC
-                """)
-                liquidation_rows = await cursor.fetchall()
-                
-                result["tables"]["liquidation_results"] = {
-                    "title": "Previous Session Results (Final)",
-                    "headers": [
-                        "Wallet Address",
-                        "Starting Inv.",
-                        "Final Inv.", 
-                        "Tokens Liquidated",
-                        "Liquidation Value",
-                        "Profit/Loss",
-                        "P&L %",
-                        "Liquidation Price",
-                        "Liquidated At"
-                    ],
-                    "rows": [
-                        [
-                            row[0][:10] + "..." if len(row[0]) > 13 else row[0],
-                            f"${row[1]:.2f}" if row[1] is not None else "N/A",
-                            f"${row[2]:.2f}" if row[2] is not None else "N/A",
-                            f"{row[3]:.4f}" if row[3] is not None else "0.0000",
-                            f"${row[4]:.2f}" if row[4] is not None else "N/A",
-                            f"${row[5]:.2f}" if row[5] is not None else "N/A",
-                            f"{row[6]:.2f}%" if row[6] is not None else "N/A",
-                            f"${row[7]:.4f}" if row[7] is not None else "N/A",
-                            row[8][:19] if row[8] else "N/A"
-                        ] for row in liquidation_rows
-                    ],
-                    "total_rows": len(liquidation_rows)
-                }
-            except Exception as e:
-                result["tables"]["liquidation_results"] = {
-                    "title": "Previous Session Results",
-                    "error": f"Could not read liquidation_results: {str(e)}",
-                    "headers": [],
-                    "rows": [],
-                    "total_rows": 0
-                }
+            # Get trading_positions table (current session) and liquidation_results table (previous session)
+            for name, fallback_title in (("trading_positions", "Current Trading Session"),
+                                         ("liquidation_results", "Previous Session Results")):
+                spec = DB_TABLES[name]
+                try:
+                    cursor = await db.execute(f"""
+                        SELECT {", ".join(spec["columns"])}
+                        FROM {name}
+                        WHERE session_id = ?
+                        ORDER BY {spec["order_by"]} DESC, wallet_address DESC
+                    """, (session_id,))
+                    rows = await cursor.fetchall()
+                    
+                    result["tables"][name] = {
+                        "title": spec["title"],
+                        "headers": spec["headers"] if formatted else spec["columns"],
+                        "rows": [spec["format_row"](row) if formatted else list(row) for row in rows],
+                        "total_rows": len(rows)
+                    }
+                except Exception as e:
+                    result["tables"][name] = {
+                        "title": fallback_title,
+                        "error": f"Could not read {name}: {str(e)}",
+                        "headers": [],
+                        "rows": [],
+                        "total_rows": 0
+                    }
             
             # Get pool_settings table
             try:
                 cursor = await db.execute("""
-                    SELECT id, is_over, created_at, updated_at
+                    SELECT session_id, state, token_address, created_at, updated_at
                     FROM pool_settings 
-                    ORDER BY id
+                    ORDER BY session_id
                 """)
                 pool_rows = await cursor.fetchall()
                 
                 result["tables"]["pool_settings"] = {
-                    "title": "Pool Status",
+                    "title": "Pool Status (all sessions)",
                     "headers": [
-                        "ID", 
+                        "Session", 
                         "Pool Status", 
+                        "Token Address", 
                         "Created At", 
                         "Updated At"
                     ],
                     "rows": [
                         [
-                            str(row[0]),
-                            "LOCKED" if row[1] else "ACTIVE",
-                            row[2][:19] if row[2] else "N/A",
-                            row[3][:19] if row[3] else "N/A"
+                            row[0],
+                            {OPEN: "ACTIVE", CLOSED: "LOCKED"}.get(row[1], row[1].upper()),
+                            row[2] or "N/A",
+                            row[3][:19] if row[3] else "N/A",
+                            row[4][:19] if row[4] else "N/A"
                         ] for row in pool_rows
                     ],
                     "total_rows": len(pool_rows)
@@ -1253,10 +1826,10 @@ async def get_database_info():
             
             # Get summary statistics
             try:
-                cursor = await db.execute("SELECT COUNT(*) FROM trading_positions")
+                cursor = await db.execute("SELECT COUNT(*) FROM trading_positions WHERE session_id = ?", (session_id,))
                 positions_count = (await cursor.fetchone())[0]
                 
-                cursor = await db.execute("SELECT COUNT(*) FROM liquidation_results")
+                cursor = await db.execute("SELECT COUNT(*) FROM liquidation_results WHERE session_id = ?", (session_id,))
                 liquidation_count = (await cursor.fetchone())[0]
                 
                 cursor = await db.execute("SELECT COUNT(*) FROM pool_settings")
@@ -1283,37 +1856,54 @@ async def get_database_info():
             "tables": {}
         }
 
+async def build_pool_status(session, timed_out: bool = False) -> dict:
+    """Body of /pool_status, answered from memory"""
+    pool_is_over = not session.state.is_open
+    return {
+        "session_id": session.session_id,
+        "pool_status": pool_status_text(session),
+        "pool_state": session.state.current,
+        "timed_out": timed_out,
+        "message": "Pool is closed - no trading allowed" if pool_is_over else "Pool is active - trading allowed"
+    }
+
 @app.get("/pool_status")
-async def check_pool_status():
-    """Check if the trading pool is active or closed"""
+async def check_pool_status(session_id: str = DEFAULT_SESSION_ID, wait_for: Optional[str] = None,
+                            timeout: float = 30.0, if_none_match: Optional[str] = Header(None)):
+    """
+    Check if a session's trading pool is active or closed (answered from memory).
+    With wait_for=open|liquidating|closed, long-polls until the pool reaches that state.
+    """
+    session = get_session(session_id)
+    
+    if wait_for is None:
+        snapshot = await snapshots.get(("pool_status", session_id), session.state.version,
+                                       lambda: build_pool_status(session))
+        return snapshot.response(if_none_match)
+    
+    if wait_for not in (OPEN, LIQUIDATING, CLOSED):
+        raise HTTPException(status_code=400, detail="wait_for must be 'open', 'liquidating' or 'closed'")
+    timed_out = False
     try:
-        await initialize_trading_db()
-        pool_is_over = await get_pool_status()
-        
-        return {
-            "pool_status": "closed" if pool_is_over else "active",
-            "message": "Pool is closed - no trading allowed" if pool_is_over else "Pool is active - trading allowed"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        await session.state.wait_for(wait_for, timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    return await build_pool_status(session, timed_out)
 
 @app.post("/reset_pool")
-async def reset_pool():
-    """DANGER: Complete reset - deletes ALL data and reopens pool"""
-    global timer_task, timer_active
+async def reset_pool(session_id: str = DEFAULT_SESSION_ID):
+    """DANGER: Complete reset - deletes ALL of a session's data and reopens its pool"""
+    session = get_session(session_id)
     
     try:
         # Cancel timer
-        if timer_task is not None:
-            timer_task.cancel()
-            timer_task = None
-            timer_active = False
+        if await scheduler.cancel(session_id):
             print("🛑 Auto-stop timer cancelled due to pool reset")
         
-        await initialize_trading_db()
+        await reset_session(session)
         return {
             "message": "⚠️ COMPLETE RESET: All user positions and history deleted. Pool reopened.",
+            "session_id": session_id,
             "pool_status": "active",
             "warning": "All trading data has been permanently lost",
             "timer_info": {
@@ -1326,23 +1916,22 @@ async def reset_pool():
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.post("/reopen_pool")
-async def reopen_pool():
-    """Reopen the pool without losing user data"""
-    global timer_task, timer_active
+async def reopen_pool(session_id: str = DEFAULT_SESSION_ID):
+    """Reopen a session's pool without losing user data"""
+    session = get_session(session_id)
+    if session.state.current == LIQUIDATING:
+        raise HTTPException(status_code=409, detail="Pool is being liquidated and cannot be reopened yet.")
     
     try:
-        await initialize_trading_db()
-        await set_pool_status(False)
+        await session.state.transition(OPEN)
         
         # Cancel timer
-        if timer_task is not None:
-            timer_task.cancel()
-            timer_task = None
-            timer_active = False
+        if await scheduler.cancel(session_id):
             print("🛑 Auto-stop timer cancelled due to manual pool reopen")
         
         return {
             "message": "Pool reopened successfully. All user positions preserved.",
+            "session_id": session_id,
             "pool_status": "active",
             "note": "Users can resume trading with their existing positions",
             "timer_info": {
@@ -1354,15 +1943,71 @@ async def reopen_pool():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/leaderboard")
-async def get_current_leaderboard():
+LEADERBOARD_COLUMNS = """
+    wallet_address, name, starting_investment, final_investment,
+    tokens_liquidated, liquidation_value, profit_loss,
+    profit_loss_percentage, liquidation_price, rank_position,
+    liquidated_at, session_id
+"""
+
+def leaderboard_entry(row) -> dict:
+    """One ranked current_leaderboard row with its medal and status"""
+    rank = row[9]
+    if rank == 1:
+        medal = "🥇"
+        status = "WINNER"
+    elif rank == 2:
+        medal = "🥈"
+        status = "RUNNER-UP"
+    elif rank == 3:
+        medal = "🥉"
+        status = "THIRD PLACE"
+    else:
+        medal = f"#{rank}"
+        status = "PARTICIPANT"
+    
+    return {
+        "rank": rank,
+        "medal": medal,
+        "status": status,
+        "wallet_address": row[0],
+        "name": row[1],
+        "starting_investment": row[2],
+        "final_investment": row[3],
+        "tokens_liquidated": row[4],
+        "liquidation_value": row[5],
+        "profit_loss": row[6],
+        "profit_loss_percentage": row[7],
+        "liquidation_price": row[8],
+        "pnl_indicator": "📈" if row[6] >= 0 else "📉",
+        "liquidated_at": row[10]
+    }
+
+async def build_leaderboard(session_id: str, limit: Optional[int] = None) -> dict:
     """
-    Get current session leaderboard with rankings
+    Body of /leaderboard: a session's latest leaderboard with rankings.
+    Rows come from the (session_id, rank_position) index, top `limit` only
+    when given; the statistics are SQL aggregates over the whole session.
     """
-    try:
-        leaderboard_db_path = os.path.join("database", "leaderboard.db")
+    async with leaderboard_pool.acquire() as db:
+        # Get leaderboard data ordered by rank
+        cursor = await db.execute(f"""
+            SELECT {LEADERBOARD_COLUMNS}
+            FROM current_leaderboard 
+            WHERE session_id = ?
+            ORDER BY rank_position ASC
+            LIMIT ?
+        """, (session_id, -1 if limit is None else limit))
+        rows = await cursor.fetchall()
+        
+        cursor = await db.execute("""
+            SELECT COUNT(*), TOTAL(profit_loss), TOTAL(profit_loss >= 0)
+            FROM current_leaderboard
+            WHERE session_id = ?
+        """, (session_id,))
+        participants, total_profit_loss, winners = await cursor.fetchone()
         
-        if not os.path.exists(leaderboard_db_path):
+        if not participants:
             return {
                 "leaderboard": [],
                 "total_participants": 0,
@@ -1370,106 +2015,80 @@ async def get_current_leaderboard():
                     "session_id": None,
                     "liquidated_at": None
                 },
-                "message": "No leaderboard data found. Complete a trading session first."
+                "message": "No leaderboard data available"
             }
         
-        async with aiosqlite.connect(leaderboard_db_path) as db:
-            # Get leaderboard data ordered by rank
-            cursor = await db.execute("""
-                SELECT wallet_address, name, starting_investment, final_investment,
-                       tokens_liquidated, liquidation_value, profit_loss, 
-                       profit_loss_percentage, liquidation_price, rank_position,
-                       liquidated_at, session_id
-                FROM current_leaderboard 
-                ORDER BY rank_position ASC
-            """)
-            rows = await cursor.fetchall()
-            
-            if not rows:
-                return {
-                    "leaderboard": [],
-                    "total_participants": 0,
-                    "session_info": {
-                        "session_id": None,
-                        "liquidated_at": None
-                    },
-                    "message": "No leaderboard data available"
-                }
-            
-            leaderboard = []
-            for row in rows:
-                # Determine medal/status
-                rank = row[9]
-                if rank == 1:
-                    medal = "🥇"
-                    status = "WINNER"
-                elif rank == 2:
-                    medal = "🥈"
-                    status = "RUNNER-UP"
-                elif rank == 3:
-                    medal = "🥉"
-                    status = "THIRD PLACE"
-                else:
-                    medal = f"#{rank}"
-                    status = "PARTICIPANT"
-                
-                # Determine profit/loss indicator
-                pnl_indicator = "📈" if row[6] >= 0 else "📉"
-                
-                leaderboard.append({
-                    "rank": rank,
-                    "medal": medal,
-                    "status": status,
-                    "wallet_address": row[0],
-                    "name": row[1],
-                    "starting_investment": row[2],
-                    "final_investment": row[3],
-                    "tokens_liquidated": row[4],
-                    "liquidation_value": row[5],
-                    "profit_loss": row[6],
-                    "profit_loss_percentage": row[7],
-                    "liquidation_price": row[8],
-                    "pnl_indicator": pnl_indicator,
-                    "liquidated_at": row[10]
-                })
-            
-            # Get session info from first row
-            session_info = {
-                "session_id": rows[0][11],
-                "liquidated_at": rows[0][10],
-                "total_participants": len(rows),
-                "liquidation_price": rows[0][8]
-            }
-            
-            # Calculate statistics
-            total_profit_loss = sum(participant["profit_loss"] for participant in leaderboard)
-            avg_profit_loss = total_profit_loss / len(leaderboard) if leaderboard else 0
-            winners = len([p for p in leaderboard if p["profit_loss"] >= 0])
-            losers = len(leaderboard) - winners
-            best_performer = leaderboard[0] if leaderboard else None
-            worst_performer = leaderboard[-1] if leaderboard else None
-            
-            return {
-                "leaderboard": leaderboard,
-                "total_participants": len(leaderboard),
-                "session_info": session_info,
-                "statistics": {
-                    "total_profit_loss": round(total_profit_loss, 2),
-                    "average_profit_loss": round(avg_profit_loss, 2),
-                    "average_profit_loss_percentage": round(avg_profit_loss / 1000 * 100, 2) if avg_profit_loss else 0,
-                    "winners": winners,
-                    "losers": losers,
-                    "best_performer": {
-                        "name": best_performer["name"] if best_performer else None,
-                        "profit_percentage": best_performer["profit_loss_percentage"] if best_performer else None
-                    },
-                    "worst_performer": {
-                        "name": worst_performer["name"] if worst_performer else None,
-                        "profit_percentage": worst_performer["profit_loss_percentage"] if worst_performer else None
-                    }
-                },
-                "message": f"Leaderboard for {session_info['session_id']} with {len(leaderboard)} participants"
+        cursor = await db.execute(f"""
+            SELECT {LEADERBOARD_COLUMNS}
+            FROM current_leaderboard
+            WHERE session_id = ?
+            ORDER BY rank_position DESC
+            LIMIT 1
+        """, (session_id,))
+        last_row = await cursor.fetchone()
+    
+    leaderboard = [leaderboard_entry(row) for row in rows]
+    first_row = rows[0] if rows else last_row
+    
+    # Get session info from first row
+    session_info = {
+        "session_id": first_row[11],
+        "liquidated_at": first_row[10],
+        "total_participants": participants,
+        "liquidation_price": first_row[8]
+    }
+    
+    # Statistics cover every participant, not just the returned page
+    avg_profit_loss = total_profit_loss / participants
+    winners = int(winners)
+    losers = participants - winners
+    best_performer = leaderboard[0] if leaderboard else None
+    worst_performer = leaderboard_entry(last_row)
+    
+    return {
+        "leaderboard": leaderboard,
+        "total_participants": participants,
+        "session_info": session_info,
+        "statistics": {
+            "total_profit_loss": round(total_profit_loss, 2),
+            "average_profit_loss": round(avg_profit_loss, 2),
+            "average_profit_loss_percentage": round(avg_profit_loss / 1000 * 100, 2) if avg_profit_loss else 0,
+            "winners": winners,
+            "losers": losers,
+            "best_performer": {
+                "name": best_performer["name"] if best_performer else None,
+                "profit_percentage": best_performer["profit_loss_percentage"] if best_performer else None
+            },
+            "worst_performer": {
+                "name": worst_performer["name"],
+                "profit_percentage": worst_performer["profit_loss_percentage"]
             }
+        },
+        "message": f"Leaderboard for {session_info['session_id']} with {participants} participants"
+    }
+
+
+def results_snapshot_version(session) -> tuple:
+    """Version of a session's stored leaderboard: its pool state and the last results write"""
+    return session.state.version, session.results_version
+
+
+@app.get("/leaderboard")
+async def get_current_leaderboard(session_id: str = DEFAULT_SESSION_ID, limit: Optional[int] = None,
+                                  if_none_match: Optional[str] = Header(None)):
+    """
+    Get a session's latest leaderboard with rankings, the top `limit` only when given
+    (snapshot, rebuilt when the pool changes state)
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    session = sessions.get(session_id)
+    try:
+        if session is None:
+            return await build_leaderboard(session_id, limit)
+        snapshot = await snapshots.get(("leaderboard", session_id, limit), results_snapshot_version(session),
+                                       lambda: build_leaderboard(session_id, limit))
+        return snapshot.response(if_none_match)
             
     except Exception as e:
         return {
@@ -1483,53 +2102,84 @@ async def get_current_leaderboard():
             "message": "Error retrieving leaderboard data"
         }
 
+@app.get("/leaderboard/live")
+async def get_live_leaderboard(top: int = 10, wallet_address: Optional[str] = None,
+                               session_id: str = DEFAULT_SESSION_ID):
+    """
+    Live ranking of a running session by mark-to-market P&L.
+    Returns the top-K wallets and, optionally, one wallet's rank.
+    """
+    if top < 0:
+        raise HTTPException(status_code=400, detail="top must be zero or positive")
+    
+    live_leaderboard = get_session(session_id).leaderboard
+    response = {
+        "session_id": session_id,
+        "leaderboard": live_leaderboard.top(top),
+        "total_participants": len(live_leaderboard),
+        "mark_price": live_leaderboard.price,
+        "message": f"Live top {top} of {len(live_leaderboard)} participants"
+    }
+    if wallet_address is not None:
+        response["wallet"] = live_leaderboard.rank_of(wallet_address)
+    return response
+
+async def build_leaderboard_summary(session_id: str) -> dict:
+    """Body of /leaderboard/summary: top 3 and key stats"""
+    leaderboard_data = await build_leaderboard(session_id, limit=3)
+    
+    if not leaderboard_data["leaderboard"]:
+        return {
+            "top_3": [],
+            "statistics": {},
+            "message": "No leaderboard data available"
+        }
+    
+    leaderboard = leaderboard_data["leaderboard"]
+    
+    # Get top 3
+    top_3 = leaderboard[:3]
+    
+    # Simplified stats
+    stats = leaderboard_data["statistics"]
+    
+    return {
+        "top_3": [
+            {
+                "rank": p["rank"],
+                "medal": p["medal"],
+                "name": p["name"],
+                "wallet_address": p["wallet_address"][:10] + "...",
+                "profit_loss_percentage": p["profit_loss_percentage"],
+                "final_investment": p["final_investment"],
+                "pnl_indicator": p["pnl_indicator"]
+            } for p in top_3
+        ],
+        "statistics": {
+            "total_participants": leaderboard_data["total_participants"],
+            "average_profit_loss_percentage": stats["average_profit_loss_percentage"],
+            "winners": stats["winners"],
+            "losers": stats["losers"]
+        },
+        "session_info": {
+            "session_id": leaderboard_data["session_info"]["session_id"],
+            "liquidated_at": leaderboard_data["session_info"]["liquidated_at"]
+        },
+        "message": f"Top 3 performers from latest session"
+    }
+
 @app.get("/leaderboard/summary")
-async def get_leaderboard_summary():
+async def get_leaderboard_summary(session_id: str = DEFAULT_SESSION_ID, if_none_match: Optional[str] = Header(None)):
     """
     Get condensed leaderboard summary with top 3 and key stats
     """
+    session = sessions.get(session_id)
     try:
-        leaderboard_data = await get_current_leaderboard()
-        
-        if not leaderboard_data["leaderboard"]:
-            return {
-                "top_3": [],
-                "statistics": {},
-                "message": "No leaderboard data available"
-            }
-        
-        leaderboard = leaderboard_data["leaderboard"]
-        
-        # Get top 3
-        top_3 = leaderboard[:3]
-        
-        # Simplified stats
-        stats = leaderboard_data["statistics"]
-        
-        return {
-            "top_3": [
-                {
-                    "rank": p["rank"],
-                    "medal": p["medal"],
-                    "name": p["name"],
-                    "wallet_address": p["wallet_address"][:10] + "...",
-                    "profit_loss_percentage": p["profit_loss_percentage"],
-                    "final_investment": p["final_investment"],
-                    "pnl_indicator": p["pnl_indicator"]
-                } for p in top_3
-            ],
-            "statistics": {
-                "total_participants": leaderboard_data["total_participants"],
-                "average_profit_loss_percentage": stats["average_profit_loss_percentage"],
-                "winners": stats["winners"],
-                "losers": stats["losers"]
-            },
-            "session_info": {
-                "session_id": leaderboard_data["session_info"]["session_id"],
-                "liquidated_at": leaderboard_data["session_info"]["liquidated_at"]
-            },
-            "message": f"Top 3 performers from latest session"
-        }
+        if session is None:
+            return await build_leaderboard_summary(session_id)
+        snapshot = await snapshots.get(("leaderboard_summary", session_id), results_snapshot_version(session),
+                                       lambda: build_leaderboard_summary(session_id))
+        return snapshot.response(if_none_match)
         
     except Exception as e:
         return {
@@ -1539,14 +2189,235 @@ async def get_leaderboard_summary():
             "message": "Error retrieving leaderboard summary"
         }
 
+@app.get("/price_cache")
+async def get_price_cache_stats():
+    """Get price cache hit/miss counters"""
+    return price_cache.stats()
+
+@app.get("/price_feed")
+async def get_price_feed_status():
+    """Get the price source and the latest tick from the Redis stream"""
+    return {
+        "price_source": PRICE_SOURCE,
+        "ticks_received": price_feed.ticks_received,
+        "latest_tick": price_feed.latest.to_dict() if price_feed.latest else None
+    }
+
+@app.get("/snapshots")
+async def get_snapshot_stats():
+    """Get snapshot cache hit/build counters of the polled read endpoints"""
+    return snapshots.stats()
+
+@app.get("/stats")
+async def get_session_stats(session_id: str = DEFAULT_SESSION_ID, price: Optional[float] = None):
+    """
+    Whole-pool totals of a session from its running aggregates, in constant time.
+    Valued at the live mark price, or at ?price= for a what-if valuation;
+    winners and losers are counted at the mark price from the live ranking.
+    """
+    session = get_session(session_id)
+    mark_price = session.leaderboard.price
+    if price is None and mark_price is None:
+        price = 0.0  # no trade or tick yet: every token is worth nothing so far
+    
+    winners = session.leaderboard.winners()
+    return {
+        "session_id": session_id,
+        "pool_state": session.state.current,
+        "mark_price": mark_price,
+        **session.ledger.aggregates.summary(mark_price if price is None else price),
+        "winners": winners,
+        "losers": len(session.leaderboard) - winners
+    }
+
+@app.get("/stream")
+async def stream_events(session_id: str = DEFAULT_SESSION_ID):
+    """
+    Server-Sent Events push of a session's trades, price ticks, live
+    leaderboard, pool state and liquidation, replacing polling.
+    Opens with the current pool state and leaderboard.
+    """
+    session = get_session(session_id)
+    
+    async def frames():
+        subscriber = event_hub.subscribe(session_id)
+        try:
+            yield encode_event("pool_state", state_event(session.state))
+            yield encode_event("leaderboard", leaderboard_event(session))
+            while True:
+                pending = await subscriber.next_frames(STREAM_KEEPALIVE_SECONDS)
+                if pending:
+                    yield b"".join(pending)
+                if subscriber.overflowed:
+                    yield encode_event("overflow", {"message": "Client fell too far behind. Reconnect to resume."})
+                    return
+                if not pending:
+                    yield b": keepalive\n\n"
+        finally:
+            event_hub.unsubscribe(session_id, subscriber)
+    
+    return StreamingResponse(frames(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/stream/stats")
+async def get_stream_stats():
+    """Get push channel subscriber and fan-out counters"""
+    return event_hub.stats()
+
+@app.get("/history/trades")
+async def get_trade_history(session_id: str = DEFAULT_SESSION_ID, wallet_address: Optional[str] = None,
+                            run_id: Optional[int] = None, limit: Optional[int] = None,
+                            cursor: Optional[str] = None):
+    """
+    Journaled fills of a session, newest first, optionally for one wallet
+    or one run. Pages by keyset: pass next_cursor back as ?cursor=.
+    """
+    after = decode_cursor(cursor, length=2)
+    if after is not None:
+        try:
+            after = (str(after[0]), int(after[1]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = page_size(limit, PAGE_SIZE, PAGE_SIZE_MAX)
+    
+    # Write pending journal rows so the page includes the latest trades
+    session = sessions.get(session_id)
+    if session is not None:
+        await session.ledger.flush()
+    rows, next_key = await fetch_trades(trading_pool, session_id, wallet_address, run_id, after, limit)
+    return {
+        "session_id": session_id,
+        "wallet_address": wallet_address,
+        "run_id": run_id,
+        "trades": [dict(zip(TRADE_COLUMNS, row)) for row in rows],
+        "count": len(rows),
+        "next_cursor": encode_cursor(next_key) if next_key is not None else None
+    }
+
+@app.get("/history/sessions")
+async def get_session_history(session_id: Optional[str] = None, limit: Optional[int] = None,
+                              cursor: Optional[str] = None):
+    """Archived runs (reset to liquidation), newest first, of one session or all of them"""
+    after = decode_cursor(cursor, length=1)
+    if after is not None:
+        try:
+            after = int(after[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = page_size(limit, PAGE_SIZE, PAGE_SIZE_MAX)
+    
+    rows, next_key = await fetch_runs(trading_pool, session_id, after, limit)
+    runs = []
+    for row in rows:
+        run = dict(zip(RUN_COLUMNS, row))
+        run["compacted"] = bool(run["compacted"])
+        # Ended without a liquidation: reset early, or closed with nobody in it
+        if not run["ended_at"]:
+            run["status"] = "running"
+        else:
+            run["status"] = "closed" if run["liquidation_price"] is not None else "abandoned"
+        runs.append(run)
+    return {
+        "session_id": session_id,
+        "runs": runs,
+        "count": len(runs),
+        "next_cursor": encode_cursor((next_key,)) if next_key is not None else None
+    }
+
+@app.get("/history/results")
+async def get_run_results(run_id: int, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Final ranked results of one archived run, best first"""
+    after = decode_cursor(cursor, length=1)
+    if after is not None:
+        try:
+            after = int(after[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = page_size(limit, PAGE_SIZE, PAGE_SIZE_MAX)
+    
+    rows, next_key = await fetch_results(trading_pool, run_id, after, limit)
+    return {
+        "run_id": run_id,
+        "results": [dict(zip(RESULT_COLUMNS, row)) for row in rows],
+        "count": len(rows),
+        "next_cursor": encode_cursor((next_key,)) if next_key is not None else None
+    }
+
+@app.get("/history/summary")
+async def get_run_summary(run_id: int, wallet_address: Optional[str] = None):
+    """Per-wallet trade totals of a compacted run"""
+    rows = await fetch_wallet_summary(trading_pool, run_id, wallet_address)
+    return {
+        "run_id": run_id,
+        "wallet_address": wallet_address,
+        "summaries": [dict(zip(SUMMARY_COLUMNS, row)) for row in rows],
+        "count": len(rows)
+    }
+
+@app.post("/history/compact")
+async def compact_history(older_than_hours: Optional[float] = None, run_id: Optional[int] = None):
+    """
+    Fold the journal of finished runs into per-wallet summary rows and drop
+    their trades: one run by ?run_id=, or every run that ended more than
+    ?older_than_hours= ago (JOURNAL_RETENTION_HOURS by default)
+    """
+    if run_id is None:
+        hours = JOURNAL_RETENTION_HOURS if older_than_hours is None else older_than_hours
+        if hours < 0:
+            raise HTTPException(status_code=400, detail="older_than_hours must not be negative")
+        cutoff = format_timestamp(time.time() - hours * 3600)
+    else:
+        cutoff = None
+    
+    try:
+        compacted = await compact_runs(trading_pool, cutoff, run_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {
+        "status": "success",
+        "compacted_runs": compacted,
+        "trades_compacted": sum(run["trades_compacted"] for run in compacted)
+    }
+
+@app.get("/ledger")
+async def get_ledger_stats(session_id: str = DEFAULT_SESSION_ID):
+    """Get a session's in-memory position ledger statistics"""
+    session = get_session(session_id)
+    stats = session.ledger.stats()
+    stats["wallet_locks"] = session.locks.stats()
+    if group_committer is not None:
+        stats["group_commit"] = group_committer.stats()
+    return stats
+
+@app.get("/db_pools")
+async def get_db_pool_stats():
+    """Get connection pool statistics per database"""
+    return {
+        "storage_mode": STORAGE_MODE,
+        "trading": trading_pool.stats(),
+        "users": users_pool.stats(),
+        "leaderboard": leaderboard_pool.stats()
+    }
+
+@app.get("/sessions")
+async def list_sessions():
+    """List every pool session hosted by this process"""
+    return {
+        "sessions": [
+            {**session.summary(), "timer_active": scheduler.deadline_of(session.session_id) is not None}
+            for session in sessions.all()
+        ],
+        "stats": sessions.stats(),
+        "scheduler": scheduler.stats()
+    }
+
 @app.get("/heartbeat")
-async def heartbeat():
+async def heartbeat(session_id: str = DEFAULT_SESSION_ID):
     """
-    Returns timer status without any parameters
+    Returns a session's timer status (the default session when no parameters)
     Returns True when timer is active, False when timer is not active
     """
-    global timer_active
-    return timer_active
+    return scheduler.deadline_of(session_id) is not None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(key) -> str:
+    """Opaque page token for the sort key of the last row served"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str], length: int) -> Optional[tuple]:
+    """Sort key from a page token; a token that does not decode to length values is a 400"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, list) or len(key) != length:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(key)
+
+
+def page_size(limit: Optional[int], default: int, maximum: int) -> int:
+    if limit is None:
+        return default
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    return min(limit, maximum)
+
+
+def ndjson_response(records) -> StreamingResponse:
+    """
+    Stream an async iterable of dicts as newline-delimited JSON.
+
+    Records are serialized as they arrive, so the response never holds
+    more than the batch the producer is currently yielding.
+    """
+    async def lines():
+        async for record in records:
+            yield json.dumps(record) + "\n"
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
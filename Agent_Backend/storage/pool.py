@@ -0,0 +1,99 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiosqlite
+
+# Applied once to every connection when it is opened
+DEFAULT_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-16000")),  # negative = KiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY"
+}
+
+
+async def open_connection(db_path: str, pragmas: Optional[dict] = None,
+                          attach: Optional[dict] = None) -> aiosqlite.Connection:
+    """Open a connection, apply the standard pragmas and ATTACH any {alias: path} databases"""
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    db = await aiosqlite.connect(db_path)
+    for name, value in (DEFAULT_PRAGMAS if pragmas is None else pragmas).items():
+        cursor = await db.execute(f"PRAGMA {name}={value}")
+        await cursor.close()
+    for alias, path in (attach or {}).items():
+        cursor = await db.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        await cursor.close()
+    return db
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of prepared aiosqlite connections for one database.
+
+    Opened once from the app lifespan; request handlers borrow a
+    connection with `async with pool.acquire() as db` instead of paying
+    connect + pragma setup on every request. Databases in attach are
+    ATTACHed to every connection so queries can join across files.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, pragmas: Optional[dict] = None,
+                 attach: Optional[dict] = None):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = pragmas
+        self.attach = attach or {}
+        self._idle: Optional[asyncio.Queue] = None
+        self._connections = []
+        self._open_lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._idle is not None
+
+    async def open(self):
+        async with self._open_lock:
+            if self._idle is not None:
+                return
+            idle = asyncio.Queue()
+            for _ in range(self.size):
+                db = await open_connection(self.db_path, self.pragmas, self.attach)
+                self._connections.append(db)
+                idle.put_nowait(db)
+            self._idle = idle
+
+    async def close(self):
+        async with self._open_lock:
+            for db in self._connections:
+                await db.close()
+            self._connections = []
+            self._idle = None
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._idle is None:
+            await self.open()
+
+        idle = self._idle
+        db = await idle.get()
+        try:
+            yield db
+        finally:
+            # Never hand the next borrower a half-finished transaction
+            if db.in_transaction:
+                await db.rollback()
+            idle.put_nowait(db)
+
+    def stats(self) -> dict:
+        return {
+            "database_path": self.db_path,
+            "attached": self.attach,
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "open": self.is_open
+        }
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    At most one running call per key; concurrent callers share its result.
+
+    The work runs as its own task and every caller, the one that started it
+    included, awaits it through asyncio.shield(). A cancelled caller (client
+    disconnect) therefore only stops its own wait, never the shared call.
+    Failures reach every waiting caller and are not remembered, so the next
+    call for the key runs the work again.
+    """
+
+    def __init__(self):
+        self._tasks = {}  # {key: asyncio.Task}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def running(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable]):
+        """Await the key's running call, starting work() if there is none"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark a failure as retrieved when every caller had gone already
+        if not task.cancelled():
+            task.exception()
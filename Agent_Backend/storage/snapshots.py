@@ -0,0 +1,94 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+from fastapi import Response
+
+from storage.single_flight import SingleFlight
+
+
+def encode_json(payload) -> bytes:
+    """Same bytes FastAPI's JSONResponse would send"""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class Snapshot:
+    """One serialized response body and its strong ETag"""
+
+    __slots__ = ("version", "body", "etag")
+
+    def __init__(self, version: Hashable, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        """200 with the cached body, or 304 when the client already has it"""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class SnapshotCache:
+    """
+    Serialized responses of polled read endpoints, keyed by endpoint and session.
+
+    Every entry remembers the version (change counters, price tick) it was
+    built at. Requests at the same version get the stored bytes; the first
+    request after a change rebuilds once while concurrent requests for that
+    key and version wait on the same build. The ETag hashes the body, so a
+    rebuild that produces identical output keeps answering If-None-Match
+    with 304. At most max_entries keys are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # {key: Snapshot}, least recently used first
+        self._building = SingleFlight()  # builds running per (key, version)
+        self.hits = 0
+        self.builds = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, key: Hashable, version: Hashable, build: Callable[[], Awaitable[dict]]) -> Snapshot:
+        """Return the snapshot for key at version, building it if needed"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if self._building.running((key, version)):
+            self.coalesced += 1
+        return await self._building.run((key, version), lambda: self._build(key, version, build))
+
+    async def _build(self, key: Hashable, version: Hashable, build: Callable[[], Awaitable[dict]]) -> Snapshot:
+        # Failed builds are not cached so the next request retries
+        snapshot = Snapshot(version, encode_json(await build()))
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self.builds += 1
+        return snapshot
+
+    def stats(self) -> dict:
+        requests = self.hits + self.builds + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "building": len(self._building),
+            "hits": self.hits,
+            "builds": self.builds,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+            "hit_rate": round((self.hits + self.coalesced) / requests, 4) if requests else 0.0
+        }
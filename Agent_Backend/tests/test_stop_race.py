@@ -0,0 +1,139 @@
+"""
+/decision stop racing a new wallet's first trade.
+
+The trade passes the open-pool check and creates its position, then waits
+on the price fetch; the stop arrives meanwhile. The stop must wait for that
+trade (its wallet is locked) and liquidate the traded position, so nothing
+changes a position after the pool closed.
+
+Run from Agent_Backend/:
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRICE = 2.5
+
+
+@pytest.fixture
+def app_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # database/ is created relative to the working directory
+    sys.modules.pop("main", None)  # fresh sessions, pools and caches for every test
+    import main
+    return main
+
+
+def test_stop_waits_for_new_wallet_trade(app_main, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = app_main
+
+    async def scenario():
+        # Price fetch delay per request (task name), so the requests interleave as described
+        delays = {"slow": 0.2, "new": 0.4}
+
+        async def slow_price(session):
+            await asyncio.sleep(delays.get(asyncio.current_task().get_name(), 0))
+            return PRICE, None
+
+        monkeypatch.setattr(main, "get_execution_price", slow_price)
+
+        def decide(wallet_address, action, name):
+            request = main.DecisionRequest(wallet_address=wallet_address, action=action)
+            return asyncio.create_task(main.make_trading_decision(request), name=name)
+
+        await decide("0xold", "buy", "first")
+        slow = decide("0xold", "sell", "slow")   # holds 0xold's lock while pricing
+        await asyncio.sleep(0.05)
+        stop = decide("0xstopper", "stop", "stop")  # has to wait for 0xold
+        await asyncio.sleep(0.05)
+        new = decide("0xnew", "buy", "new")      # a new wallet while the stop is waiting
+        return await asyncio.gather(slow, stop, new)
+
+    with TestClient(main.app) as client:
+        slow, stop, new = client.portal.call(scenario)
+        session = main.sessions.get(main.DEFAULT_SESSION_ID)
+
+        assert stop["status"] == "success"
+        assert session.state.current == main.CLOSED
+        # The new wallet either got in before the stop (and was liquidated after its
+        # trade) or was turned away; it never trades on a liquidated position
+        assert new["status"] in ("success", "rejected")
+        for position in session.ledger.all():
+            assert position.current_tokens == 0.0, position.wallet_address
+        results = {row["wallet_address"]: row for row in client.get("/history/results", params={
+            "run_id": session.ledger.run_id}).json()["results"]}
+        for position in session.ledger.all():
+            assert results[position.wallet_address]["final_investment"] == pytest.approx(position.current_investment)
+
+
+def test_trade_after_stop_began_is_rejected(app_main, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = app_main
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow_price(session):
+            started.set()
+            await asyncio.sleep(0.2)
+            return PRICE, None
+
+        monkeypatch.setattr(main, "get_execution_price", slow_price)
+
+        stop = asyncio.create_task(main.make_trading_decision(main.DecisionRequest(wallet_address="0xstopper", action="stop")))
+        await started.wait()
+        late = await main.make_trading_decision(main.DecisionRequest(wallet_address="0xlate", action="buy"))
+        return await stop, late
+
+    with TestClient(main.app) as client:
+        stop, late = client.portal.call(scenario)
+        session = main.sessions.get(main.DEFAULT_SESSION_ID)
+
+        assert stop["status"] == "success"
+        assert late["status"] == "rejected"
+        assert session.ledger.get("0xlate") is None
+
+
+def test_deadline_during_decision_stop_liquidates_once(app_main, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = app_main
+
+    async def scenario():
+        stopping = asyncio.Event()
+
+        async def slow_price(session):
+            if asyncio.current_task().get_name() == "stop":
+                stopping.set()
+                await asyncio.sleep(0.2)
+            return PRICE, None
+
+        monkeypatch.setattr(main, "get_execution_price", slow_price)
+
+        await main.make_trading_decision(main.DecisionRequest(wallet_address="0xa", action="buy"))
+        request = main.DecisionRequest(wallet_address="0xa", action="stop")
+        stop = asyncio.create_task(main.make_trading_decision(request), name="stop")
+        await stopping.wait()
+        # The deadline fires mid-stop: it must not liquidate again, only report "not closed yet"
+        closed_during = await main.expire_pool(main.DEFAULT_SESSION_ID)
+        await stop
+        closed_after = await main.expire_pool(main.DEFAULT_SESSION_ID)
+        return closed_during, closed_after
+
+    with TestClient(main.app) as client:
+        closed_during, closed_after = client.portal.call(scenario)
+        session = main.sessions.get(main.DEFAULT_SESSION_ID)
+
+        assert (closed_during, closed_after) == (False, True)
+        assert session.state.current == main.CLOSED
+        runs = client.get("/history/sessions").json()["runs"]
+        assert [run["status"] for run in runs] == ["closed"]
+        trades = client.get("/history/trades", params={"run_id": runs[0]["run_id"]}).json()["trades"]
+        assert sorted(trade["action"] for trade in trades) == ["buy", "liquidate"]
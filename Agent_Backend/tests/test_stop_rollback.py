@@ -0,0 +1,70 @@
+"""
+A stop whose results never commit leaves the pool exactly as it was.
+
+Both liquidation paths (/decision stop and the deadline's
+process_stop_decision) are made to fail at archive_run; the pool must
+reopen with the traded positions, in memory and after the next flush.
+
+Run from Agent_Backend/:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRICE = 2.5
+
+
+@pytest.fixture
+def app_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # database/ is created relative to the working directory
+    sys.modules.pop("main", None)  # fresh sessions, pools and caches for every test
+    import main
+
+    async def fixed_price(session):
+        return PRICE, None
+
+    monkeypatch.setattr(main, "get_execution_price", fixed_price)
+    return main
+
+
+def trade(client, wallet_address, action):
+    return client.post("/decision", json={"wallet_address": wallet_address, "action": action})
+
+
+def positions(session) -> dict:
+    return {position.wallet_address: (position.current_investment, position.current_tokens)
+            for position in session.ledger.all()}
+
+
+async def failing_archive(*args, **kwargs):
+    raise RuntimeError("disk full")
+
+
+@pytest.mark.parametrize("path", ["decision", "deadline"])
+def test_failed_stop_rolls_back(app_main, monkeypatch, path):
+    from fastapi.testclient import TestClient
+
+    main = app_main
+    with TestClient(main.app) as client:
+        for wallet_address in ("0xa", "0xb"):
+            assert trade(client, wallet_address, "buy").json()["status"] == "success"
+        session = main.sessions.get(main.DEFAULT_SESSION_ID)
+        before = positions(session)
+
+        monkeypatch.setattr(main, "archive_run", failing_archive)
+        if path == "decision":
+            assert trade(client, "0xa", "stop").status_code == 500
+        else:
+            client.portal.call(main.process_stop_decision, session)
+
+        assert session.state.current == main.OPEN
+        assert positions(session) == before
+        assert {entry["wallet_address"] for entry in session.leaderboard.top(10)} == set(before)
+
+        # The restored positions are what gets persisted, not the liquidated ones
+        rows = client.get("/db", params={"table": "trading_positions", "formatted": False}).json()["rows"]
+        assert {row[0]: (row[2], row[3]) for row in rows} == pytest.approx(before)
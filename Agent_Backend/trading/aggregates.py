@@ -0,0 +1,105 @@
+import math
+
+
+class PoolAggregates:
+    """
+    Running totals over one session's positions, kept in step with every trade.
+
+    Each position is booked with the cash and tokens it held when last
+    counted, so a trade only moves the totals by its own difference. Valuing
+    the whole pool at any price is then constant time:
+
+        value = total_cash + total_tokens * price
+        P&L   = value - total_starting
+
+    The per-wallet P&L percentage average uses the same trick with each
+    position's amounts divided by its starting investment. rebuild()
+    recomputes everything exactly (fsum), e.g. after loading from SQLite.
+    """
+
+    def __init__(self):
+        self._booked = {}  # {wallet_address: (cash, tokens, starting)}
+        self.total_starting = 0.0
+        self.total_cash = 0.0
+        self.total_tokens = 0.0
+        # Sums of cash / starting and tokens / starting, for the average P&L %
+        self.relative_cash = 0.0
+        self.relative_tokens = 0.0
+        self.counted_with_start = 0
+
+    def __len__(self):
+        return len(self._booked)
+
+    def _apply(self, cash: float, tokens: float, starting: float, sign: int):
+        self.total_starting += sign * starting
+        self.total_cash += sign * cash
+        self.total_tokens += sign * tokens
+        if starting > 0:
+            self.relative_cash += sign * cash / starting
+            self.relative_tokens += sign * tokens / starting
+            self.counted_with_start += sign
+
+    def book(self, position):
+        """Count a new position, or move the totals by what changed since it was last booked"""
+        wallet = position.wallet_address
+        booked = self._booked.get(wallet)
+        if booked is not None:
+            self._apply(*booked, sign=-1)
+        booked = (position.current_investment, position.current_tokens, position.starting_investment)
+        self._apply(*booked, sign=1)
+        self._booked[wallet] = booked
+
+    def remove(self, wallet_address: str):
+        booked = self._booked.pop(wallet_address, None)
+        if booked is not None:
+            self._apply(*booked, sign=-1)
+
+    def clear(self):
+        self._booked.clear()
+        self.total_starting = 0.0
+        self.total_cash = 0.0
+        self.total_tokens = 0.0
+        self.relative_cash = 0.0
+        self.relative_tokens = 0.0
+        self.counted_with_start = 0
+
+    def rebuild(self, positions):
+        """Recount every position from scratch, dropping accumulated rounding"""
+        self._booked = {
+            position.wallet_address: (position.current_investment, position.current_tokens,
+                                      position.starting_investment)
+            for position in positions
+        }
+        booked = self._booked.values()
+        with_start = [(cash, tokens, starting) for cash, tokens, starting in booked if starting > 0]
+        self.total_starting = math.fsum(starting for _, _, starting in booked)
+        self.total_cash = math.fsum(cash for cash, _, _ in booked)
+        self.total_tokens = math.fsum(tokens for _, tokens, _ in booked)
+        self.relative_cash = math.fsum(cash / starting for cash, _, starting in with_start)
+        self.relative_tokens = math.fsum(tokens / starting for _, tokens, starting in with_start)
+        self.counted_with_start = len(with_start)
+
+    def value_at(self, price: float) -> float:
+        return self.total_cash + self.total_tokens * price
+
+    def summary(self, price: float) -> dict:
+        """Whole-pool valuation at price, without touching any position"""
+        count = len(self._booked)
+        total_value = self.value_at(price)
+        total_profit_loss = total_value - self.total_starting
+        average_percentage = (
+            (self.relative_cash + self.relative_tokens * price - self.counted_with_start)
+            / self.counted_with_start * 100
+        ) if self.counted_with_start else 0.0
+        return {
+            "price": price,
+            "participants": count,
+            "total_starting_investment": self.total_starting,
+            "total_cash": self.total_cash,
+            "total_tokens": self.total_tokens,
+            "total_token_value": self.total_tokens * price,
+            "total_value": total_value,
+            "total_profit_loss": total_profit_loss,
+            "average_profit_loss": total_profit_loss / count if count else 0.0,
+            "average_profit_loss_percentage": round(average_percentage, 4)
+        }
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from collections import deque
+from typing import Optional
+
+
+def encode_event(event: str, data, event_id: Optional[int] = None) -> bytes:
+    """One Server-Sent Events frame"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    """
+    One connected stream client.
+
+    Ordered events (trades) queue up to max_queue frames; past that the
+    client is marked overflowed and disconnected. Events published with a
+    conflate key (price, leaderboard, pool state) only keep the newest
+    unsent frame per key, so a slow client skips stale values instead of
+    buffering them.
+    """
+
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self._queue = deque()  # [(offer number, frame)]
+        self._latest = {}      # {conflate key: (offer number, frame)}
+        self._offers = 0
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.conflated = 0
+
+    def offer(self, frame: bytes, conflate_key: Optional[str] = None):
+        self._offers += 1
+        if conflate_key is not None:
+            if conflate_key in self._latest:
+                self.conflated += 1
+            self._latest[conflate_key] = (self._offers, frame)
+        elif len(self._queue) >= self.max_queue:
+            self.overflowed = True
+        else:
+            self._queue.append((self._offers, frame))
+        self._ready.set()
+
+    async def next_frames(self, timeout: float) -> list:
+        """Wait for pending frames and take them all in publish order; empty on timeout"""
+        if not self._queue and not self._latest and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        pending = list(self._queue)
+        if self._latest:
+            pending = sorted(pending + list(self._latest.values()))
+        self._queue.clear()
+        self._latest.clear()
+        return [frame for _, frame in pending]
+
+
+class EventHub:
+    """
+    Fan-out of pool events to streaming clients, per session.
+
+    publish() serializes an event to one SSE frame and hands the same bytes
+    to every subscriber of the session; nothing is serialized when nobody
+    is listening. Overflowed subscribers are dropped from the fan-out on
+    the spot so one stalled client never slows the others.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers = {}  # {session_id: set of Subscriber}
+        self.last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, session_id: str) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.setdefault(session_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, session_id: str, subscriber: Subscriber):
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[session_id]
+
+    def has_subscribers(self, session_id: str) -> bool:
+        return bool(self._subscribers.get(session_id))
+
+    def publish(self, session_id: str, event: str, data, conflate_key: Optional[str] = None) -> int:
+        """Queue an event for every subscriber of the session, returning how many got it"""
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return 0
+
+        self.last_id += 1
+        self.published += 1
+        frame = encode_event(event, data, self.last_id)
+        delivered = 0
+        for subscriber in list(subscribers):
+            subscriber.offer(frame, conflate_key)
+            if subscriber.overflowed:
+                subscribers.discard(subscriber)
+                self.dropped += 1
+            else:
+                delivered += 1
+        return delivered
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "dropped": self.dropped
+        }
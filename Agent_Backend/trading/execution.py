@@ -0,0 +1,73 @@
+import random
+
+MIN_BUY_AMOUNT = 0.01
+MIN_SELL_TOKENS = 0.0001
+MIN_SELL_AMOUNT = 0.01
+
+
+class TradeResult:
+    """Outcome of one buy/sell applied to a position"""
+
+    __slots__ = ("status", "reason", "cash_amount", "token_amount", "previous_investment", "previous_tokens")
+
+    def __init__(self, status: str, reason=None, cash_amount: float = 0.0, token_amount: float = 0.0,
+                 previous_investment: float = 0.0, previous_tokens: float = 0.0):
+        self.status = status
+        self.reason = reason
+        self.cash_amount = cash_amount
+        self.token_amount = token_amount
+        self.previous_investment = previous_investment
+        self.previous_tokens = previous_tokens
+
+
+def execute_trade(position, action: str, price: float, tick_seq=None) -> TradeResult:
+    """
+    Apply a buy or sell to an in-memory position at the given price.
+
+    Buys spend and sells dispose of a random 10-50% slice. Failed trades
+    leave the position untouched; the caller marks successful ones dirty.
+    """
+    current_investment = position.current_investment
+    current_tokens = position.current_tokens
+
+    if action == "buy":
+        if current_investment <= 0:
+            return TradeResult("failed", "no_funds", previous_investment=current_investment,
+                               previous_tokens=current_tokens)
+
+        buy_amount = current_investment * random.uniform(0.1, 0.5)
+        if buy_amount < MIN_BUY_AMOUNT:
+            return TradeResult("failed", "below_min_buy", cash_amount=buy_amount,
+                               previous_investment=current_investment, previous_tokens=current_tokens)
+
+        tokens_purchased = buy_amount / price
+        position.current_investment = current_investment - buy_amount
+        position.current_tokens = current_tokens + tokens_purchased
+        position.buy_sell_calls += 1
+        position.last_tick_seq = tick_seq
+        return TradeResult("success", cash_amount=buy_amount, token_amount=tokens_purchased,
+                           previous_investment=current_investment, previous_tokens=current_tokens)
+
+    if action == "sell":
+        if current_tokens <= 0:
+            return TradeResult("failed", "no_tokens", previous_investment=current_investment,
+                               previous_tokens=current_tokens)
+
+        tokens_to_sell = current_tokens * random.uniform(0.1, 0.5)
+        if tokens_to_sell < MIN_SELL_TOKENS:
+            return TradeResult("failed", "below_min_tokens", token_amount=tokens_to_sell,
+                               previous_investment=current_investment, previous_tokens=current_tokens)
+
+        sell_amount = tokens_to_sell * price
+        if sell_amount < MIN_SELL_AMOUNT:
+            return TradeResult("failed", "below_min_value", cash_amount=sell_amount, token_amount=tokens_to_sell,
+                               previous_investment=current_investment, previous_tokens=current_tokens)
+
+        position.current_tokens = current_tokens - tokens_to_sell
+        position.current_investment = current_investment + sell_amount
+        position.buy_sell_calls += 1
+        position.last_tick_seq = tick_seq
+        return TradeResult("success", cash_amount=sell_amount, token_amount=tokens_to_sell,
+                           previous_investment=current_investment, previous_tokens=current_tokens)
+
+    raise ValueError(f"Unsupported action: {action}")
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Optional
+
+import aiosqlite
+
+from storage.pool import open_connection
+
+
+class GroupCommitQueue:
+    """
+    Coalesces writes from concurrent requests into shared transactions.
+
+    Callers await submit(); their statement is queued and the background
+    writer commits everything pending once max_delay has passed since the
+    first queued write, or as soon as max_batch writes are waiting. Each
+    caller is released only after the transaction holding its write commits.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = 256, max_delay: float = 0.005):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []  # [(sql, params, future)]
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self.groups_committed = 0
+        self.writes_committed = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            # Dedicated writer connection, prepared like the pooled ones
+            self._db = await open_connection(self.db_path)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Commit whatever was still queued before closing
+        while self._pending:
+            await self._commit_group()
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def submit(self, sql: str, params: tuple):
+        """Queue one write and wait until its group has committed"""
+        if self._task is None:
+            raise RuntimeError("GroupCommitQueue is not started")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sql, params, future))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        await future
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Give concurrent writers a few milliseconds to join this group
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            await self._commit_group()
+
+    async def _commit_group(self):
+        group = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        if not self._pending:
+            self._wakeup.clear()
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        if not group:
+            return
+
+        # Consecutive writes of the same statement go through one executemany
+        try:
+            batch_sql, batch_params = group[0][0], []
+            for sql, params, _ in group:
+                if sql != batch_sql:
+                    await self._db.executemany(batch_sql, batch_params)
+                    batch_sql, batch_params = sql, []
+                batch_params.append(params)
+            await self._db.executemany(batch_sql, batch_params)
+            await self._db.commit()
+        except Exception as e:
+            await self._db.rollback()
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.groups_committed += 1
+        self.writes_committed += len(group)
+        for _, _, future in group:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "pending": len(self._pending),
+            "groups_committed": self.groups_committed,
+            "writes_committed": self.writes_committed,
+            "average_group_size": round(self.writes_committed / self.groups_committed, 2) if self.groups_committed else 0
+        }
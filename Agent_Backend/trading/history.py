@@ -0,0 +1,221 @@
+import time
+from typing import Optional
+
+from trading.ledger import INSERT_JOURNAL_SQL, format_timestamp
+
+TRADE_COLUMNS = [
+    "trade_id", "session_id", "run_id", "wallet_address", "action", "price", "tick_seq",
+    "cash_amount", "token_amount", "investment_after", "tokens_after", "executed_at"
+]
+
+RUN_COLUMNS = [
+    "run_id", "session_id", "chain_id", "token_address", "started_at", "ended_at",
+    "liquidation_price", "liquidation_tick_seq", "participants", "total_liquidation",
+    "average_profit_loss_percentage", "winners", "losers", "compacted"
+]
+
+RESULT_COLUMNS = [
+    "run_id", "session_id", "wallet_address", "name", "starting_investment", "final_investment",
+    "profit_loss", "profit_loss_percentage", "rank_position", "archived_at"
+]
+
+SUMMARY_COLUMNS = [
+    "run_id", "session_id", "wallet_address", "trades", "buys", "sells", "cash_spent",
+    "cash_received", "tokens_bought", "tokens_sold", "first_trade_at", "last_trade_at"
+]
+
+
+async def start_run(db, session_id: str, chain_id: Optional[str], token_address: Optional[str]) -> int:
+    """Open a session_archive row for a new run of the session (caller commits)"""
+    cursor = await db.execute("""
+        INSERT INTO session_archive (session_id, chain_id, token_address) VALUES (?, ?, ?)
+    """, (session_id, chain_id, token_address))
+    return cursor.lastrowid
+
+
+async def end_runs(db, run_ids: list):
+    """
+    Mark runs that will never be liquidated (reset, or closed with nobody
+    in them) as ended, so compaction picks up their journal. Already ended
+    runs keep their end. The caller commits.
+    """
+    ended_at = format_timestamp(time.time())
+    await db.executemany("""
+        UPDATE session_archive SET ended_at = ? WHERE run_id = ? AND ended_at IS NULL
+    """, [(ended_at, run_id) for run_id in run_ids if run_id is not None])
+
+
+async def end_orphaned_runs(db) -> int:
+    """End every open run no session points at any more, e.g. ones reset before end_runs() existed"""
+    cursor = await db.execute("""
+        UPDATE session_archive SET ended_at = ?
+        WHERE ended_at IS NULL
+          AND run_id NOT IN (SELECT run_id FROM pool_settings WHERE run_id IS NOT NULL)
+    """, (format_timestamp(time.time()),))
+    return cursor.rowcount
+
+
+async def archive_run(db, run_id: Optional[int], session_id: str, liquidation, tick_seq: Optional[int],
+                      journal: bool = True):
+    """
+    Close a run: its totals into session_archive, every wallet's result (named
+    from users) into archived_results and, when journal, each final token
+    sale into trade_journal. The caller commits.
+    """
+    totals = liquidation.totals()
+    ended_at = format_timestamp(time.time())
+    if run_id is not None:
+        await db.execute("""
+            UPDATE session_archive
+            SET ended_at = ?, liquidation_price = ?, liquidation_tick_seq = ?, participants = ?,
+                total_liquidation = ?, average_profit_loss_percentage = ?, winners = ?, losers = ?
+            WHERE run_id = ?
+        """, (ended_at, liquidation.price, tick_seq, totals["users"], totals["total_liquidation"],
+              totals["average_profit_loss_percentage"], totals["winners"], totals["losers"], run_id))
+        # leaderboard_rows: wallet, name, starting, final, tokens, value, P&L, P&L %, price, rank, session
+        await db.executemany("""
+            INSERT OR REPLACE INTO archived_results
+            (run_id, session_id, wallet_address, name, starting_investment, final_investment,
+             profit_loss, profit_loss_percentage, rank_position, archived_at)
+            SELECT ?12, ?11, ?1, COALESCE(users.name, ?2), ?3, ?4, ?7, ?8, ?10, ?13
+            FROM (SELECT 1)
+            LEFT JOIN users ON users.session_id = ?11 AND users.wallet_address = ?1
+        """, (row + (run_id, ended_at) for row in liquidation.leaderboard_rows({}, session_id)))
+    if journal:
+        await db.executemany(INSERT_JOURNAL_SQL, liquidation.journal_rows(session_id, run_id, tick_seq, ended_at))
+
+
+async def compact_runs(pool, ended_before: Optional[str], run_id: Optional[int] = None) -> list:
+    """
+    Fold the journal of finished runs into one journal_summary row per wallet
+    and delete their trades, one transaction per run. Only runs that ended
+    before ended_before (or the given run_id, if finished) are compacted.
+    """
+    async with pool.acquire() as db:
+        if run_id is not None:
+            cursor = await db.execute("""
+                SELECT run_id, session_id FROM session_archive
+                WHERE run_id = ? AND ended_at IS NOT NULL AND NOT compacted
+            """, (run_id,))
+        else:
+            cursor = await db.execute("""
+                SELECT run_id, session_id FROM session_archive
+                WHERE ended_at IS NOT NULL AND ended_at < ? AND NOT compacted
+                ORDER BY run_id
+            """, (ended_before,))
+        runs = await cursor.fetchall()
+
+    compacted = []
+    for run, session_id in runs:
+        async with pool.acquire() as db:
+            await db.execute("""
+                INSERT OR REPLACE INTO journal_summary
+                (run_id, session_id, wallet_address, trades, buys, sells, cash_spent, cash_received,
+                 tokens_bought, tokens_sold, first_trade_at, last_trade_at)
+                -- sells include the final liquidation sale
+                SELECT run_id, session_id, wallet_address, COUNT(*),
+                       TOTAL(action = 'buy'), TOTAL(action <> 'buy'),
+                       TOTAL(CASE WHEN action = 'buy' THEN cash_amount END),
+                       TOTAL(CASE WHEN action <> 'buy' THEN cash_amount END),
+                       TOTAL(CASE WHEN action = 'buy' THEN token_amount END),
+                       TOTAL(CASE WHEN action <> 'buy' THEN token_amount END),
+                       MIN(executed_at), MAX(executed_at)
+                FROM trade_journal
+                WHERE run_id = ?
+                GROUP BY run_id, session_id, wallet_address
+            """, (run,))
+            cursor = await db.execute("DELETE FROM trade_journal WHERE run_id = ?", (run,))
+            deleted = cursor.rowcount
+            await db.execute("UPDATE session_archive SET compacted = TRUE WHERE run_id = ?", (run,))
+            await db.commit()
+        compacted.append({"run_id": run, "session_id": session_id, "trades_compacted": deleted})
+    return compacted
+
+
+async def fetch_trades(pool, session_id: str, wallet_address: Optional[str], run_id: Optional[int],
+                       after: Optional[tuple], limit: int) -> tuple[list, Optional[tuple]]:
+    """One newest-first keyset page of trade_journal: (rows, (executed_at, trade_id) to continue after)"""
+    conditions = ["session_id = ?"]
+    params = [session_id]
+    if wallet_address is not None:
+        conditions.append("wallet_address = ?")
+        params.append(wallet_address)
+    if run_id is not None:
+        conditions.append("run_id = ?")
+        params.append(run_id)
+    if after is not None:
+        conditions.append("(executed_at, trade_id) < (?, ?)")
+        params.extend(after)
+
+    async with pool.acquire() as db:
+        cursor = await db.execute(f"""
+            SELECT {", ".join(TRADE_COLUMNS)}
+            FROM trade_journal
+            WHERE {" AND ".join(conditions)}
+            ORDER BY executed_at DESC, trade_id DESC
+            LIMIT ?
+        """, (*params, limit + 1))
+        rows = await cursor.fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][11], rows[-1][0])
+
+
+async def fetch_runs(pool, session_id: Optional[str], after: Optional[int], limit: int) -> tuple[list, Optional[int]]:
+    """One newest-first keyset page of session_archive: (rows, run_id to continue after)"""
+    conditions = []
+    params = []
+    if session_id is not None:
+        conditions.append("session_id = ?")
+        params.append(session_id)
+    if after is not None:
+        conditions.append("run_id < ?")
+        params.append(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    async with pool.acquire() as db:
+        cursor = await db.execute(f"""
+            SELECT {", ".join(RUN_COLUMNS)}
+            FROM session_archive
+            {where}
+            ORDER BY run_id DESC
+            LIMIT ?
+        """, (*params, limit + 1))
+        rows = await cursor.fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, rows[-1][0]
+
+
+async def fetch_results(pool, run_id: int, after: Optional[int], limit: int) -> tuple[list, Optional[int]]:
+    """One keyset page of a run's archived_results by rank: (rows, rank to continue after)"""
+    async with pool.acquire() as db:
+        cursor = await db.execute(f"""
+            SELECT {", ".join(RESULT_COLUMNS)}
+            FROM archived_results
+            WHERE run_id = ? AND rank_position > ?
+            ORDER BY rank_position
+            LIMIT ?
+        """, (run_id, 0 if after is None else after, limit + 1))
+        rows = await cursor.fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, rows[-1][8]
+
+
+async def fetch_wallet_summary(pool, run_id: int, wallet_address: Optional[str] = None) -> list:
+    """Compacted per-wallet journal totals of a run"""
+    query = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM journal_summary WHERE run_id = ?"
+    params = [run_id]
+    if wallet_address is not None:
+        query += " AND wallet_address = ?"
+        params.append(wallet_address)
+    async with pool.acquire() as db:
+        cursor = await db.execute(query + " ORDER BY wallet_address", params)
+        return await cursor.fetchall()
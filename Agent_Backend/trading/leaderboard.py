@@ -0,0 +1,92 @@
+import math
+from typing import Optional
+
+from sortedcontainers import SortedList
+
+
+class LiveLeaderboard:
+    """
+    Wallets ranked by mark-to-market P&L, maintained incrementally.
+
+    Entries are (-profit_loss, wallet_address) tuples in a SortedList, so a
+    trade re-ranks one wallet in O(log n) and top-K / rank-of-wallet queries
+    are O(log n + K). A new price re-values every wallet, so reprice() is a
+    full O(n log n) rebuild and is skipped when the price did not change.
+    """
+
+    def __init__(self):
+        self.price: Optional[float] = None
+        self._ranked = SortedList()
+        self._keys = {}       # {wallet_address: sort key currently in _ranked}
+        self._positions = {}  # {wallet_address: Position}
+        self.names = {}       # {wallet_address: display name}
+        self.rebuilds = 0
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def _key(self, position) -> tuple:
+        price = self.price or 0.0
+        value = position.current_investment + position.current_tokens * price
+        return (-(value - position.starting_investment), position.wallet_address)
+
+    def update(self, position):
+        """Re-rank one wallet after its position changed"""
+        wallet = position.wallet_address
+        old_key = self._keys.get(wallet)
+        if old_key is not None:
+            self._ranked.remove(old_key)
+        key = self._key(position)
+        self._ranked.add(key)
+        self._keys[wallet] = key
+        self._positions[wallet] = position
+
+    def remove(self, wallet_address: str):
+        key = self._keys.pop(wallet_address, None)
+        if key is not None:
+            self._ranked.remove(key)
+        self._positions.pop(wallet_address, None)
+
+    def reprice(self, price: float):
+        """Re-value every wallet at a new mark price"""
+        if price == self.price:
+            return
+        self.price = price
+        self._keys = {wallet: self._key(position) for wallet, position in self._positions.items()}
+        self._ranked = SortedList(self._keys.values())
+        self.rebuilds += 1
+
+    def clear(self):
+        self._ranked.clear()
+        self._keys.clear()
+        self._positions.clear()
+
+    def _entry(self, rank: int, key: tuple) -> dict:
+        wallet = key[1]
+        position = self._positions[wallet]
+        profit_loss = -key[0]
+        starting = position.starting_investment
+        return {
+            "rank": rank,
+            "wallet_address": wallet,
+            "name": self.names.get(wallet, f"User_{wallet[:8]}"),
+            "current_investment": position.current_investment,
+            "current_tokens": position.current_tokens,
+            "total_current_value": starting + profit_loss,
+            "profit_loss": profit_loss,
+            "profit_loss_percentage": round(profit_loss / starting * 100, 2) if starting > 0 else 0
+        }
+
+    def top(self, k: int) -> list:
+        return [self._entry(rank, key) for rank, key in enumerate(self._ranked.islice(0, k), 1)]
+
+    def winners(self) -> int:
+        """Wallets at or above break-even at the mark price, in O(log n)"""
+        # Keys are (-profit_loss, wallet): winners are every key below (+tiny,)
+        return self._ranked.bisect_left((math.nextafter(0.0, 1.0),))
+
+    def rank_of(self, wallet_address: str) -> Optional[dict]:
+        key = self._keys.get(wallet_address)
+        if key is None:
+            return None
+        return self._entry(self._ranked.index(key) + 1, key)
@@ -0,0 +1,304 @@
+import asyncio
+import calendar
+import time
+from typing import Optional
+
+from trading.aggregates import PoolAggregates
+
+STARTING_BALANCE = 1000.0
+DEFAULT_SESSION_ID = "default"
+
+UPSERT_POSITION_SQL = """
+    INSERT INTO trading_positions
+    (session_id, wallet_address, starting_investment, current_investment, current_tokens,
+     buy_sell_calls, last_tick_seq, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(session_id, wallet_address) DO UPDATE SET
+        current_investment = excluded.current_investment,
+        current_tokens = excluded.current_tokens,
+        buy_sell_calls = excluded.buy_sell_calls,
+        last_tick_seq = excluded.last_tick_seq,
+        updated_at = excluded.updated_at
+"""
+
+INSERT_JOURNAL_SQL = """
+    INSERT INTO trade_journal
+    (session_id, run_id, wallet_address, action, price, tick_seq, cash_amount, token_amount,
+     investment_after, tokens_after, executed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def format_timestamp(epoch: float) -> str:
+    """Format like SQLite CURRENT_TIMESTAMP (UTC, second precision)"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def parse_timestamp(value) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(calendar.timegm(time.strptime(value[:19], "%Y-%m-%d %H:%M:%S")))
+    except ValueError:
+        return None
+
+
+class Position:
+    """One wallet's trading position (compact, slot-based)"""
+
+    __slots__ = (
+        "wallet_address",
+        "starting_investment",
+        "current_investment",
+        "current_tokens",
+        "buy_sell_calls",
+        "last_tick_seq",
+        "created_at",
+        "updated_at"
+    )
+
+    def __init__(self, wallet_address: str, starting_investment: float = STARTING_BALANCE,
+                 current_investment: Optional[float] = None, current_tokens: float = 0.0,
+                 buy_sell_calls: int = 0, last_tick_seq: Optional[int] = None,
+                 created_at: Optional[float] = None, updated_at: Optional[float] = None):
+        now = time.time()
+        self.wallet_address = wallet_address
+        self.starting_investment = starting_investment
+        self.current_investment = starting_investment if current_investment is None else current_investment
+        self.current_tokens = current_tokens
+        self.buy_sell_calls = buy_sell_calls
+        self.last_tick_seq = last_tick_seq
+        self.created_at = now if created_at is None else created_at
+        self.updated_at = now if updated_at is None else updated_at
+
+    def to_row(self) -> tuple:
+        return (
+            self.wallet_address,
+            self.starting_investment,
+            self.current_investment,
+            self.current_tokens,
+            self.buy_sell_calls,
+            self.last_tick_seq,
+            format_timestamp(self.created_at),
+            format_timestamp(self.updated_at)
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "wallet_address": self.wallet_address,
+            "starting_investment": self.starting_investment,
+            "current_investment": self.current_investment,
+            "current_tokens": self.current_tokens,
+            "buy_sell_calls": self.buy_sell_calls,
+            "last_tick_seq": self.last_tick_seq,
+            "created_at": format_timestamp(self.created_at),
+            "updated_at": format_timestamp(self.updated_at)
+        }
+
+    def copy(self) -> "Position":
+        return Position(*(getattr(self, field) for field in self.__slots__))
+
+
+class PositionLedger:
+    """
+    In-memory trading_positions rows of one session with write-behind persistence.
+
+    Trades mutate Position objects directly; changed wallets are marked
+    dirty and written to SQLite in one batched transaction every
+    flush_interval seconds, and whenever flush() is awaited explicitly
+    (liquidation, shutdown, reads of the raw table).
+
+    Every fill is also appended to the trade_journal; pending journal rows
+    are written in the same transaction as the positions they produced and
+    survive clear(), since the journal is history rather than state.
+
+    With a committer (GroupCommitQueue) the ledger is write-through instead:
+    persist() waits until the trade is committed together with the other
+    trades that arrived in the same few milliseconds.
+    """
+
+    def __init__(self, pool, session_id: str = DEFAULT_SESSION_ID, flush_interval: float = 1.0, committer=None):
+        self.pool = pool
+        self.session_id = session_id
+        self.flush_interval = flush_interval
+        self.committer = committer
+        self.positions = {}  # {wallet_address: Position}
+        self._dirty = set()
+        self._journal = []   # trade_journal rows not written yet
+        self.run_id: Optional[int] = None  # session_archive run the journal rows belong to
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flush_count = 0
+        self.rows_flushed = 0
+        self.trades_journaled = 0
+        self.version = 0  # bumped on every in-memory change, for response snapshots
+        self.aggregates = PoolAggregates()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get(self, wallet_address: str) -> Optional[Position]:
+        return self.positions.get(wallet_address)
+
+    def get_or_create(self, wallet_address: str) -> tuple[Position, bool]:
+        """Return (position, created) - new wallets start with the default balance"""
+        position = self.positions.get(wallet_address)
+        if position is not None:
+            return position, False
+        position = Position(wallet_address)
+        self.positions[wallet_address] = position
+        self._dirty.add(wallet_address)
+        self.aggregates.book(position)
+        self.version += 1
+        return position, True
+
+    def mark_dirty(self, position: Position):
+        position.updated_at = time.time()
+        self._dirty.add(position.wallet_address)
+        self.aggregates.book(position)
+        self.version += 1
+
+    def record_trade(self, position: Position, action: str, cash_amount: float, token_amount: float,
+                     price: float, tick_seq: Optional[int] = None):
+        """Append one fill of position to the trade journal"""
+        self._journal.append((
+            self.session_id, self.run_id, position.wallet_address, action, price, tick_seq,
+            cash_amount, token_amount, position.current_investment, position.current_tokens,
+            format_timestamp(time.time())
+        ))
+
+    def record_rows(self, rows: list):
+        """Append prepared trade_journal rows (e.g. a whole liquidation)"""
+        self._journal.extend(rows)
+
+    async def persist(self, position: Position):
+        """Make a trade durable now when write-through, otherwise leave it to the flusher"""
+        if self.committer is None:
+            return
+        self._dirty.discard(position.wallet_address)
+        journal, self._journal = self._journal, []
+        # Submitted together so the position and its journal rows share one group commit
+        await asyncio.gather(
+            self.committer.submit(UPSERT_POSITION_SQL, (self.session_id, *position.to_row())),
+            *(self.committer.submit(INSERT_JOURNAL_SQL, row) for row in journal)
+        )
+        self.trades_journaled += len(journal)
+
+    def all(self) -> list:
+        return list(self.positions.values())
+
+    def clear(self):
+        """Forget every position (the table itself is reset by the caller)"""
+        self.positions.clear()
+        self._dirty.clear()
+        self.aggregates.clear()
+        self.version += 1
+
+    async def reset(self):
+        """Clear memory without racing a flush that is already writing"""
+        async with self._flush_lock:
+            self.clear()
+
+    def snapshot(self) -> dict:
+        """Copies of every position as it is now, for restore()"""
+        return {wallet: position.copy() for wallet, position in self.positions.items()}
+
+    async def restore(self, snapshot: dict):
+        """
+        Put the positions back as they were at snapshot() after a liquidation
+        failed to commit. All of them are rewritten on the next flush, since
+        the failed attempt may already have flushed liquidated values.
+        """
+        async with self._flush_lock:
+            self.positions = {wallet: position.copy() for wallet, position in snapshot.items()}
+            self._dirty = set(self.positions)
+            self.aggregates.rebuild(self.positions.values())
+            self.version += 1
+
+    async def load(self):
+        """Populate memory from this session's trading_positions rows (call once at startup)"""
+        async with self.pool.acquire() as db:
+            cursor = await db.execute("""
+                SELECT wallet_address, starting_investment, current_investment, current_tokens,
+                       buy_sell_calls, last_tick_seq, created_at, updated_at
+                FROM trading_positions
+                WHERE session_id = ?
+            """, (self.session_id,))
+            rows = await cursor.fetchall()
+
+        self.clear()
+        for row in rows:
+            self.positions[row[0]] = Position(
+                wallet_address=row[0],
+                starting_investment=float(row[1]) if row[1] is not None else STARTING_BALANCE,
+                current_investment=float(row[2]) if row[2] is not None else 0.0,
+                current_tokens=float(row[3]) if row[3] is not None else 0.0,
+                buy_sell_calls=int(row[4]) if row[4] is not None else 0,
+                last_tick_seq=row[5],
+                created_at=parse_timestamp(row[6]),
+                updated_at=parse_timestamp(row[7])
+            )
+        self.aggregates.rebuild(self.positions.values())
+        return len(rows)
+
+    async def flush(self) -> int:
+        """Write all dirty positions and pending journal rows in a single transaction"""
+        async with self._flush_lock:
+            if not self._dirty and not self._journal:
+                return 0
+
+            dirty, self._dirty = self._dirty, set()
+            journal, self._journal = self._journal, []
+            rows = [(self.session_id, *self.positions[wallet].to_row()) for wallet in dirty if wallet in self.positions]
+
+            try:
+                async with self.pool.acquire() as db:
+                    await db.executemany(UPSERT_POSITION_SQL, rows)
+                    await db.executemany(INSERT_JOURNAL_SQL, journal)
+                    await db.commit()
+            except Exception:
+                # Keep the rows pending so the next flush retries them
+                self._dirty |= dirty
+                self._journal[:0] = journal
+                raise
+
+            self.flush_count += 1
+            self.rows_flushed += len(rows)
+            self.trades_journaled += len(journal)
+            return len(rows)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Ledger flush failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "write_mode": "sync" if self.committer is not None else "behind",
+            "positions": len(self.positions),
+            "dirty": len(self._dirty),
+            "flush_interval_seconds": self.flush_interval,
+            "flushes": self.flush_count,
+            "rows_flushed": self.rows_flushed,
+            "run_id": self.run_id,
+            "journal_pending": len(self._journal),
+            "trades_journaled": self.trades_journaled
+        }
@@ -0,0 +1,129 @@
+from typing import Optional
+
+import numpy as np
+
+
+class LiquidationBatch:
+    """
+    End-of-session liquidation of every position, held as column arrays.
+
+    One NumPy array per result column instead of one dict per wallet, so
+    valuation, totals and ranking are single vectorized operations and the
+    rows handed to executemany are built with one tolist() per column.
+    """
+
+    def __init__(self, wallets: list, starting_investment, cash, tokens, price: float):
+        self.wallets = wallets
+        self.price = price
+        self.starting_investment = starting_investment
+        self.tokens_liquidated = np.where(tokens > 0, tokens, 0.0)
+        self.liquidation_value = self.tokens_liquidated * price
+        self.final_investment = cash + self.liquidation_value
+        self.profit_loss = self.final_investment - starting_investment
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.profit_loss_percentage = np.where(
+                starting_investment > 0, self.profit_loss / starting_investment * 100, 0.0
+            )
+        self._index = None
+
+    def __len__(self):
+        return len(self.wallets)
+
+    def totals(self) -> dict:
+        count = len(self.wallets)
+        winners = int(np.count_nonzero(self.profit_loss >= 0))
+        return {
+            "users": count,
+            "total_liquidation": float(self.liquidation_value.sum()),
+            "average_profit_loss_percentage": float(self.profit_loss_percentage.mean()) if count else 0.0,
+            "winners": winners,
+            "losers": count - winners
+        }
+
+    def result_for(self, wallet_address: str) -> Optional[dict]:
+        """One wallet's liquidation as a dict, or None if it had no position"""
+        if self._index is None:
+            self._index = {wallet: i for i, wallet in enumerate(self.wallets)}
+        i = self._index.get(wallet_address)
+        if i is None:
+            return None
+        return {
+            "wallet_address": wallet_address,
+            "starting_investment": float(self.starting_investment[i]),
+            "tokens_liquidated": float(self.tokens_liquidated[i]),
+            "liquidation_value": float(self.liquidation_value[i]),
+            "final_investment": float(self.final_investment[i]),
+            "profit_loss": float(self.profit_loss[i]),
+            "profit_loss_percentage": float(self.profit_loss_percentage[i])
+        }
+
+    def result_rows(self, session_id: str, tick_seq=None) -> list:
+        """Rows for liquidation_results, in insertion column order"""
+        count = len(self.wallets)
+        return list(zip(
+            [session_id] * count,
+            self.wallets,
+            self.starting_investment.tolist(),
+            self.final_investment.tolist(),
+            self.tokens_liquidated.tolist(),
+            self.liquidation_value.tolist(),
+            self.profit_loss.tolist(),
+            self.profit_loss_percentage.tolist(),
+            [self.price] * count,
+            [tick_seq] * count
+        ))
+
+    def journal_rows(self, session_id: str, run_id: Optional[int], tick_seq, executed_at: str) -> list:
+        """trade_journal rows recording every wallet's final token sale"""
+        count = len(self.wallets)
+        return list(zip(
+            [session_id] * count,
+            [run_id] * count,
+            self.wallets,
+            ["liquidate"] * count,
+            [self.price] * count,
+            [tick_seq] * count,
+            self.liquidation_value.tolist(),
+            self.tokens_liquidated.tolist(),
+            self.final_investment.tolist(),
+            [0.0] * count,
+            [executed_at] * count
+        ))
+
+    def leaderboard_rows(self, names: dict, session_id: str) -> list:
+        """Rows for current_leaderboard, ranked by P&L percentage (ties keep ledger order)"""
+        order = np.argsort(-self.profit_loss_percentage, kind="stable")
+        wallets = [self.wallets[i] for i in order.tolist()]
+        count = len(wallets)
+        return list(zip(
+            wallets,
+            [names.get(wallet, f"User_{wallet[:8]}") for wallet in wallets],
+            self.starting_investment[order].tolist(),
+            self.final_investment[order].tolist(),
+            self.tokens_liquidated[order].tolist(),
+            self.liquidation_value[order].tolist(),
+            self.profit_loss[order].tolist(),
+            self.profit_loss_percentage[order].tolist(),
+            [self.price] * count,
+            range(1, count + 1),
+            [session_id] * count
+        ))
+
+    def print_users(self):
+        """Per-user console summary (slow for large sessions, so opt-in)"""
+        for i, wallet in enumerate(self.wallets):
+            status_icon = "📈" if self.profit_loss[i] >= 0 else "📉"
+            print(f"{status_icon} {wallet[:10]}...")
+            print(f"   Tokens liquidated: {self.tokens_liquidated[i]:.4f} → ${self.liquidation_value[i]:.2f}")
+            print(f"   Final amount: ${self.final_investment[i]:.2f}")
+            print(f"   P&L: ${self.profit_loss[i]:.2f} ({self.profit_loss_percentage[i]:.2f}%)")
+            print("-" * 40)
+
+
+def liquidate(positions, price: float) -> LiquidationBatch:
+    """Value every position at price as if all tokens were sold"""
+    count = len(positions)
+    starting = np.fromiter((p.starting_investment for p in positions), dtype=np.float64, count=count)
+    cash = np.fromiter((p.current_investment for p in positions), dtype=np.float64, count=count)
+    tokens = np.fromiter((p.current_tokens for p in positions), dtype=np.float64, count=count)
+    return LiquidationBatch([p.wallet_address for p in positions], starting, cash, tokens, price)
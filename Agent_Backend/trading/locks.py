@@ -0,0 +1,52 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+
+
+class WalletLockManager:
+    """
+    Per-wallet asyncio locks, kept in shards.
+
+    Trades for different wallets never wait on each other; trades for the
+    same wallet run one at a time in arrival order (asyncio.Lock is FIFO).
+    Locks exist only while someone holds or waits on them, so memory stays
+    proportional to in-flight wallets rather than every wallet ever seen.
+    """
+
+    def __init__(self, shards: int = 64):
+        self._shards = [{} for _ in range(shards)]  # [{wallet_address: [lock, users]}]
+
+    def _shard(self, wallet_address: str) -> dict:
+        return self._shards[hash(wallet_address) % len(self._shards)]
+
+    @asynccontextmanager
+    async def hold(self, wallet_address: str):
+        """Hold one wallet's lock for the duration of the block"""
+        shard = self._shard(wallet_address)
+        entry = shard.get(wallet_address)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            shard[wallet_address] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del shard[wallet_address]
+
+    @asynccontextmanager
+    async def hold_many(self, wallet_addresses):
+        """Hold several wallets' locks at once (sorted order, so never deadlocks)"""
+        async with AsyncExitStack() as stack:
+            for wallet_address in sorted(set(wallet_addresses)):
+                await stack.enter_async_context(self.hold(wallet_address))
+            yield
+
+    def stats(self) -> dict:
+        sizes = [len(shard) for shard in self._shards]
+        return {
+            "shards": len(self._shards),
+            "active_wallet_locks": sum(sizes),
+            "largest_shard": max(sizes) if sizes else 0
+        }
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Optional
+
+OPEN = "open"
+LIQUIDATING = "liquidating"
+CLOSED = "closed"
+
+TRANSITIONS = {
+    OPEN: {LIQUIDATING, CLOSED},
+    LIQUIDATING: {CLOSED, OPEN},  # back to open only if liquidation failed
+    CLOSED: {OPEN}
+}
+
+
+class PoolState:
+    """
+    Open / liquidating / closed state of one pool.
+
+    The in-memory value is authoritative, so trade checks never touch the
+    database; every transition is written through to pool_settings (state
+    and the legacy is_over flag). Waiters can await a target state.
+    """
+
+    def __init__(self, pool, session_id: str, current: str = OPEN):
+        self.pool = pool
+        self.session_id = session_id
+        self.current = current
+        self.version = 0  # bumped on every change, for response snapshots
+        self.on_change = None  # optional callback(PoolState) after every change
+        self._changed = asyncio.Event()
+
+    @property
+    def is_open(self) -> bool:
+        return self.current == OPEN
+
+    def _notify(self):
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def restore(self, state: str):
+        """Set the state without writing it (loading, or after the caller wrote the row)"""
+        self.current = state
+        self._notify()
+
+    async def transition(self, new_state: str) -> bool:
+        """Move to new_state and persist it; False if already there"""
+        if new_state == self.current:
+            return False
+        if new_state not in TRANSITIONS[self.current]:
+            raise ValueError(f"Pool {self.session_id} cannot go from {self.current} to {new_state}")
+
+        self.current = new_state
+        self._notify()
+        async with self.pool.acquire() as db:
+            await db.execute("""
+                UPDATE pool_settings
+                SET state = ?, is_over = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
+            """, (new_state, new_state != OPEN, self.session_id))
+            await db.commit()
+        return True
+
+    async def wait_for(self, *states: str, timeout: Optional[float] = None) -> str:
+        """Wait until the pool is in one of states, returning the state reached"""
+        async def wait():
+            while self.current not in states:
+                await self._changed.wait()
+            return self.current
+        return await asyncio.wait_for(wait(), timeout)
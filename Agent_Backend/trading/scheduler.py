@@ -0,0 +1,140 @@
+import asyncio
+import heapq
+import time
+from typing import Optional
+
+UPSERT_DEADLINE_SQL = """
+    INSERT INTO pool_deadlines (session_id, deadline) VALUES (?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET deadline = excluded.deadline
+"""
+
+
+class DeadlineScheduler:
+    """
+    Pool expiry deadlines on a min-heap, persisted to pool_deadlines.
+
+    One background task sleeps until the earliest deadline and fires
+    on_expire(session_id) for every pool due at that moment concurrently.
+    Deadlines are wall-clock epochs so they survive a restart: load()
+    rehydrates the heap and anything already overdue fires immediately.
+    A deadline stays registered until its on_expire call finishes, so
+    expired() keeps rejecting trades while the pool is being liquidated.
+    When on_expire raises or returns False (the pool did not close), the
+    deadline stays registered and fires again retry_delay seconds later.
+    Rescheduled or cancelled entries are left in the heap and skipped.
+    """
+
+    def __init__(self, pool, on_expire, retry_delay: float = 5.0):
+        self.pool = pool
+        self.on_expire = on_expire
+        self.retry_delay = retry_delay
+        self._deadlines = {}  # {session_id: deadline epoch}
+        self._heap = []       # [(fire at, session_id, deadline)]
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._firing = set()
+        self.fired = 0
+        self.retries = 0
+
+    def deadline_of(self, session_id: str) -> Optional[float]:
+        return self._deadlines.get(session_id)
+
+    def expired(self, session_id: str, now: Optional[float] = None) -> bool:
+        """True once a session's deadline has passed (checked in memory)"""
+        deadline = self._deadlines.get(session_id)
+        return deadline is not None and deadline <= (time.time() if now is None else now)
+
+    async def schedule(self, session_id: str, deadline: float):
+        """Persist and arm a session's deadline, replacing any earlier one"""
+        async with self.pool.acquire() as db:
+            await db.execute(UPSERT_DEADLINE_SQL, (session_id, deadline))
+            await db.commit()
+        self._deadlines[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id, deadline))
+        self._wakeup.set()
+
+    async def cancel(self, session_id: str) -> bool:
+        """Disarm a session's deadline, returning whether one was set"""
+        if self._deadlines.pop(session_id, None) is None:
+            return False
+        await self._delete(session_id)
+        return True
+
+    async def load(self) -> int:
+        """Rebuild the heap from pool_deadlines (call once at startup)"""
+        async with self.pool.acquire() as db:
+            cursor = await db.execute("SELECT session_id, deadline FROM pool_deadlines")
+            rows = await cursor.fetchall()
+        self._deadlines = {session_id: float(deadline) for session_id, deadline in rows}
+        self._heap = [(deadline, session_id, deadline) for session_id, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        return len(rows)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = [task for task in (self._task, *self._firing) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _delete(self, session_id: str):
+        async with self.pool.acquire() as db:
+            await db.execute("DELETE FROM pool_deadlines WHERE session_id = ?", (session_id,))
+            await db.commit()
+
+    async def _fire(self, session_id: str, deadline: float):
+        try:
+            closed = await self.on_expire(session_id)
+        except asyncio.CancelledError:
+            raise  # shutdown mid-liquidation: the row stays and fires again on restart
+        except Exception as e:
+            print(f"❌ Pool expiry failed for {session_id}: {str(e)}")
+            closed = False
+
+        self.fired += 1
+        # A reschedule during liquidation (new session) keeps its new deadline
+        if self._deadlines.get(session_id) != deadline:
+            return
+        if not closed:
+            # Still armed (and persisted), so trades stay rejected until a retry closes it
+            self.retries += 1
+            print(f"🔁 Pool {session_id} did not close, retrying in {self.retry_delay:g}s")
+            heapq.heappush(self._heap, (time.time() + self.retry_delay, session_id, deadline))
+            self._wakeup.set()
+            return
+        del self._deadlines[session_id]
+        await self._delete(session_id)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, session_id, deadline = heapq.heappop(self._heap)
+                if self._deadlines.get(session_id) != deadline:
+                    continue  # cancelled or rescheduled
+                task = asyncio.create_task(self._fire(session_id, deadline))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        now = time.time()
+        upcoming = min(self._deadlines.values(), default=None)
+        return {
+            "scheduled": len(self._deadlines),
+            "heap_entries": len(self._heap),
+            "firing": len(self._firing),
+            "fired": self.fired,
+            "retries": self.retries,
+            "next_deadline_in_seconds": round(upcoming - now, 3) if upcoming is not None else None
+        }
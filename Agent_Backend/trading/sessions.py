@@ -0,0 +1,114 @@
+from typing import Optional
+
+from trading.ledger import DEFAULT_SESSION_ID, PositionLedger
+from trading.leaderboard import LiveLeaderboard
+from trading.locks import WalletLockManager
+from trading.pool_state import PoolState, OPEN, CLOSED
+
+
+class PoolSession:
+    """One trading pool: its token, open/closed state, positions, live ranking and wallet locks"""
+
+    def __init__(self, session_id: str, ledger: PositionLedger, chain_id: Optional[str] = None,
+                 token_address: Optional[str] = None, lock_shards: int = 64):
+        self.session_id = session_id
+        self.chain_id = chain_id
+        self.token_address = token_address
+        self.ledger = ledger
+        self.state = PoolState(ledger.pool, session_id)
+        self.leaderboard = LiveLeaderboard()
+        self.locks = WalletLockManager(shards=lock_shards)
+        self.results_version = 0  # bumped whenever current_leaderboard is rewritten, for snapshots
+
+    def trades_token(self, chain_id: Optional[str], token_address: Optional[str]) -> bool:
+        if not self.token_address or not token_address:
+            return False
+        if self.chain_id and chain_id and self.chain_id != chain_id:
+            return False
+        return self.token_address.lower() == token_address.lower()
+
+    def summary(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "chain_id": self.chain_id,
+            "token_address": self.token_address,
+            "pool_state": self.state.current,
+            "participants": len(self.ledger)
+        }
+
+
+class SessionRegistry:
+    """
+    Every pool hosted by this process, keyed by session_id.
+
+    Each session owns its ledger (and ledger flusher), live leaderboard and
+    wallet locks, so pools never share in-memory state; the database tables
+    are shared and keyed by session_id. pool_settings holds one row per
+    session and is what load() rehydrates from at startup.
+    """
+
+    def __init__(self, pool, flush_interval: float = 1.0, committer=None, lock_shards: int = 64):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.committer = committer
+        self.lock_shards = lock_shards
+        self.on_state_change = None  # optional callback(PoolState), wired into every session
+        self.sessions = {}  # {session_id: PoolSession}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id: str) -> Optional[PoolSession]:
+        return self.sessions.get(session_id)
+
+    def create(self, session_id: str, chain_id: Optional[str] = None,
+               token_address: Optional[str] = None) -> PoolSession:
+        """Return the session, creating it (and starting its ledger flusher) if new"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            ledger = PositionLedger(self.pool, session_id=session_id, flush_interval=self.flush_interval,
+                                    committer=self.committer)
+            session = PoolSession(session_id, ledger, lock_shards=self.lock_shards)
+            session.state.on_change = self.on_state_change
+            self.sessions[session_id] = session
+            ledger.start()
+        if chain_id is not None:
+            session.chain_id = chain_id
+        if token_address is not None:
+            session.token_address = token_address
+        return session
+
+    def all(self) -> list:
+        return list(self.sessions.values())
+
+    def trading(self, chain_id: Optional[str], token_address: Optional[str]) -> list:
+        """Sessions whose pool trades the given token"""
+        return [session for session in self.sessions.values() if session.trades_token(chain_id, token_address)]
+
+    async def load(self) -> int:
+        """Recreate every session recorded in pool_settings and load its positions"""
+        async with self.pool.acquire() as db:
+            cursor = await db.execute("SELECT session_id, chain_id, token_address, state, is_over, run_id FROM pool_settings")
+            rows = await cursor.fetchall()
+
+        for session_id, chain_id, token_address, state, is_over, run_id in rows:
+            session = self.create(session_id, chain_id, token_address)
+            session.state.restore(state or (CLOSED if is_over else OPEN))
+            session.ledger.run_id = run_id
+            await session.ledger.load()
+            for position in session.ledger.all():
+                session.leaderboard.update(position)
+        if DEFAULT_SESSION_ID not in self.sessions:
+            self.create(DEFAULT_SESSION_ID)
+        return len(self.sessions)
+
+    async def stop(self):
+        """Stop every ledger flusher, flushing what is left"""
+        for session in self.sessions.values():
+            await session.ledger.stop()
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "positions": sum(len(session.ledger) for session in self.sessions.values())
+        }
@@ -1,5 +1,7 @@
 import os
+import sys
 import time
+import asyncio
 import json
 import threading
 import subprocess
@@ -10,10 +12,15 @@ from dotenv import load_dotenv
 import signal
 import psutil
 import shutil
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from redis_docker_engine.setup_redis import setup_docker_redis_engine
-from user_setup.codegen import create_code
+from user_setup.codegen import create_code, allowed_modules, build_prompt, CODEGEN_MODEL, PROMPT_VERSION
+from user_setup.code_cache import CodeCache, validate_code
+from strategy_runtime.pool import StrategyPool
+from strategy_runtime.loader import StrategyLoadError
+from strategy_runtime.metrics import LaunchTimes
+from strategy_runtime.zygote import AgentZygote, zygote_supported
 from pydantic import BaseModel
 
 REDIS_HOST = "localhost"
@@ -38,6 +45,61 @@ stop_signal = threading.Event()
 REDIS_KEY = "dex_live_data"
 client_processes = {}  # {wallet_address: subprocess.Popen}
 
+# AGENT_RUNTIME=process launches every agent as its own Python subprocess.
+# AGENT_RUNTIME=pooled generates decide() functions instead and hosts them in
+# RUNTIME_WORKERS processes; each worker reads a tick once, evaluates all of its
+# strategies and posts their decisions to DECISION_BATCH_URL in one request
+AGENT_RUNTIME = os.getenv("AGENT_RUNTIME", "process").lower()
+
+# LLM code generation: CODEGEN_CONCURRENCY completions in flight at once (across /start
+# and /add_client), each abandoned after CODEGEN_TIMEOUT seconds
+CODEGEN_CONCURRENCY = int(os.getenv("CODEGEN_CONCURRENCY", "3"))
+CODEGEN_TIMEOUT = float(os.getenv("CODEGEN_TIMEOUT", "120"))
+# CODEGEN_STREAM=on streams completions and stops reading at the end of the code block
+CODEGEN_STREAM = os.getenv("CODEGEN_STREAM", "on").lower() not in ("0", "off", "false", "no")
+codegen_slots = asyncio.Semaphore(CODEGEN_CONCURRENCY)
+
+# Validated generated code is cached on disk by a hash of (prompt version, model, prompt),
+# so identical strategies skip the LLM. CODE_CACHE_MAX_ENTRIES files are kept, least
+# recently used evicted first; CODE_CACHE=off (or bypass_cache in a request) skips it
+CODE_CACHE_ENABLED = os.getenv("CODE_CACHE", "on").lower() not in ("0", "off", "false", "no")
+code_cache = CodeCache(
+    os.getenv("CODE_CACHE_DIR", os.path.join("database", "code_cache")),
+    max_entries=int(os.getenv("CODE_CACHE_MAX_ENTRIES", "256"))
+)
+
+# Each agent's timeline from /add_client (or /start) to its first posted decision
+launch_times = LaunchTimes()
+strategy_pool = StrategyPool(
+    workers=int(os.getenv("RUNTIME_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    config={
+        "redis_host": REDIS_HOST,
+        "redis_port": REDIS_PORT,
+        "channel": CHANNEL_NAME,
+        "decision_url": os.getenv("DECISION_BATCH_URL", "http://localhost:8000/decision/batch"),
+        "post_timeout": float(os.getenv("DECISION_POST_TIMEOUT", "5")),
+        "poll_interval": 0.1,
+        "preload": allowed_modules()
+    },
+    metrics=launch_times
+)
+
+# Process-runtime agents are forked from a zygote that imported the allowed libraries
+# once, with ZYGOTE_IDLE_WORKERS forked in advance (AGENT_LAUNCHER=zygote, the default
+# where the platform has a fork server). AGENT_LAUNCHER=subprocess starts a fresh venv
+# interpreter per agent instead
+AGENT_LAUNCHER = os.getenv("AGENT_LAUNCHER", "zygote" if zygote_supported() else "subprocess").lower()
+ZYGOTE_PYTHON = os.path.abspath(os.path.join("venv", "bin", "python"))
+if not os.path.exists(ZYGOTE_PYTHON):
+    print(f"[Zygote] ⚠️ Virtual environment not found at {ZYGOTE_PYTHON}; agents fork from {sys.executable} instead")
+    ZYGOTE_PYTHON = sys.executable
+agent_zygote = AgentZygote(
+    python=ZYGOTE_PYTHON,
+    preload=allowed_modules(),
+    idle=int(os.getenv("ZYGOTE_IDLE_WORKERS", "2")),
+    metrics=launch_times
+) if AGENT_RUNTIME == "process" and AGENT_LAUNCHER == "zygote" else None
+
 # ---------- Startup Hook ----------
 @app.on_event("startup")
 async def startup_event():
@@ -55,6 +117,16 @@ async def startup_event():
         f.write("")
         f.close()
 
+    if agent_zygote is not None:
+        print("[BOOT] 🧬 Warming agent zygote")
+        agent_zygote.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    strategy_pool.stop()
+    if agent_zygote is not None:
+        agent_zygote.stop()
+
 # ---------- Utilities ----------
 def extract_numeric_fields(data):
     if not data:
@@ -74,6 +146,7 @@ async def start_publisher(chain_id: str, token_address: str, stop_event: threadi
     def publisher():
         print("[Publisher] 🔄 Started")
         r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT)
+        seq = 0
         
         while not stop_event.is_set():
             try:
@@ -81,6 +154,13 @@ async def start_publisher(chain_id: str, token_address: str, stop_event: threadi
                 response = requests.get(url, headers={"Accept": "*/*"})
                 data = response.json()
                 numeric = extract_numeric_fields(data)
+
+                # Tag each tick so consumers can tell which snapshot filled a trade
+                seq += 1
+                numeric["seq"] = seq
+                numeric["chainId"] = chain_id
+                numeric["tokenAddress"] = token_address
+                numeric["timestamp"] = time.time()
                 
                 # Publish the data to the channel
                 r.publish(CHANNEL_NAME, json.dumps(numeric))
@@ -94,14 +174,59 @@ async def start_publisher(chain_id: str, token_address: str, stop_event: threadi
 
     threading.Thread(target=publisher, daemon=True).start()
 
+async def generate_agent_code(strategy: str, wallet: str, bypass_cache: bool = False) -> str:
+    """
+    One agent's code: from the code cache when the same prompt was generated
+    before, otherwise from the LLM with at most CODEGEN_CONCURRENCY calls in
+    flight and CODEGEN_TIMEOUT each
+    """
+    use_cache = CODE_CACHE_ENABLED and not bypass_cache
+    key = code_cache.key(PROMPT_VERSION, CODEGEN_MODEL, AGENT_RUNTIME, build_prompt(strategy, wallet, AGENT_RUNTIME))
+    if use_cache:
+        cached = code_cache.get(key)
+        if cached is not None:
+            launch_times.mark(wallet, "code_ready", cached=True)
+            print(f"[Codegen] ⚡ Cache hit for {wallet} ({key[:12]})")
+            return cached
+
+    async with codegen_slots:
+        code_str = await asyncio.wait_for(create_code(strategy, wallet, runtime=AGENT_RUNTIME, stream=CODEGEN_STREAM),
+                                          CODEGEN_TIMEOUT)
+    executable_code = await extract_code_from_response(code_str)
+    launch_times.mark(wallet, "code_ready", cached=False)
+
+    # Only code that would load is worth reusing (a bypass still refreshes the entry)
+    problem = validate_code(executable_code, AGENT_RUNTIME)
+    if problem is None and CODE_CACHE_ENABLED:
+        code_cache.put(key, executable_code)
+    elif problem is not None:
+        print(f"[Codegen] ⚠️ Not caching code for {wallet}: {problem}")
+    return executable_code
+
+def venv_python_path() -> str:
+    return os.path.join("venv", "Scripts", "python.exe") if os.name == "nt" else os.path.join("venv", "bin", "python")
+
+def launch_agent_process(wallet: str, agent_file: str) -> int:
+    """
+    Start a process-runtime agent, warm from the zygote or as a fresh venv interpreter.
+    Blocking (the zygote may first need starting), so handlers run it in a thread.
+    """
+    if agent_zygote is not None:
+        return agent_zygote.launch(wallet, agent_file)
+    proc = subprocess.Popen([venv_python_path(), agent_file])
+    client_processes[wallet] = proc
+    return proc.pid
+
 # ---------- Request Schemas ----------
 class StartRequest(BaseModel):
     chain_id: str
     token_address: str
+    bypass_cache: bool = False  # regenerate the agents even if their code is cached
 
 class AddClientRequest(BaseModel):
     wallet_address: str
     strategy: str
+    bypass_cache: bool = False
 
 import requests
 import os
@@ -174,12 +299,17 @@ async def start_pool(request: StartRequest):
 
     # 2. Initialize client list file
     os.makedirs("database", exist_ok=True)
-
-    # 3. Create and register all agents
     for agent in agent_definitions:
-        # Generate the agent's trading code
-        code_str = await create_code(agent["strategy"], agent["wallet"])
-        executable_code = await extract_code_from_response(code_str)
+        launch_times.requested(agent["wallet"])
+
+    # 3. Generate every agent's code concurrently; each deploys as soon as its own is ready
+    async def deploy_agent(agent: dict) -> dict:
+        try:
+            executable_code = await generate_agent_code(agent["strategy"], agent["wallet"], request.bypass_cache)
+        except asyncio.TimeoutError:
+            return {"wallet": agent["wallet"], "status": "failed", "error": f"code generation timed out after {CODEGEN_TIMEOUT:g}s"}
+        except Exception as e:
+            return {"wallet": agent["wallet"], "status": "failed", "error": f"code generation failed: {e}"}
         with open("database/client_list_data.txt", "a") as f:
             f.write(f"{agent['wallet']}\n")
         # Save the agent's code
@@ -188,13 +318,28 @@ async def start_pool(request: StartRequest):
             f.write(executable_code)
         
         # Register agent in the system
-        venv_python = os.path.join("venv", "Scripts", "python.exe") if os.name == "nt" else os.path.join("venv", "bin", "python")
-        proc = subprocess.Popen([venv_python, agent_file])
-        client_processes[agent["wallet"]] = proc
-        
-        print(f"🤖 [Agent Deployed] {agent['name']} ({agent['wallet']})")
-
-    print("✅ All trading agents initialized and running")
+        if AGENT_RUNTIME == "pooled":
+            try:
+                strategy_pool.add(agent["wallet"], executable_code)
+            except StrategyLoadError as e:
+                return {"wallet": agent["wallet"], "status": "failed", "error": str(e)}
+        else:
+            await asyncio.to_thread(launch_agent_process, agent["wallet"], agent_file)
+        launch_times.mark(agent["wallet"], "launched", runtime=AGENT_RUNTIME)
+        return {"wallet": agent["wallet"], "status": "deployed", "launch": launch_times.report(agent["wallet"])}
+
+    names = {agent["wallet"]: agent["name"] for agent in agent_definitions}
+    deployments = []
+    for deployment in asyncio.as_completed([deploy_agent(agent) for agent in agent_definitions]):
+        result = await deployment
+        deployments.append(result)
+        if result["status"] == "deployed":
+            print(f"🤖 [Agent Deployed] {names[result['wallet']]} ({result['wallet']})")
+        else:
+            print(f"❌ [Agent Failed] {names[result['wallet']]} ({result['wallet']}): {result['error']}")
+
+    deployed = sum(1 for result in deployments if result["status"] == "deployed")
+    print(f"✅ {deployed}/{len(agent_definitions)} trading agents initialized and running")
 
     client_list = await send_client_list(chain_id, token_address)
 
@@ -204,7 +349,8 @@ async def start_pool(request: StartRequest):
     return {
         "message": "Publisher started.",
         "chain_id": chain_id,
-        "token_address": token_address
+        "token_address": token_address,
+        "agents": deployments
     }
 
 async def extract_code_from_response(code_str: str) -> str:
@@ -236,6 +382,7 @@ async def extract_code_from_response(code_str: str) -> str:
 async def add_client(request: AddClientRequest):
     wallet = request.wallet_address
     strategy = request.strategy
+    launch_times.requested(wallet)
 
     os.makedirs("database", exist_ok=True)
     
@@ -250,27 +397,44 @@ async def add_client(request: AddClientRequest):
         f.write(wallet + "\n")
 
     # 1. Generate code string
-    code_str = await create_code(strategy, wallet)
-    code_str = await extract_code_from_response(code_str)
+    try:
+        code_str = await generate_agent_code(strategy, wallet, request.bypass_cache)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Code generation for {wallet} timed out after {CODEGEN_TIMEOUT:g}s")
     # 2. Write code to user_runtime dir
     os.makedirs("user_runtime", exist_ok=True)
     file_path = os.path.join("user_runtime", f"{wallet}.py")
     with open(file_path, "w", encoding="utf-8") as f:
         f.write(code_str)
 
-    # 3. Use virtual environment's Python interpreter
-    venv_python = os.path.join("venv", "Scripts", "python.exe") if os.name == "nt" else os.path.join("venv", "bin", "python")
-    
-    if not os.path.exists(venv_python):
-        raise RuntimeError("Virtual environment not found. Expected path: " + venv_python)
+    if AGENT_RUNTIME == "pooled":
+        try:
+            worker_id = strategy_pool.add(wallet, code_str)
+        except StrategyLoadError as e:
+            raise HTTPException(status_code=422, detail=f"Generated strategy for {wallet} is not loadable: {e}")
+        launch_times.mark(wallet, "launched", runtime=AGENT_RUNTIME, worker_id=worker_id)
+        print(f"[Client] 🚀 Strategy for {wallet} hosted on worker {worker_id}")
+        return {
+            "message": f"Client {wallet} added with strategy and hosted in the strategy runtime.",
+            "wallet_address": wallet,
+            "worker_id": worker_id,
+            "launch": launch_times.report(wallet)
+        }
 
-    proc = subprocess.Popen([venv_python, file_path])
-    client_processes[wallet] = proc
-    print(f"[Client] 🚀 Subprocess launched for {wallet}")
+    # 3. Use virtual environment's Python interpreter (unless forked from the zygote)
+    if agent_zygote is None:
+        venv_python = venv_python_path()
+        if not os.path.exists(venv_python):
+            raise RuntimeError("Virtual environment not found. Expected path: " + venv_python)
+
+    pid = await asyncio.to_thread(launch_agent_process, wallet, file_path)
+    launch_times.mark(wallet, "launched", runtime=AGENT_RUNTIME, launcher=AGENT_LAUNCHER, pid=pid)
+    print(f"[Client] 🚀 Agent process {pid} launched for {wallet} ({AGENT_LAUNCHER})")
 
     return {
         "message": f"Client {wallet} added with strategy and process started.",
-        "wallet_address": wallet
+        "wallet_address": wallet,
+        "launch": launch_times.report(wallet)
     }
 
 @app.post("/stop")
@@ -286,6 +450,11 @@ async def stop_pool():
             proc.kill()
             print(f"[Stop] 💀 Killed client process for {wallet}")
     client_processes.clear()
+    strategy_pool.clear()
+    if agent_zygote is not None:
+        for wallet in agent_zygote.kill_agents():
+            print(f"[Stop] 💀 Killed zygote agent for {wallet}")
+    launch_times.clear()
 
     # 3. Kill all Python processes on port 9000 (except ourselves)
     current_pid = os.getpid()
@@ -303,6 +472,38 @@ async def stop_pool():
 
     return {"message": "All processes stopped and cleaned up"}
 
+@app.get("/runtime")
+async def runtime_status():
+    """Agent runtime mode and, when pooled, per-worker strategy stats"""
+    status = {"mode": AGENT_RUNTIME, "launcher": AGENT_LAUNCHER, "processes": len(client_processes)}
+    if strategy_pool.running:
+        status["pool"] = strategy_pool.stats()
+    if agent_zygote is not None and agent_zygote.running:
+        status["zygote"] = agent_zygote.stats()
+    return status
+
+@app.get("/code_cache")
+async def get_code_cache_stats():
+    """Generated-code cache statistics"""
+    return {"enabled": CODE_CACHE_ENABLED, **code_cache.stats()}
+
+@app.delete("/code_cache")
+async def clear_code_cache():
+    """Drop every cached agent, so the next /start regenerates all code"""
+    return {"removed": code_cache.clear()}
+
+@app.get("/launch_times")
+async def get_launch_times():
+    """
+    Time from /add_client (or /start) to each agent's first posted decision,
+    split into code generation, launch and launch-to-decision. First decisions
+    are reported by zygote and pooled agents; plain subprocesses only get
+    codegen and launch times.
+    """
+    if strategy_pool.running:
+        strategy_pool.drain_reports()
+    return launch_times.stats()
+
 # ---------- Entrypoint ----------
 if __name__ == "__main__":
     import uvicorn
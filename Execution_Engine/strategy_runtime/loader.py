@@ -0,0 +1,46 @@
+import types
+
+DECISIONS = ("buy", "sell")
+
+
+class StrategyLoadError(Exception):
+    """Generated code that cannot be hosted as a decision function"""
+
+
+def check_source(wallet_address: str, source: str):
+    """Compile without running, so syntax errors surface before a worker gets the code"""
+    try:
+        compile(source, f"<strategy {wallet_address}>", "exec")
+    except SyntaxError as e:
+        raise StrategyLoadError(f"SyntaxError: {e}") from e
+
+
+def load_strategy(wallet_address: str, source: str):
+    """
+    Run generated strategy code as its own module and return its decide().
+    Each strategy gets a fresh namespace, so module-level state is per agent.
+    """
+    module = types.ModuleType(f"strategy_{wallet_address}")
+    module.__file__ = f"<strategy {wallet_address}>"
+    try:
+        exec(compile(source, module.__file__, "exec"), module.__dict__)
+    except Exception as e:
+        raise StrategyLoadError(f"{type(e).__name__}: {e}") from e
+
+    decide = getattr(module, "decide", None)
+    if not callable(decide):
+        raise StrategyLoadError("strategy does not define decide(numeric)")
+    return decide
+
+
+def tick_fields(tick: dict) -> dict:
+    """The fields a strategy sees, as extract_numeric_fields() gives them to standalone agents"""
+    return {
+        "priceNative": float(tick.get("priceNative", 0)),
+        "priceUsd": float(tick.get("priceUsd", 0)),
+        "volume": dict(tick.get("volume") or {}),
+        "priceChange": dict(tick.get("priceChange") or {}),
+        "liquidity": dict(tick.get("liquidity") or {}),
+        "fdv": float(tick.get("fdv") or 0),
+        "marketCap": float(tick.get("marketCap") or 0)
+    }
@@ -0,0 +1,64 @@
+import time
+from typing import Optional
+
+
+class LaunchTimes:
+    """
+    Per-agent launch timeline, from the request that created the agent to
+    the first decision it posted:
+
+        requested -> code_ready (LLM codegen) -> launched -> first_decision
+
+    Timestamps are wall-clock (time.time()) so workers in other processes
+    can report them after the fact.
+    """
+
+    def __init__(self):
+        self._agents = {}  # {wallet_address: timeline dict}
+
+    def requested(self, wallet_address: str, at: Optional[float] = None):
+        self._agents[wallet_address] = {"requested_at": at or time.time()}
+
+    def mark(self, wallet_address: str, stage: str, at: Optional[float] = None, **details):
+        """Record code_ready / launched / first_decision (the first one wins)"""
+        timeline = self._agents.setdefault(wallet_address, {})
+        timeline.setdefault(f"{stage}_at", at or time.time())
+        timeline.update(details)
+
+    def forget(self, wallet_address: str):
+        self._agents.pop(wallet_address, None)
+
+    def clear(self):
+        self._agents.clear()
+
+    @staticmethod
+    def _between(timeline: dict, start: str, end: str) -> Optional[float]:
+        if f"{start}_at" in timeline and f"{end}_at" in timeline:
+            return round(timeline[f"{end}_at"] - timeline[f"{start}_at"], 4)
+        return None
+
+    def report(self, wallet_address: str) -> Optional[dict]:
+        timeline = self._agents.get(wallet_address)
+        if timeline is None:
+            return None
+        entry = {key: value for key, value in timeline.items() if not key.endswith("_at")}
+        entry["codegen_seconds"] = self._between(timeline, "requested", "code_ready")
+        entry["launch_seconds"] = self._between(timeline, "code_ready", "launched")
+        entry["launch_to_decision_seconds"] = self._between(timeline, "launched", "first_decision")
+        entry["time_to_first_decision_seconds"] = self._between(timeline, "requested", "first_decision")
+        return entry
+
+    def stats(self) -> dict:
+        agents = {wallet: self.report(wallet) for wallet in self._agents}
+        decided = sorted(entry["time_to_first_decision_seconds"] for entry in agents.values()
+                         if entry["time_to_first_decision_seconds"] is not None)
+        launch_to_decision = sorted(entry["launch_to_decision_seconds"] for entry in agents.values()
+                                    if entry["launch_to_decision_seconds"] is not None)
+        return {
+            "agents": agents,
+            "decided": len(decided),
+            "waiting": len(agents) - len(decided),
+            "time_to_first_decision_p50": decided[len(decided) // 2] if decided else None,
+            "time_to_first_decision_max": decided[-1] if decided else None,
+            "launch_to_decision_p50": launch_to_decision[len(launch_to_decision) // 2] if launch_to_decision else None
+        }
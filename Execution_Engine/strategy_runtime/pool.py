@@ -0,0 +1,125 @@
+import multiprocessing
+import queue
+
+from strategy_runtime.loader import check_source
+from strategy_runtime.worker import STAT_FIELDS, run_worker
+
+
+class StrategyPool:
+    """
+    Generated strategies hosted as decide() functions in a few worker processes.
+
+    Instead of one interpreter (imports, Redis subscription) per agent, each
+    worker preloads the strategy libraries once, holds one subscription and
+    evaluates every strategy assigned to it per tick. New strategies go to
+    the worker hosting the fewest. Workers start with the first strategy.
+    """
+
+    def __init__(self, workers: int, config: dict, start_method: str = "spawn", metrics=None):
+        self.size = max(1, workers)
+        self.config = config
+        self.metrics = metrics  # LaunchTimes, fed with first decisions
+        self._context = multiprocessing.get_context(start_method)
+        self._workers = []      # [(process, command queue, shared stats)]
+        self._reports = None
+        self.assignments = {}   # {wallet_address: worker index}
+        self.loaded = set()
+        self.failed = {}        # {wallet_address: load error}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        if self._workers:
+            return
+        self._reports = self._context.Queue()
+        for worker_id in range(self.size):
+            commands = self._context.Queue()
+            stats = self._context.Array("d", len(STAT_FIELDS), lock=False)
+            process = self._context.Process(
+                target=run_worker,
+                args=(worker_id, commands, self._reports, stats, self.config),
+                name=f"strategy-worker-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            self._workers.append((process, commands, stats))
+        print(f"[Runtime] 🚀 Started {self.size} strategy workers")
+
+    def add(self, wallet_address: str, source: str) -> int:
+        """Host (or replace) a wallet's strategy; StrategyLoadError on code that does not compile"""
+        check_source(wallet_address, source)
+        self.start()
+        self.remove(wallet_address)
+
+        counts = [0] * self.size
+        for index in self.assignments.values():
+            counts[index] += 1
+        index = counts.index(min(counts))
+        self._workers[index][1].put(("add", wallet_address, source))
+        self.assignments[wallet_address] = index
+        return index
+
+    def remove(self, wallet_address: str):
+        index = self.assignments.pop(wallet_address, None)
+        if index is not None:
+            self._workers[index][1].put(("remove", wallet_address))
+        self.loaded.discard(wallet_address)
+        self.failed.pop(wallet_address, None)
+
+    def clear(self):
+        for wallet_address in list(self.assignments):
+            self.remove(wallet_address)
+
+    def stop(self, timeout: float = 5.0):
+        for process, commands, _ in self._workers:
+            if process.is_alive():
+                commands.put(("stop",))
+        for process, _, _ in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+        self._workers.clear()
+        self.assignments.clear()
+        self.loaded.clear()
+        self.failed.clear()
+
+    def drain_reports(self):
+        """Apply load results and first-decision reports sent by the workers"""
+        while self._reports is not None:
+            try:
+                status, wallet_address, index, detail = self._reports.get_nowait()
+            except queue.Empty:
+                return
+            if self.assignments.get(wallet_address) != index:
+                continue  # replaced or removed since
+            if status == "first_decision":
+                if self.metrics is not None:
+                    self.metrics.mark(wallet_address, "first_decision", detail)
+            elif status == "loaded":
+                self.loaded.add(wallet_address)
+            else:
+                self.failed[wallet_address] = detail
+                del self.assignments[wallet_address]
+                print(f"[Runtime] ❌ Strategy for {wallet_address} failed to load: {detail}")
+
+    def stats(self) -> dict:
+        self.drain_reports()
+        workers = []
+        for worker_id, (process, _, stats) in enumerate(self._workers):
+            entry = dict(zip(STAT_FIELDS, stats[:]))
+            for field in STAT_FIELDS[:-1]:
+                entry[field] = int(entry[field])
+            entry["last_eval_ms"] = round(entry["last_eval_ms"], 3)
+            entry["worker_id"] = worker_id
+            entry["pid"] = process.pid
+            entry["alive"] = process.is_alive()
+            workers.append(entry)
+        return {
+            "workers": workers,
+            "size": self.size,
+            "hosted": len(self.assignments),
+            "loaded": len(self.loaded),
+            "failed": dict(self.failed)
+        }
@@ -0,0 +1,134 @@
+import importlib
+import json
+import queue
+import time
+
+import redis
+import requests
+
+from strategy_runtime.loader import DECISIONS, StrategyLoadError, load_strategy, tick_fields
+
+# Counters each worker keeps in shared memory for the parent's /runtime stats
+STAT_FIELDS = ("strategies", "ticks", "decisions", "errors", "posts_failed", "last_tick_seq", "last_eval_ms")
+
+
+def preload(modules: list):
+    """Import the strategy libraries once, so loading a strategy only runs its own code"""
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[Runtime] ⚠️ Could not preload {name}: {e}")
+
+
+def evaluate(strategies: dict, tick: dict, errors: dict) -> list:
+    """Run every hosted decide() on one tick; bad output or exceptions count as errors"""
+    decisions = []
+    for wallet, decide in strategies.items():
+        try:
+            # A fresh copy per strategy, so one cannot change what the next one sees
+            decision = str(decide(tick_fields(tick))).strip().lower()
+        except Exception as e:
+            errors[wallet] = f"{type(e).__name__}: {e}"
+            continue
+        if decision in DECISIONS:
+            decisions.append({"wallet_address": wallet, "action": decision})
+        else:
+            errors[wallet] = f"invalid decision {decision!r}"
+    return decisions
+
+
+def subscribe(config: dict, worker_id: int):
+    """Subscribe to the tick channel, retrying until Redis is reachable"""
+    r = redis.Redis(host=config["redis_host"], port=config["redis_port"], decode_responses=True)
+    while True:
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(config["channel"])
+            print(f"[Runtime] 🟢 Worker {worker_id} subscribed to {config['channel']}")
+            return pubsub
+        except redis.ConnectionError as e:
+            print(f"[Runtime] ⚠️ Worker {worker_id} waiting for Redis: {e}")
+            time.sleep(1)
+
+
+def run_worker(worker_id: int, commands, reports, stats, config: dict):
+    """
+    Worker process: host strategies, read each tick once from Redis, evaluate
+    them all and post their decisions to the backend in one batch.
+
+    commands carries ("add", wallet, source), ("remove", wallet) and ("stop",).
+    reports gets ("loaded" | "failed", wallet, worker_id, error) per load and
+    ("first_decision", wallet, worker_id, timestamp) once per hosted strategy.
+    """
+    preload(config["preload"])
+    strategies = {}  # {wallet_address: decide}
+    decided = set()  # wallets whose first decision was reported
+    http = requests.Session()
+    pubsub = subscribe(config, worker_id)
+
+    while True:
+        # Apply hosting changes between ticks
+        while True:
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                break
+            if command[0] == "stop":
+                pubsub.close()
+                http.close()
+                print(f"[Runtime] 🔴 Worker {worker_id} stopped")
+                return
+            if command[0] == "add":
+                _, wallet, source = command
+                try:
+                    strategies[wallet] = load_strategy(wallet, source)
+                    decided.discard(wallet)
+                    reports.put(("loaded", wallet, worker_id, None))
+                except StrategyLoadError as e:
+                    strategies.pop(wallet, None)
+                    reports.put(("failed", wallet, worker_id, str(e)))
+            elif command[0] == "remove":
+                strategies.pop(command[1], None)
+                decided.discard(command[1])
+            stats[0] = len(strategies)
+
+        try:
+            message = pubsub.get_message(timeout=config["poll_interval"])
+        except redis.ConnectionError as e:
+            # The next read reconnects and resubscribes
+            print(f"[Runtime] ⚠️ Worker {worker_id} lost Redis: {e}")
+            time.sleep(1)
+            continue
+        if message is None or message["type"] != "message" or not strategies:
+            continue
+
+        try:
+            tick = json.loads(message["data"])
+        except ValueError:
+            continue
+
+        started = time.perf_counter()
+        errors = {}
+        decisions = evaluate(strategies, tick, errors)
+        stats[1] += 1
+        stats[2] += len(decisions)
+        stats[3] += len(errors)
+        stats[5] = tick.get("seq") or 0
+        stats[6] = (time.perf_counter() - started) * 1000
+        for wallet, error in errors.items():
+            print(f"[Runtime] ❌ {wallet}: {error}")
+        now = time.time()
+        for decision in decisions:
+            if decision["wallet_address"] not in decided:
+                decided.add(decision["wallet_address"])
+                reports.put(("first_decision", decision["wallet_address"], worker_id, now))
+
+        if decisions:
+            try:
+                response = http.post(config["decision_url"], json={"decisions": decisions},
+                                     timeout=config["post_timeout"])
+                response.raise_for_status()
+            except requests.RequestException as e:
+                stats[4] += 1
+                print(f"[Runtime] ⚠️ Worker {worker_id} failed to post {len(decisions)} decisions: {e}")
@@ -0,0 +1,260 @@
+import argparse
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def zygote_supported() -> bool:
+    return hasattr(os, "fork")
+
+
+# ---------- Zygote process (python -m strategy_runtime.zygote) ----------
+
+def report_first_decision(wallet_address: str, report_fd: int, decision_path: str):
+    """Note the agent's first POST to the decision endpoint, then get out of the way"""
+    import requests
+
+    original = requests.sessions.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() == "POST" and urlparse(str(url)).path == decision_path:
+            requests.sessions.Session.request = original
+            line = json.dumps({"wallet": wallet_address, "pid": os.getpid(), "first_decision_at": time.time()})
+            os.write(report_fd, (line + "\n").encode())
+        return original(self, method, url, *args, **kwargs)
+
+    requests.sessions.Session.request = request
+
+
+def run_agent(job_fd: int, report_fd: int, decision_path: str):
+    """Forked warm child: wait for an agent script, then become that agent"""
+    with os.fdopen(job_fd, "r") as jobs:
+        job = jobs.readline()
+    if not job:
+        os._exit(0)  # released unused
+    job = json.loads(job)
+    report_first_decision(job["wallet"], report_fd, decision_path)
+    sys.argv = [job["path"]]
+    try:
+        runpy.run_path(job["path"], run_name="__main__")
+    except SystemExit as e:
+        os._exit(e.code if isinstance(e.code, int) else 0)
+    except BaseException as e:
+        print(f"[Zygote] ❌ Agent {job['wallet']} crashed: {type(e).__name__}: {e}")
+        os._exit(1)
+    os._exit(0)
+
+
+def serve(control: socket.socket, report_fd: int, preload: list, idle: int, decision_path: str):
+    """Import the preload list once, then fork agents on request until told to stop"""
+    started = time.perf_counter()
+    loaded = []
+    for name in preload:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError as e:
+            print(f"[Zygote] ⚠️ Could not preload {name}: {e}")
+    preload_seconds = time.perf_counter() - started
+
+    # Children are reaped automatically; the engine checks on them by pid
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    idle_children = []  # [(pid, job pipe write fd)]
+
+    def fork_child():
+        job_r, job_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            # close() would leave the fd open while the makefile() readers hold it
+            os.close(control.detach())
+            os.close(job_w)
+            for _, other_w in idle_children:
+                os.close(other_w)
+            run_agent(job_r, report_fd, decision_path)
+        os.close(job_r)
+        idle_children.append((pid, job_w))
+
+    while len(idle_children) < idle:
+        fork_child()
+
+    replies = control.makefile("w")
+    replies.write(json.dumps({"pid": os.getpid(), "preloaded": loaded,
+                              "preload_seconds": round(preload_seconds, 4)}) + "\n")
+    replies.flush()
+
+    for line in control.makefile("r"):
+        command = json.loads(line)
+        if command["op"] == "stop":
+            break
+        if command["op"] == "launch":
+            warm = bool(idle_children)
+            if not warm:
+                fork_child()
+            pid, job_w = idle_children.pop(0)
+            os.write(job_w, (json.dumps({"wallet": command["wallet"], "path": command["path"]}) + "\n").encode())
+            os.close(job_w)
+            replies.write(json.dumps({"pid": pid, "warm": warm}) + "\n")
+            replies.flush()
+            while len(idle_children) < idle:
+                fork_child()
+
+    # Stopped or the engine went away: EOF on their pipes makes the idle children exit
+    for _, job_w in idle_children:
+        os.close(job_w)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent zygote: preload once, fork warm agents")
+    parser.add_argument("--control-fd", type=int, required=True)
+    parser.add_argument("--report-fd", type=int, required=True)
+    parser.add_argument("--preload", default="")
+    parser.add_argument("--idle", type=int, default=2)
+    parser.add_argument("--decision-path", default="/decide")
+    args = parser.parse_args()
+
+    control = socket.socket(fileno=args.control_fd)
+    preload = [name for name in args.preload.split(",") if name]
+    serve(control, args.report_fd, preload, max(0, args.idle), args.decision_path)
+
+
+# ---------- Engine side ----------
+
+class AgentZygote:
+    """
+    Warm launcher for standalone agent scripts.
+
+    A long-lived zygote interpreter imports the allowed strategy libraries
+    once and forks every agent from itself, so agents start with numpy,
+    pandas etc. already in memory. It keeps `idle` children forked ahead of
+    time, each waiting on a pipe: launching an agent is one message, and
+    the zygote tops the idle pool up after replying. Agents report their
+    first POST to the decision endpoint back through a shared pipe.
+    """
+
+    def __init__(self, python: str, preload: list, idle: int = 2, decision_path: str = "/decide", metrics=None):
+        self.python = python
+        self.preload = preload
+        self.idle = max(0, idle)
+        self.decision_path = decision_path
+        self.metrics = metrics  # LaunchTimes, fed with first decisions
+        self._process = None
+        self._control = None
+        self._replies = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self.ready_info = {}
+        self.agents = {}  # {wallet_address: pid}
+        self.launched = 0
+        self.cold_launches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout: float = 120.0):
+        """Start the zygote and wait until its preloads are imported"""
+        with self._start_lock:  # launches run in worker threads and may all find it stopped
+            if self.running:
+                return
+            parent_end, child_end = socket.socketpair()
+            report_r, report_w = os.pipe()
+            self._process = subprocess.Popen(
+                [self.python, "-m", "strategy_runtime.zygote",
+                 "--control-fd", str(child_end.fileno()), "--report-fd", str(report_w),
+                 "--preload", ",".join(self.preload), "--idle", str(self.idle),
+                 "--decision-path", self.decision_path],
+                pass_fds=(child_end.fileno(), report_w),
+                cwd=PACKAGE_ROOT
+            )
+            child_end.close()
+            os.close(report_w)
+            threading.Thread(target=self._read_reports, args=(report_r,), daemon=True).start()
+
+            self._control = parent_end
+            self._control.settimeout(timeout)
+            self._replies = parent_end.makefile("r")
+            self.ready_info = json.loads(self._replies.readline())
+            print(f"[Zygote] 🧬 Ready (pid {self.ready_info['pid']}): {len(self.ready_info['preloaded'])} "
+                  f"libraries preloaded in {self.ready_info['preload_seconds']:.2f}s, {self.idle} warm workers")
+
+    def _read_reports(self, report_r: int):
+        with os.fdopen(report_r, "r") as reports:
+            for line in reports:
+                report = json.loads(line)
+                if self.metrics is not None and self.agents.get(report["wallet"]) == report["pid"]:
+                    self.metrics.mark(report["wallet"], "first_decision", report["first_decision_at"])
+
+    def launch(self, wallet_address: str, script_path: str) -> int:
+        """Run the agent script in a warm child of the zygote, returning its pid"""
+        self.start()
+        self.kill(wallet_address)
+        with self._lock:
+            command = {"op": "launch", "wallet": wallet_address, "path": os.path.abspath(script_path)}
+            self._control.sendall((json.dumps(command) + "\n").encode())
+            reply = json.loads(self._replies.readline())
+        self.agents[wallet_address] = reply["pid"]
+        self.launched += 1
+        if not reply["warm"]:
+            self.cold_launches += 1
+        return reply["pid"]
+
+    @staticmethod
+    def alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def kill(self, wallet_address: str) -> bool:
+        pid = self.agents.pop(wallet_address, None)
+        if pid is None or not self.alive(pid):
+            return False
+        os.kill(pid, signal.SIGKILL)
+        return True
+
+    def kill_agents(self) -> list:
+        return [wallet for wallet in list(self.agents) if self.kill(wallet)]
+
+    def stop(self):
+        """Kill every agent, release the idle children and end the zygote"""
+        self.kill_agents()
+        if self.running:
+            try:
+                with self._lock:
+                    self._control.sendall(b'{"op": "stop"}\n')
+                self._process.wait(5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+        if self._control is not None:
+            self._control.close()
+        self._process = self._control = self._replies = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "python": self.python,
+            "preloaded": self.ready_info.get("preloaded", []),
+            "preload_seconds": self.ready_info.get("preload_seconds"),
+            "idle_target": self.idle,
+            "agents": {wallet: {"pid": pid, "alive": self.alive(pid)} for wallet, pid in self.agents.items()},
+            "launched": self.launched,
+            "cold_launches": self.cold_launches
+        }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import ast
+import hashlib
+import json
+import os
+from typing import Optional
+
+
+def validate_code(code: str, runtime: str = "process") -> Optional[str]:
+    """Why generated code is unusable (None when it is fine); pooled strategies need decide()"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return f"SyntaxError: {e}"
+    if runtime == "pooled" and not any(isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and
+                                       node.name == "decide" for node in tree.body):
+        return "no top-level decide(numeric)"
+    return None
+
+
+class CodeCache:
+    """
+    Content-addressed store of generated agent code on disk.
+
+    The key hashes everything the LLM output depends on: the prompt version,
+    the model and the fully rendered prompt (strategy text, runtime and, for
+    standalone scripts, the wallet baked into them). Only extracted code that
+    passed validate_code() is stored, one file per key. Reads refresh the
+    file's mtime, and past max_entries the least recently used files go.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 256):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(prompt_version, model: str, runtime: str, prompt: str) -> str:
+        material = json.dumps([prompt_version, model, runtime, prompt], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.py")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+            os.utime(path)  # most recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return code
+
+    def put(self, key: str, code: str):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(code)
+        os.replace(temp_path, path)
+        self.stores += 1
+        self._evict()
+
+    def _entries(self) -> list:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".py")]
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, name in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        removed = 0
+        for _, name in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "entries": len(self._entries()),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -1,10 +1,166 @@
 from groq import AsyncGroq
 import asyncio
 import json
+from typing import Optional
 
-async def create_code(strategy: str, wallet_address: str):
+CODEGEN_MODEL = "deepseek-r1-distill-llama-70b"
+
+# Bump when a change to the prompts or to how responses are turned into code
+# should invalidate previously generated (cached) agents
+PROMPT_VERSION = 1
+
+# Libraries generated agents may import (also what warm runtimes preload)
+ALLOWED_IMPORTS = """# Core Libraries
+import requests
+import redis
+import json
+import time
+import random
+
+# Data Handling
+import numpy as np
+import pandas as pd
+
+# Technical Analysis
+import ta
+
+# Market Data (if needed)
+import yfinance as yf
+import ccxt
+
+# Utilities
+from dotenv import load_dotenv
+import pytz
+from dateutil import parser"""
+
+# Shape of a pooled-runtime strategy: the runtime owns the Redis subscription
+# and posting, the strategy only maps each tick to a decision
+STRATEGY_TEMPLATE = """import time
+import random
+
+def extract_numeric_fields(data):
+    '''
+    Applied by the runtime; decide() receives its output:
+    {
+        'priceNative': float,    # Price in native token units
+        'priceUsd': float,       # Price in USD
+        'volume': {'h24': float, 'h6': float, 'h1': float, 'm5': float},       # Trading volume in USD
+        'priceChange': {'m5': float, 'h1': float, 'h6': float, 'h24': float},  # Percentage price changes
+        'liquidity': {'usd': float, 'base': float, 'quote': float},            # Pool liquidity details
+        'fdv': float,            # Fully Diluted Valuation
+        'marketCap': float       # Market Capitalization
+    }
+    '''
+
+# Module-level variables persist between ticks (e.g. a price history)
+
+def decide(numeric):
+    ## Here YOU WILL ADD YOUR CODE AND RETURN THE FINAL DECISION
+    return decision
+"""
+
+
+async def create_code(strategy: str, wallet_address: str, runtime: str = "process", stream: bool = False):
+    """
+    Generate an agent for the strategy. runtime="process" asks for a full
+    script that subscribes to Redis and posts its own decisions; "pooled"
+    asks for a module defining decide(numeric) for the strategy runtime.
+    stream=True returns as soon as the first code block is complete.
+    """
     client = AsyncGroq()  # Assumes your API key is set via environment or config
 
+    user_prompt = build_prompt(strategy, wallet_address, runtime)
+
+    if stream:
+        return await stream_code(client, user_prompt)
+
+    response = await client.chat.completions.create(
+        model=CODEGEN_MODEL,
+        messages=[
+            {"role": "user", "content": user_prompt}
+        ],
+        reasoning_format="hidden"
+    )
+
+    final_response = response.choices[0].message.content
+    print(final_response)
+    return final_response
+
+
+class CodeBlockScanner:
+    """
+    Watches streamed completion text for the first ```python ... ``` block,
+    matching what extract_code_from_response() would take from the full text.
+    feed() returns the response up to and including the closing fence once
+    it has arrived, None until then.
+    """
+
+    FENCE = "```"
+    LANGUAGE = "python"
+
+    def __init__(self):
+        self.text = ""
+        self._body = None  # where the code starts, once the opening fence is known
+        self._scanned = 0  # no fence starts before this offset (in the current search)
+
+    def feed(self, delta: str) -> Optional[str]:
+        self.text += delta
+        if self._body is None:
+            start = self.text.find(self.FENCE, self._scanned)
+            if start < 0:
+                self._scanned = max(0, len(self.text) - len(self.FENCE) + 1)
+                return None
+            after = start + len(self.FENCE)
+            label = self.text[after:after + len(self.LANGUAGE)]
+            if len(label) < len(self.LANGUAGE) and self.LANGUAGE.startswith(label):
+                self._scanned = start  # could still become ```python
+                return None
+            self._body = after + len(self.LANGUAGE) if label == self.LANGUAGE else after
+            self._scanned = self._body
+        end = self.text.find(self.FENCE, self._scanned)
+        if end < 0:
+            self._scanned = max(self._body, len(self.text) - len(self.FENCE) + 1)
+            return None
+        return self.text[:end + len(self.FENCE)]
+
+
+async def stream_code(client: AsyncGroq, user_prompt: str) -> str:
+    """Stream the completion and stop reading once its code block is closed"""
+    stream = await client.chat.completions.create(
+        model=CODEGEN_MODEL,
+        messages=[
+            {"role": "user", "content": user_prompt}
+        ],
+        reasoning_format="hidden",
+        stream=True
+    )
+    scanner = CodeBlockScanner()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            complete = scanner.feed(chunk.choices[0].delta.content or "")
+            if complete is not None:
+                print(complete)
+                print(f"[Codegen] ✂️ Code block complete after {len(complete)} chars, not reading the rest")
+                return complete
+    finally:
+        # Drops the connection, so trailing commentary is never downloaded
+        await stream.close()
+
+    # No closed code block: hand back everything, like the non-streaming path
+    print(scanner.text)
+    return scanner.text
+
+
+def build_prompt(strategy: str, wallet_address: str, runtime: str = "process") -> str:
+    if runtime == "pooled":
+        return strategy_prompt(strategy)
+    return script_prompt(strategy, wallet_address)
+
+
+def script_prompt(strategy: str, wallet_address: str) -> str:
+    """Prompt for a standalone agent script (one subprocess per agent)"""
     code_prompt = f"""import time
 import json
 import redis
@@ -96,30 +252,9 @@ for message in pubsub.listen():
             print("❌ Error processing message:", e)
 """
 
-    user_prompt = f"""You are a Code Expert Agent specializing in algorithmic trading systems. You work exclusively with Python 3.13 and have the following imports available:
-
-# Core Libraries
-import requests
-import redis
-import json
-import time
-import random
-
-# Data Handling
-import numpy as np
-import pandas as pd
-
-# Technical Analysis
-import ta
-
-# Market Data (if needed)
-import yfinance as yf
-import ccxt
+    return f"""You are a Code Expert Agent specializing in algorithmic trading systems. You work exclusively with Python 3.13 and have the following imports available:
 
-# Utilities
-from dotenv import load_dotenv
-import pytz
-from dateutil import parser
+{ALLOWED_IMPORTS}
 
 RESTRICTIONS:
 1. You CANNOT install or import any additional packages
@@ -160,14 +295,42 @@ STRATEGY IMPLEMENTATION RULES:
 3. No logic and data flow change, only change the decision metric based on user's strategy
 4. You have no restrictions on defining functions or anything, as they do not harm the data flow in any way."""
 
-    response = await client.chat.completions.create(
-        model="deepseek-r1-distill-llama-70b",
-        messages=[
-            {"role": "user", "content": user_prompt}
-        ],
-        reasoning_format="hidden"
-    )
 
-    final_response = response.choices[0].message.content
-    print(final_response)
-    return final_response
\ No newline at end of file
+def strategy_prompt(strategy: str) -> str:
+    """Prompt for the pooled runtime: a module exposing decide(numeric)"""
+    return f"""You are a Code Expert Agent specializing in algorithmic trading systems. You work exclusively with Python 3.13 and have the following imports available:
+
+{ALLOWED_IMPORTS}
+
+RESTRICTIONS:
+1. You CANNOT install or import any additional packages
+2. You MUST use only the listed imports
+3. ALL code output MUST be enclosed within ```python and ``` tags
+4. The code between tags MUST be an importable module: no Redis, no network calls, no loops over live data at import time
+5. Your decision will always be either buy or sell, you can use whatever technique you want, but you will not mess up anything that I have told you.
+6. No pre-assumption that a function is already defined or not, you will always write the entire code
+
+TASK REQUIREMENTS:
+1. You will receive {strategy} containing trading logic specifications
+2. You MUST follow the structure of this code -> {STRATEGY_TEMPLATE}:
+   - A top-level function decide(numeric) taking the fields described in extract_numeric_fields()
+   - decide() returns the string "buy" or "sell" and nothing else
+   - State kept between ticks lives in module-level variables
+3. decide() runs on every tick next to many other strategies, so it must return quickly and never block
+
+OUTPUT REQUIREMENTS:
+1. Return the COMPLETE module enclosed in ```python and ``` tags
+2. The code between tags must contain no "thinking" or commentary and include ALL required imports
+3. Clearly document your strategy logic IN CODE COMMENTS ONLY"""
+
+
+def allowed_modules() -> list:
+    """Top-level module names ALLOWED_IMPORTS brings in, e.g. for preloading"""
+    modules = []
+    for line in ALLOWED_IMPORTS.splitlines():
+        words = line.split()
+        if len(words) > 1 and words[0] in ("import", "from"):
+            name = words[1].split(".")[0]
+            if name not in modules:
+                modules.append(name)
+    return modules